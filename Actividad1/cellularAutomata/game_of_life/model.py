@@ -1,5 +1,9 @@
+
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
+
+from sim_tools.model_pool import prepare_reinit, reset_model_state
+
 from .agent import Cell
 
 
@@ -43,6 +47,37 @@ class ConwaysGameOfLife(Model):
 
         self.running = True
 
+    def reset(self, width=50, height=50, initial_fraction_alive=0.2, seed=None):
+        """
+        Reinicia el modelo en su lugar; queda igual que
+        ConwaysGameOfLife(**params). Con el mismo tamaño se reutilizan el grid
+        y las células (solo se vuelven a sortear los estados); si cambia el
+        tamaño se reconstruye todo.
+        """
+        if (width, height) != (self.grid.width, self.grid.height):
+            self._rebuild(width, height, initial_fraction_alive, seed)
+            return
+
+        reset_model_state(self, seed)
+        self.current_row = height - 1
+
+        # Mismo orden de sorteo que en __init__
+        for cell in self.grid.all_cells:
+            x, y = cell.coordinate
+            agent = self.cell_grid[(x, y)]
+            agent.state = (
+                Cell.ALIVE
+                if (y == self.current_row and self.random.random() < initial_fraction_alive)
+                else Cell.DEAD
+            )
+            agent._next_state = None
+
+        self.running = True
+
+    def _rebuild(self, width, height, initial_fraction_alive, seed):
+        prepare_reinit(self)
+        ConwaysGameOfLife.__init__(self, width, height, initial_fraction_alive, seed)
+
     def step(self):
         """Perform the model step in two stages:
 
@@ -1,12 +1,19 @@
+import functools
+
+import solara
+
 from game_of_life.model import ConwaysGameOfLife
-from mesa.visualization import (
-    SolaraViz,
-    make_space_component,
-)
+from sim_tools.model_pool import pooled
+
+# Al mover un slider se reinicia un modelo ya construido del mismo tamaño
+# (ver ModelPool) en vez de crear grid y células desde cero
+GameOfLife = pooled(ConwaysGameOfLife, sizes=[(50, 50)])
 
-from mesa.visualization.components import AgentPortrayalStyle
 
 def agent_portrayal(agent):
+    # Import diferido: mesa.visualization trae matplotlib, altair, etc.
+    from mesa.visualization.components import AgentPortrayalStyle
+
     return AgentPortrayalStyle(
         color="white" if agent.state == 0 else "black",
         marker="s",
@@ -50,18 +57,30 @@ model_params = {
     },
 }
 
-# Create initial model instance
-gof_model = ConwaysGameOfLife()
+@functools.cache
+def components():
+    """Componentes sin estado: se crean una vez y los comparten todas las sesiones."""
+    from mesa.visualization import make_space_component
 
-space_component = make_space_component(
+    space_component = make_space_component(
         agent_portrayal,
-        draw_grid = False,
+        draw_grid=False,
         post_process=post_process
-)
+    )
+    return [space_component]
+
+@solara.component
+def Page():
+    # El modelo se crea hasta que alguien abre la página, uno por sesión
+    from mesa.visualization import SolaraViz
+
+    gof_model = solara.use_memo(GameOfLife, dependencies=[])
+
+    SolaraViz(
+        gof_model,
+        components=components(),
+        model_params=model_params,
+        name="Game of Life",
+    )
 
-page = SolaraViz(
-    gof_model,
-    components=[space_component],
-    model_params=model_params,
-    name="Game of Life",
-)
+page = Page
@@ -0,0 +1,7 @@
+import os
+
+from sim_tools.testing import use_package
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+game_of_life_package = use_package("game_of_life", APP_DIR)
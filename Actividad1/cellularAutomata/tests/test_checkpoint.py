@@ -0,0 +1,22 @@
+import pytest
+
+from game_of_life.checkpoint import load_checkpoint, save_checkpoint
+from game_of_life.model import ConwaysGameOfLife
+from sim_tools.differential import gol_state, state_diff
+
+
+@pytest.mark.parametrize("width, height, seed", [(30, 20, 1), (7, 40, 5), (1, 9, 2)])
+def test_resumed_run_matches_uninterrupted(tmp_path, width, height, seed):
+    model = ConwaysGameOfLife(width=width, height=height, seed=seed)
+    for _ in range(15):
+        model.step()
+    path = tmp_path / "gol.npz"
+    save_checkpoint(model, path)
+
+    resumed = load_checkpoint(path)
+    for _ in range(30):
+        assert state_diff(gol_state(model), gol_state(resumed)) == {}
+        assert resumed.random.random() == model.random.random()
+        model.step()
+        resumed.step()
+    assert state_diff(gol_state(model), gol_state(resumed)) == {}
@@ -0,0 +1,33 @@
+import pytest
+
+from game_of_life.model import ConwaysGameOfLife
+from sim_tools.differential import gol_state, run_lockstep
+
+
+def used_then_reset(params):
+    model = ConwaysGameOfLife(width=20, height=15, seed=3)
+    for _ in range(10):
+        model.step()
+    model.reset(**params)
+    return model
+
+
+@pytest.mark.parametrize("params", [
+    dict(width=20, height=15, seed=7),
+    dict(width=20, height=15, initial_fraction_alive=0.6, seed=1),
+    dict(width=12, height=25, seed=4),
+], ids=["same-size", "density", "other-size"])
+def test_reset_steps_like_a_new_model(params):
+    divergence = run_lockstep(
+        lambda: ConwaysGameOfLife(**params), lambda: used_then_reset(params),
+        gol_state, steps=60, every=5,
+    )
+    assert divergence is None, str(divergence)
+
+
+def test_reset_keeps_cells_and_ids():
+    model = used_then_reset(dict(width=20, height=15, seed=7))
+    fresh = ConwaysGameOfLife(width=20, height=15, seed=7)
+    assert sorted(a.unique_id for a in model.agents) == sorted(a.unique_id for a in fresh.agents)
+    assert model.random.random() == fresh.random.random()
+    assert model.rng.random() == fresh.rng.random()
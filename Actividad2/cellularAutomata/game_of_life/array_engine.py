@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+
+from .agent import Cell
+
+
+class ArrayAutomaton:
+    """
+    El mismo autómata que ConwaysGameOfLife, pero sobre un arreglo de NumPy.
+
+    ConwaysGameOfLife.step recorre las células en el orden de creación
+    (x mayor, luego y) y cada una escribe su estado nuevo de inmediato.
+    La célula (x, y) lee la fila y + 1 en x - 1, x y x + 1, y su regla
+    (set_next_state) se reduce a izquierda XOR derecha (regla 90). Por el
+    orden del recorrido, la izquierda ya trae el valor nuevo (salvo en
+    x = 0) y la derecha el viejo (salvo en x = width - 1, que da la vuelta
+    a la columna 0 ya actualizada). Ninguna célula lee su propia columna,
+    así que cada columna se calcula completa en una operación y se escribe
+    en su lugar, respetando exactamente esa semántica.
+
+    states[x, y] usa la misma convención que Cell (DEAD = 0, ALIVE = 1).
+    Con la misma semilla arranca igual que ConwaysGameOfLife.
+    """
+
+    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None):
+        # Mismo sorteo que ConwaysGameOfLife: un random() por célula en orden x, y
+        rng = random.Random(seed)
+        alive = [rng.random() < initial_fraction_alive for _ in range(width * height)]
+        self.states = np.array(alive, dtype=np.uint8).reshape(width, height)
+        self.width = width
+        self.height = height
+        self.steps = 0
+        self.running = True
+
+    def step(self):
+        states = self.states
+        width = self.width
+        for x in range(width):
+            left = states[x - 1]
+            right = states[(x + 1) % width]
+            # La fila de arriba de cada célula: y + 1 (con vuelta)
+            states[x] = np.roll(left ^ right, -1)
+        self.steps += 1
+
+    def alive(self):
+        return int(self.states.sum())
+
+    def state_of(self, x, y):
+        return Cell.ALIVE if self.states[x, y] else Cell.DEAD
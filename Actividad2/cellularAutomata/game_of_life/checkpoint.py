@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+
+from .model import ConwaysGameOfLife
+
+FORMAT = "conways_game_of_life"
+VERSION = 1
+
+
+def save_checkpoint(model, path):
+    """
+    Guarda el modelo en un .npz comprimido: el estado de todas las celdas
+    como un arreglo (width, height) y un encabezado JSON versionado con
+    los parámetros, el paso y el estado de los generadores aleatorios.
+    """
+    width, height = model.grid.width, model.grid.height
+    states = np.zeros((width, height), dtype=np.uint8)
+    for (x, y), agent in model.cell_grid.items():
+        states[x, y] = agent.state
+
+    _, internal, gauss = model.random.getstate()
+    meta = dict(
+        format=FORMAT, version=VERSION,
+        width=width, height=height, seed=model._seed,
+        steps=model.steps, running=model.running,
+        gauss=gauss, numpy_rng=model.rng.bit_generator.state,
+    )
+    np.savez_compressed(
+        path,
+        meta=np.array(json.dumps(meta)),
+        states=states,
+        random_state=np.asarray(internal, dtype=np.int64),
+    )
+
+
+def load_checkpoint(path, active_set=False):
+    """Reconstruye un ConwaysGameOfLife guardado con save_checkpoint."""
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        states = data["states"]
+        internal = data["random_state"]
+    if meta.get("format") != FORMAT or meta.get("version") != VERSION:
+        raise ValueError(f"{path}: checkpoint no compatible ({meta.get('format')} v{meta.get('version')})")
+
+    model = ConwaysGameOfLife(
+        width=meta["width"], height=meta["height"], initial_fraction_alive=0, seed=meta["seed"],
+        active_set=active_set,
+    )
+    rows = states.tolist()
+    for (x, y), agent in model.cell_grid.items():
+        agent.state = rows[x][y]
+
+    model.steps = meta["steps"]
+    model.running = meta["running"]
+    model.random.setstate((3, tuple(int(v) for v in internal), meta["gauss"]))
+    model.rng.bit_generator.state = meta["numpy_rng"]
+    return model
@@ -1,13 +1,22 @@
+import heapq
+
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
+
+from sim_tools.model_pool import prepare_reinit, reset_model_state
+
 from .agent import Cell
 
 
 class ConwaysGameOfLife(Model):
     """Represents the 2-dimensional array of cells in Conway's Game of Life."""
 
-    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None):
-        """Create a new playing area of (width, height) cells."""
+    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None, active_set=False):
+        """Create a new playing area of (width, height) cells.
+
+        Con active_set=True cada paso solo vuelve a evaluar las células
+        cuya fila de arriba cambió (ver _step_active).
+        """
         super().__init__(seed=seed)
 
         """Grid where cells are connected to their 8 neighbors.
@@ -38,14 +47,135 @@ class ConwaysGameOfLife(Model):
                 init_state=init_state,   
             )
 
+        # Células en el orden del recorrido de step (x mayor): índice x * height + y
+        self.active_set = active_set
+        self._cells = [None] * (width * height)
+        for (x, y), agent in self.cell_grid.items():
+            self._cells[x * height + y] = agent
+        self._pending = None
+
+        self.running = True
+
+    def reset(self, width=50, height=50, initial_fraction_alive=0.2, seed=None, active_set=False):
+        """
+        Reinicia el modelo en su lugar; queda igual que
+        ConwaysGameOfLife(**params). Con el mismo tamaño se reutilizan el grid
+        y las células (solo se vuelven a sortear los estados); si cambia el
+        tamaño se reconstruye todo.
+        """
+        if (width, height) != (self.grid.width, self.grid.height):
+            self._rebuild(width, height, initial_fraction_alive, seed, active_set)
+            return
+
+        reset_model_state(self, seed)
+
+        # Mismo orden de sorteo que en __init__
+        for cell in self.grid.all_cells:
+            agent = self.cell_grid[cell.coordinate]
+            agent.state = (
+                Cell.ALIVE
+                if (self.random.random() < initial_fraction_alive)
+                else Cell.DEAD
+            )
+            agent._next_state = None
+
+        self.active_set = active_set
+        self._pending = None
         self.running = True
 
+    def _rebuild(self, width, height, initial_fraction_alive, seed, active_set):
+        prepare_reinit(self)
+        ConwaysGameOfLife.__init__(self, width, height, initial_fraction_alive, seed, active_set)
+
+    def _mark_all_active(self):
+        """Todas las células por evaluar (primer paso o estado cambiado desde fuera)."""
+        n = len(self._cells)
+        self._pending = list(range(n))
+        self._queued_next = bytearray(b"\x01") * n
+        self._queued_now = bytearray(n)
+
+    def _step_active(self):
+        """
+        Mismo resultado que el recorrido completo de step, evaluando solo
+        las células que pueden cambiar.
+
+        Una célula (x, y) lee la fila de arriba en x - 1, x y x + 1 en el
+        momento en que se evalúa. Si ninguna de esas tres cambió desde
+        entonces, su estado nuevo es igual al actual y no hace falta
+        evaluarla. Cuando una célula cambia, sus lectoras (la fila de abajo)
+        se agregan: al montículo de este paso si todavía no les toca en el
+        recorrido, o a las pendientes del siguiente si ya pasaron. Los
+        bytearray evitan duplicados, así que el costo es O(cambios).
+        """
+        if self._pending is None:
+            self._mark_all_active()
+
+        width = self.grid.width
+        height = self.grid.height
+        cells = self._cells
+        queued_now = self._queued_now
+        queued_next = self._queued_next
+
+        n = len(cells)
+        pending = []
+        if len(self._pending) * 4 > n:
+            # Casi todo está activo: recorrer todo en orden sale más barato que
+            # el montículo; solo hay que anotar las lectoras que ya pasaron
+            for i in self._pending:
+                queued_next[i] = 0
+            order = range(n)
+            heap = None
+        else:
+            heap = self._pending
+            for i in heap:
+                queued_next[i] = 0
+                queued_now[i] = 1
+            heapq.heapify(heap)
+            order = iter(lambda: heapq.heappop(heap) if heap else None, None)
+
+        for i in order:
+            if heap is not None:
+                queued_now[i] = 0
+            x, y = divmod(i, height)
+
+            arriba = (y + 1) % height
+            agent = cells[i]
+            before = agent.state
+            agent.set_next_state(
+                cells[((x - 1) % width) * height + arriba].state,
+                cells[x * height + arriba].state,
+                cells[((x + 1) % width) * height + arriba].state,
+            )
+            if agent.state == before:
+                continue
+
+            # Lectoras de esta célula: la fila de abajo en x + 1, x y x - 1
+            abajo = (y - 1) % height
+            for reader_x in (x + 1, x, x - 1):
+                k = (reader_x % width) * height + abajo
+                if k > i:
+                    if heap is not None and not queued_now[k]:
+                        queued_now[k] = 1
+                        heapq.heappush(heap, k)
+                elif not queued_next[k]:
+                    queued_next[k] = 1
+                    pending.append(k)
+
+        self._pending = pending
+
     def step(self):
         """Perform the model step in two stages:
 
         - First, all cells assume their next state (whether they will be dead or alive)
         - Then, all cells change state to their next state.
         """
+        if self.active_set:
+            self._step_active()
+            return
+
+        # Las pendientes del modo activo ya no valen
+        self._pending = None
+
         width = self.grid.width
         height = self.grid.height
 
@@ -0,0 +1,71 @@
+import pytest
+
+from game_of_life.checkpoint import load_checkpoint, save_checkpoint
+from game_of_life.model import ConwaysGameOfLife
+from sim_tools.differential import gol_state, run_lockstep, state_diff
+
+
+@pytest.mark.parametrize("width, height, fraction, seed", [
+    (40, 30, 0.2, 1),
+    (25, 25, 0.6, 2),
+    (33, 17, 0.05, 3),
+    (1, 12, 0.5, 4),
+    (2, 15, 0.5, 5),
+    (14, 1, 0.5, 6),
+    (2, 2, 0.5, 7),
+])
+def test_matches_the_full_sweep(width, height, fraction, seed):
+    params = dict(width=width, height=height, initial_fraction_alive=fraction, seed=seed)
+    divergence = run_lockstep(
+        lambda: ConwaysGameOfLife(**params),
+        lambda: ConwaysGameOfLife(**params, active_set=True),
+        gol_state, steps=200,
+    )
+    assert divergence is None, str(divergence)
+
+
+def test_switching_modes_mid_run():
+    full = ConwaysGameOfLife(width=30, height=20, seed=8)
+    mixed = ConwaysGameOfLife(width=30, height=20, seed=8, active_set=True)
+    for step in range(120):
+        if step % 30 == 15:
+            mixed.active_set = not mixed.active_set
+        full.step()
+        mixed.step()
+        assert state_diff(gol_state(full), gol_state(mixed)) == {}, step
+
+
+def test_reset_into_active_mode():
+    model = ConwaysGameOfLife(width=20, height=20, seed=1, active_set=True)
+    for _ in range(10):
+        model.step()
+    for params in (dict(width=20, height=20, seed=2, active_set=True),
+                   dict(width=15, height=22, seed=3, active_set=True)):
+        model.reset(**params)
+        reference = ConwaysGameOfLife(**dict(params, active_set=False))
+        for step in range(100):
+            model.step()
+            reference.step()
+            assert state_diff(gol_state(reference), gol_state(model)) == {}, (params, step)
+
+
+def test_resume_from_checkpoint_in_active_mode(tmp_path):
+    model = ConwaysGameOfLife(width=25, height=18, seed=4, active_set=True)
+    for _ in range(20):
+        model.step()
+    path = tmp_path / "gol.npz"
+    save_checkpoint(model, path)
+
+    resumed = load_checkpoint(path, active_set=True)
+    assert resumed.active_set
+    for step in range(200):
+        model.step()
+        resumed.step()
+        assert state_diff(gol_state(model), gol_state(resumed)) == {}, step
+
+
+def test_still_life_leaves_nothing_pending():
+    model = ConwaysGameOfLife(width=30, height=30, initial_fraction_alive=0.0, seed=0, active_set=True)
+    model.step()
+    model.step()
+    assert model._pending == []
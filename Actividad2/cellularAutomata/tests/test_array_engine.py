@@ -0,0 +1,40 @@
+import pytest
+
+from game_of_life.array_engine import ArrayAutomaton
+from game_of_life.model import ConwaysGameOfLife
+from sim_tools.differential import array_gol_state, gol_state, run_lockstep
+
+
+@pytest.mark.parametrize("width, height, fraction, seed", [
+    (40, 30, 0.2, 1),
+    (17, 23, 0.7, 2),
+    (1, 10, 0.5, 3),
+    (2, 9, 0.5, 4),
+    (12, 1, 0.5, 5),
+])
+def test_matches_the_mesa_automaton(width, height, fraction, seed):
+    params = dict(width=width, height=height, initial_fraction_alive=fraction, seed=seed)
+    divergence = run_lockstep(
+        lambda: ConwaysGameOfLife(**params), lambda: ArrayAutomaton(**params),
+        gol_state, steps=300, every=25, candidate_state=array_gol_state,
+    )
+    assert divergence is None, str(divergence)
+
+
+class _Flipped(ArrayAutomaton):
+    """ArrayAutomaton con una célula volteada en el paso 37."""
+
+    def step(self):
+        super().step()
+        if self.steps == 37:
+            self.states[3, 4] ^= 1
+
+
+def test_lockstep_finds_the_first_divergent_step():
+    params = dict(width=10, height=10, seed=6)
+    divergence = run_lockstep(
+        lambda: ConwaysGameOfLife(**params), lambda: _Flipped(**params),
+        gol_state, steps=100, every=20, candidate_state=array_gol_state,
+    )
+    assert divergence.step == 37
+    assert list(divergence.diff) == ["states"]
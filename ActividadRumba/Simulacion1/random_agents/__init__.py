@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Las herramientas compartidas (sim_tools) viven en la raíz del repositorio
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
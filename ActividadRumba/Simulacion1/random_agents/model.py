@@ -2,6 +2,9 @@ from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
 from mesa.datacollection import DataCollector
 
+from sim_tools.model_pool import clear_agents, reset_model_state
+from sim_tools.placement import border_coords, sample_placements
+
 from .agent import RandomAgent, ObstacleAgent, DirtPatch, ChargingCell
 
 class RandomModel(Model):
@@ -14,6 +17,25 @@ class RandomModel(Model):
     def __init__(self, num_agents=1, num_obstacle = 50, dirt = 200, charge = 5, width=8, height=8, seed=42):
 
         super().__init__(seed=seed)
+        self.grid = None
+        self.reset(
+            num_agents=num_agents, num_obstacle=num_obstacle, dirt=dirt, charge=charge,
+            width=width, height=height, seed=seed,
+        )
+
+    def reset(self, num_agents=1, num_obstacle = 50, dirt = 200, charge = 5, width=8, height=8, seed=42):
+        """
+        Reinicia el modelo en su lugar con otros parámetros; queda igual que
+        RandomModel(**params). Si el tamaño no cambia se reutiliza el grid
+        (celdas y vecindades ya conectadas) y solo se recrean los agentes.
+        """
+        if self.grid is not None:
+            # Reinicio de un modelo ya usado (en __init__ no hay nada que limpiar)
+            reset_model_state(self, seed)
+            if (self.grid.width, self.grid.height) != (width, height):
+                self.grid = None
+            clear_agents(self)
+
         self.num_agents = num_agents
         self.num_obstacle = num_obstacle
         self.dirt = dirt
@@ -22,10 +44,12 @@ class RandomModel(Model):
         self.width = width
         self.height = height
 
-        self.grid = OrthogonalMooreGrid([width, height], torus=False)
+        if self.grid is None:
+            # Con el random del modelo la semilla también fija select_random_cell
+            self.grid = OrthogonalMooreGrid([width, height], torus=False, random=self.random)
         self.datacollector = DataCollector(
             model_reporters={
-                "Suciedad": lambda m: len(m.agents_by_type[DirtPatch]),
+                "Suciedad": lambda m: len(m.agents_by_type.get(DirtPatch, [])),
                 "Energy": lambda m: next(
                     a.energy for a in m.agents if isinstance(a, RandomAgent)
                 ),
@@ -35,27 +59,28 @@ class RandomModel(Model):
             }
         )
 
-        # Identify the coordinates of the border of the grid
-        border = [(x,y)
-                  for y in range(height)
-                  for x in range(width)
-                  if y in [0, height-1] or x in [0, width - 1]]
-
         # Create the border cells
-        for _, cell in enumerate(self.grid):
-            if cell.coordinate in border:
-                ObstacleAgent(self, cell=cell)
-        
+        for coord in border_coords(width, height):
+            ObstacleAgent(self, cell=self.grid[coord])
+
+        # Obstáculos y suciedad se sortean juntos y sin reemplazo,
+        # dejando libre el cargador en (1, 1)
+        obstacle_coords, dirt_coords = sample_placements(
+            self.random, width, height,
+            [self.num_obstacle, self.dirt],
+            exclude=[(1, 1)]
+        )
+
         ObstacleAgent.create_agents(
             self,
-            self.num_obstacle,
-            cell=self.random.choices(self.grid.empties.cells, k=self.num_obstacle)
+            len(obstacle_coords),
+            cell=[self.grid[coord] for coord in obstacle_coords]
         )
 
         DirtPatch.create_agents(
             self,
-            self.dirt,
-            cell=self.random.choices(self.grid.empties.cells, k=self.dirt)
+            len(dirt_coords),
+            cell=[self.grid[coord] for coord in dirt_coords]
         )
 
         cell = self.grid[1, 1]
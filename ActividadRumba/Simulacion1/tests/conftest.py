@@ -0,0 +1,7 @@
+import os
+
+from sim_tools.testing import use_package
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+random_agents_package = use_package("random_agents", APP_DIR)
@@ -0,0 +1,46 @@
+import pytest
+
+from random_agents.agent import DirtPatch, RandomAgent
+from random_agents.model import RandomModel
+from sim_tools.differential import run_lockstep
+
+BEFORE = dict(num_agents=1, num_obstacle=30, dirt=40, width=15, height=12, seed=4)
+
+
+def state(model):
+    roomba, = model.agents_by_type[RandomAgent]
+    return {
+        "steps": model.steps,
+        "roomba": (roomba.unique_id, roomba.cell.coordinate, roomba.energy),
+        "dirt": frozenset(a.cell.coordinate for a in model.agents_by_type.get(DirtPatch, [])),
+        "agents": len(model.agents),
+    }
+
+
+def used_then_reset(params):
+    model = RandomModel(**BEFORE)
+    for _ in range(25):
+        model.step()
+    model.reset(**params)
+    return model
+
+
+@pytest.mark.parametrize("params", [
+    dict(BEFORE, seed=9),
+    dict(BEFORE, num_obstacle=10, dirt=80),
+    dict(BEFORE, width=20, height=9, seed=1),
+], ids=["same-size", "other-counts", "other-size"])
+def test_reset_steps_like_a_new_model(params):
+    divergence = run_lockstep(
+        lambda: RandomModel(**params), lambda: used_then_reset(params), state, steps=150, every=10,
+    )
+    assert divergence is None, str(divergence)
+
+
+def test_reset_reports_like_a_new_model():
+    fresh = RandomModel(**BEFORE)
+    reset = used_then_reset(BEFORE)
+    for _ in range(60):
+        fresh.step()
+        reset.step()
+    assert reset.datacollector.model_vars == fresh.datacollector.model_vars
@@ -1,19 +1,22 @@
+import functools
+import os
+
+import solara
+
 from random_agents.agent import RandomAgent, ObstacleAgent, DirtPatch, ChargingCell
 from random_agents.model import RandomModel
+from sim_tools.background import BackgroundRunner, make_background_page
+from sim_tools.model_pool import pooled
 
-from mesa.visualization import (
-    Slider,
-    SolaraViz,
-    make_space_component,
-    make_plot_component
-)
-
-from mesa.visualization.components import AgentPortrayalStyle
+# mesa.visualization (matplotlib, altair, ...) se importa hasta que se abre
+# la página; así arrancar el servidor y cada worker cuesta menos.
 
 def random_portrayal(agent):
     if agent is None:
         return
 
+    from mesa.visualization.components import AgentPortrayalStyle
+
     portrayal = AgentPortrayalStyle(
         size=50,
         marker="o",
@@ -39,57 +42,120 @@ def random_portrayal(agent):
 def post_process(ax):
     ax.set_aspect("equal")
 
+def slider(label, value, min, max, step=1):
+    kind = "SliderFloat" if isinstance(step, float) else "SliderInt"
+    return {"type": kind, "label": label, "value": value, "min": min, "max": max, "step": step}
+
 model_params = {
     "seed": {
         "type": "InputText",
         "value": 42,
         "label": "Random Seed",
     },
-    "num_agents": Slider("Number of agents", 6, 1, 10),
-    "num_obstacle": Slider("Number of obstacles", 50, 1, 100),
-    "dirt": Slider("Dirt on the grid", 100, 1, 200),
-    "width": Slider("Grid width", 28, 1, 50),
-    "height": Slider("Grid height", 28, 1, 50),
+    "num_agents": slider("Number of agents", 6, 1, 10),
+    "num_obstacle": slider("Number of obstacles", 50, 1, 100),
+    "dirt": slider("Dirt on the grid", 100, 1, 200),
+    "width": slider("Grid width", 28, 1, 50),
+    "height": slider("Grid height", 28, 1, 50),
+    "sensing_radius": slider("Dirt sensing radius", 1, 1, 10),
+    "dirt_rate": slider("New dirt per cell per step", 0.0, 0.0, 0.01, 0.0005),
 }
 
-# Create the model using the initial parameters from the settings
-model = RandomModel(
-    num_agents=model_params["num_agents"].value,
-    num_obstacle=model_params["num_obstacle"].value,
-    dirt=model_params["dirt"].value,
-    width=model_params["width"].value,
-    height=model_params["height"].value,
-    seed=model_params["seed"]["value"]
-)
-
-space_component = make_space_component(
+# Al mover un slider se reinicia un modelo ya construido del mismo tamaño
+# (ver ModelPool) en vez de crear grid y agentes desde cero
+Roomba = pooled(RandomModel, sizes=[(28, 28)])
+
+def create_model():
+    """Modelo con los valores iniciales de model_params."""
+    return Roomba(**{name: param["value"] for name, param in model_params.items()})
+
+MAX_AGENTS = 10  # igual que en el modelo
+
+@functools.cache
+def components():
+    """Componentes sin estado: se crean una vez y los comparten todas las sesiones."""
+    from mesa.visualization import make_space_component, make_plot_component
+
+    space_component = make_space_component(
         random_portrayal,
-        draw_grid = False,
+        draw_grid=False,
         post_process=post_process
-)
+    )
 
-space_component = make_space_component(
-    random_portrayal,
-    draw_grid=False,
-    post_process=post_process
-)
+    dirty_plot = make_plot_component("Suciedad")  # opcionalmente page=1 si lo quieres en otra pestaña
 
-dirty_plot = make_plot_component("Suciedad")  # opcionalmente page=1 si lo quieres en otra pestaña
+    energy_plot = make_plot_component(
+        [f"Energy_agent_{i}" for i in range(MAX_AGENTS)]
+    )
 
-MAX_AGENTS = 10  # igual que en el modelo
+    movement_plot = make_plot_component(
+        [f"Movements_agent_{i}" for i in range(MAX_AGENTS)]
+    )
+
+    return {
+        "space": space_component,
+        "dirty": dirty_plot,
+        "energy": energy_plot,
+        "movement": movement_plot,
+    }
+
+def static_cells(model):
+    # Paredes y cargadores no cambian: se leen una sola vez por modelo
+    return {
+        kind: [a.cell.coordinate for a in model.agents_by_type.get(kind, [])]
+        for kind in (ObstacleAgent, ChargingCell)
+    } | {"size": (model.width, model.height)}
+
+def roomba_snapshot(model, static):
+    return {
+        "static": static,
+        "roombas": [a.cell.coordinate for a in model.agents_by_type.get(RandomAgent, [])],
+        "dirt": list(model.dirt_index),
+    }
+
+def draw_snapshot(ax, snapshot):
+    static = snapshot.data["static"]
+    layers = [
+        (static[ObstacleAgent], "gray", "s", 100),
+        (snapshot.data["dirt"], "brown", "s", 100),
+        (static[ChargingCell], "green", "s", 100),
+        (snapshot.data["roombas"], "blue", "o", 50),
+    ]
+    for coords, color, marker, size in layers:
+        if coords:
+            xs, ys = zip(*coords)
+            ax.scatter(xs, ys, c=color, marker=marker, s=size)
+    width, height = static["size"]
+    ax.set_xlim(-0.5, width - 0.5)
+    ax.set_ylim(-0.5, height - 0.5)
+    post_process(ax)
+
+def make_runner_page():
+    # La simulación corre en su propio hilo; la UI solo dibuja snapshots
+    model = create_model()
+    snapshot = functools.partial(roomba_snapshot, static=static_cells(model))
+    runner = BackgroundRunner(model, snapshot, fps=10)
+    return runner, make_background_page(runner, draw_snapshot, ["Suciedad"], name="Random Model")
+
+@solara.component
+def Page():
+    # Cada sesión crea su modelo la primera vez que se abre la página
+    if os.environ.get("ROOMBA_BACKGROUND"):
+        runner, RunnerPage = solara.use_memo(make_runner_page, dependencies=[])
+        solara.use_effect(lambda: runner.stop, dependencies=[])
+        RunnerPage()
+        return
+
+    from mesa.visualization import SolaraViz
+
+    model = solara.use_memo(create_model, dependencies=[])
+    shared = components()
+    SolaraViz(
+        model,
+        components=[shared["space"], shared["dirty"]],
+        #components=[shared["space"], shared["dirty"], shared["energy"], shared["movement"]],
+        model_params=model_params,
+        name="Random Model",
+    )
 
-energy_plot = make_plot_component(
-    [f"Energy_agent_{i}" for i in range(MAX_AGENTS)]
-)
-
-movement_plot = make_plot_component(
-    [f"Movements_agent_{i}" for i in range(MAX_AGENTS)]
-)
-
-page = SolaraViz(
-    model,
-    components=[space_component, dirty_plot],
-    #components=[space_component, dirty_plot, energy_plot, movement_plot],
-    model_params=model_params,
-    name="Random Model",
-)
+page = Page
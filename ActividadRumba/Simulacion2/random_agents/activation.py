@@ -0,0 +1,96 @@
+import heapq
+
+# Evento que se notifica cada vez que se libera la reserva de un cargador
+CHARGER_RELEASED = "charger_released"
+
+
+def cell_event(coord):
+    """Evento de "algo cambió en esta celda" (p. ej. apareció suciedad)."""
+    return ("cell", coord)
+
+
+class ActivationSchedule:
+    """
+    Agenda de activación por eventos para los roombas.
+
+    En cada paso solo se ejecuta step() de los agentes activos, en orden
+    aleatorio. Un agente puede dormirse hasta un paso dado (p. ej. "termina
+    de cargar en t + 8"), hasta que ocurra un evento, o lo que pase primero.
+    Obstáculos, cargadores y suciedad nunca se agregan, así que el costo de
+    cada paso depende solo de los roombas despiertos.
+    """
+
+    def __init__(self, random):
+        self.random = random
+        self.active = {}      # agente -> None (dict para conservar el orden)
+        self.sleeping = {}    # agente -> (paso de despertar o None, evento o None)
+        self._timers = []     # heap de (paso, secuencia, agente)
+        self._listeners = {}  # evento -> agentes dormidos (dict: despiertan en orden)
+        self._seq = 0
+
+    def __len__(self):
+        return len(self.active)
+
+    def add(self, agent):
+        self.active[agent] = None
+
+    def remove(self, agent):
+        self.active.pop(agent, None)
+        self._forget(agent)
+
+    def sleep(self, agent, until=None, event=None):
+        """
+        Duerme al agente hasta el paso until, hasta que se notifique event,
+        o lo que pase primero. Sin ninguno de los dos, duerme para siempre.
+        """
+        self.active.pop(agent, None)
+        self._forget(agent)
+        self.sleeping[agent] = (until, event)
+        if until is not None:
+            self._seq += 1
+            heapq.heappush(self._timers, (until, self._seq, agent))
+        if event is not None:
+            self._listeners.setdefault(event, {})[agent] = None
+
+    def is_sleeping(self, agent):
+        return agent in self.sleeping
+
+    def wake(self, agent):
+        if agent in self.sleeping:
+            self._forget(agent)
+            self.active[agent] = None
+
+    def notify(self, event):
+        """Despierta a todos los agentes que esperan este evento."""
+        for agent in list(self._listeners.get(event, ())):
+            self.wake(agent)
+
+    def _forget(self, agent):
+        state = self.sleeping.pop(agent, None)
+        if state is None:
+            return
+        # Los timers viejos se descartan al sacarlos del heap
+        _, event = state
+        if event is not None:
+            listeners = self._listeners.get(event)
+            if listeners is not None:
+                listeners.pop(agent, None)
+                if not listeners:
+                    del self._listeners[event]
+
+    def _wake_due(self, now):
+        timers = self._timers
+        while timers and timers[0][0] <= now:
+            until, _, agent = heapq.heappop(timers)
+            state = self.sleeping.get(agent)
+            if state is not None and state[0] == until:
+                self.wake(agent)
+
+    def step(self, now):
+        """Despierta a los que toca y ejecuta step() de los activos."""
+        self._wake_due(now)
+        agents = list(self.active)
+        self.random.shuffle(agents)
+        for agent in agents:
+            if agent in self.active:
+                agent.step()
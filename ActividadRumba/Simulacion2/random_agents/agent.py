@@ -1,11 +1,20 @@
 from mesa.discrete_space import CellAgent, FixedAgent
 from collections import deque
+import math
+
+from .activation import CHARGER_RELEASED, cell_event
+from .return_planner import step_coord
+from .dstar_lite import DStarLite
+
+# Pasos máximos que un roomba duerme esperando un cargador ocupado
+WAIT_TIMEOUT = 5
 
 class RandomAgent(CellAgent):
     """
     Agent that moves randomly.
     Attributes:
         unique_id: Agent's ID
+        index: Orden de creación entre los roombas (llave de su flujo)
     """
     def __init__(self, model, cell, energy=100, charging = False):
         """
@@ -16,32 +25,97 @@ class RandomAgent(CellAgent):
         """
         super().__init__(model)
         self.cell = cell
-        self.energy = energy
+        # Flujo propio, por orden de creación entre los roombas (no por
+        # unique_id, que se recorre si cambia el número de obstáculos o de
+        # suciedad): sus decisiones no dependen del orden de activación ni
+        # de cuántos otros agentes haya
+        self.index = model.roomba_count
+        model.roomba_count += 1
+        self.stream = model.streams.python("exploration", self.index)
+        self._charge_since = None   # Paso en que se durmió cargando
+        self._sleep_ticks = 0       # Cargas que se saltan mientras duerme
+        self._energy = energy
         self.movements = 0
         self.max_energy = 100
         self.low_battery = 40 
         self.charging = charging
 
         self.charger_coord = self.cell.coordinate  # (x, y)
-        self.known_chargers = set(self.charger_coord)   #Necesario para mas de un roomba
+        self.known_chargers = {self.charger_coord}   #Necesario para mas de un roomba
         
         self.visit_count = {}      # (x, y) , veces visitada
         self.last_coordinate = self.cell.coordinate 
         self.path_to_charger = []
-        self.return_stack = []          # Pila para regresar del cargador
+        self.charger_planner = None     # D* Lite hacia el cargador (layout dinámico)
+        self.path_to_frontier = []      # Camino a la frontera compartida más cercana
+        self.resume_coord = None        # Donde se quedó trabajando antes de ir a cargar
+        self.return_path = bytearray()  # Regreso empacado como códigos de dirección
         self.going_to_charger = False 
         self.just_finished_charging = False
 
+        model.activation.add(self)
+
+    @property
+    def energy(self):
+        """Energía actual; si duerme cargando, incluye lo que ya cargó."""
+        if self._charge_since is None:
+            return self._energy
+        ticks = min(self.model.steps - self._charge_since, self._sleep_ticks)
+        return self._energy + self.model.charge * ticks
+
+    @energy.setter
+    def energy(self, value):
+        spent = self._energy - value
+        if spent > 0:
+            self.model.metrics.spent(spent)
+        self._energy = value
+
+    def _sleep_while_charging(self):
+        """
+        El resultado de cargar ya se conoce: dormir hasta el paso en que
+        termina (o hasta que aparezca suciedad en la celda).
+        """
+        remaining = math.ceil((self.max_energy - self.energy) / self.model.charge)
+        if remaining < 2:
+            return
+        now = self.model.steps
+        self._charge_since = now
+        self._sleep_ticks = remaining - 1
+        self.model.activation.sleep(
+            self, until=now + remaining, event=cell_event(self.cell.coordinate)
+        )
+
+    def _settle_sleep(self):
+        """Aplica de golpe las cargas y visitas de los pasos que durmió."""
+        if self._charge_since is None:
+            return
+        ticks = min(self.model.steps - 1 - self._charge_since, self._sleep_ticks)
+        self._charge_since = None
+        if ticks <= 0:
+            return
+
+        self._energy += self.model.charge * ticks
+        self.model.metrics.charged(ticks)
+        coord = self.cell.coordinate
+        self.visit_count[coord] = self.visit_count.get(coord, 0) + ticks
+        self.model.coverage.visit(coord, times=ticks)
+
     def _register_visit(self):
         """Registrar la celda actual como visitada."""
         coord = self.cell.coordinate
         self.visit_count[coord] = self.visit_count.get(coord, 0) + 1
+        moved = coord != self.last_coordinate
         self.last_coordinate = coord
+        self.model.metrics.visited(moved, self.model.coverage.visit(coord))
+
+    def _cell_has(self, cell, AgentType):
+        """True si la celda contiene al menos un agente de tipo AgentType."""
+        return any(isinstance(obj, AgentType) for obj in cell.agents)
 
     def _neighbor_cells_with(self, AgentType):
         """Celdas vecinas que contienen al menos un agente de tipo AgentType."""
         return self.cell.neighborhood.select(
-            lambda c: any(isinstance(obj, AgentType) for obj in c.agents)
+            lambda c: self._cell_has(c, AgentType)
         )
 
     def _neighbors_no_obstacle(self, cell):
@@ -56,7 +130,7 @@ class RandomAgent(CellAgent):
             except Exception:
                 continue
 
-            has_obstacle = any(isinstance(obj, ObstacleAgent) for obj in ncell.agents)
+            has_obstacle = self.model.is_blocked(ncell)
             if not has_obstacle:
                 neighbors.append(ncell)
 
@@ -64,21 +138,23 @@ class RandomAgent(CellAgent):
     
     def _pick_unvisited_neighbor(self):
         """
-        Regresa una celda vecina no visitada (sin obstáculos) o None si no hay.
+        Regresa una celda vecina que ningún roomba ha visitado (sin obstáculos)
+        o None si no hay.
         """
         neighbors = self._neighbors_no_obstacle(self.cell)
         if not neighbors:
             return None
 
+        coverage = self.model.coverage
         unvisited = [
             c for c in neighbors
-            if self.visit_count.get(c.coordinate, 0) == 0
+            if coverage.is_unvisited(c.coordinate)
         ]
 
         if not unvisited:
             return None
 
-        return self.model.random.choice(unvisited)
+        return self.stream.choice(unvisited)
     
     def _bfs_path(self, goal_coord=None, goal_condition=None):
         """
@@ -88,7 +164,14 @@ class RandomAgent(CellAgent):
         - la primera celda que cumpla goal_condition(coord).
 
         Si no hay camino, devuelve [].
+        Con goal_coord y un planner jerárquico en el modelo, la búsqueda se
+        hace por clusters en vez de expandir todo el piso.
         """
+        planner = self.model.path_planner
+        if goal_coord is not None and planner is not None:
+            path_coords = planner.find_path(self.cell.coordinate, goal_coord)
+            return [self.model.grid[x, y] for (x, y) in path_coords]
+
         start = self.cell
         start_coord = start.coordinate
 
@@ -134,48 +217,24 @@ class RandomAgent(CellAgent):
         path_coords.reverse()  # de start a objetivo
         return [self.model.grid[x, y] for (x, y) in path_coords]
 
-    def _follow_path(self, path):
-        """Avanza un paso siguiendo el path (cada celda es vecina)."""
-        if not path:
-            return
-        
-        # Solo miramos la siguiente celda (decisión local)
-        next_cell = path[0]
-
-        # ¿Hay una estación de carga en esa celda?
-        has_charger = any(isinstance(obj, ChargingCell) for obj in next_cell.agents)
-        # ¿Hay otro roomba ya parado ahí?
-        has_other_roomba = any(
-            isinstance(obj, RandomAgent) and obj is not self
-            for obj in next_cell.agents
-        )
-
-        # Si la siguiente celda ES un cargador y ya está ocupada, no entramos
-        if has_charger and has_other_roomba:
-            # Borrar ruta actual y el agente pueda recalcular otra ruta a otro cargador
-            self.path_to_charger = []
-            return
-        
-        if self.going_to_charger:
-            # Guardamos la coordenada de donde ESTÁ antes de moverse
-            self.return_stack.append(self.cell.coordinate)
-
-        next_cell = path.pop(0)
-        self.cell = next_cell
-
     def clean(self):
         """If possible, clean at current location."""
         dirt_patches = [obj for obj in self.cell.agents if isinstance(obj, DirtPatch)]
         for dirt in dirt_patches:
             dirt.remove()
+        self.model.metrics.cleaned_dirt(len(dirt_patches))
+        if dirt_patches and self.model.event_log is not None:
+            self.model.event_log.cleaned(self)
 
     def _charge_if_on_station(self):
-        self.energy += 5
+        self.energy += self.model.charge
+        self.model.metrics.charged()
 
         # Si ya está lleno, dejar de "estar cargando"
         if self.energy >= self.max_energy:
             self.charging = False
             self.just_finished_charging = True 
+            self.model.charger_scheduler.release(self)
     
     def _neighbors_no_obstacle(self, cell):
         x, y = cell.coordinate
@@ -189,7 +248,7 @@ class RandomAgent(CellAgent):
             except Exception:
                 continue
 
-            has_obstacle = any(isinstance(obj, ObstacleAgent) for obj in ncell.agents)
+            has_obstacle = self.model.is_blocked(ncell)
             if not has_obstacle:
                 neighbors.append(ncell)
 
@@ -201,7 +260,7 @@ class RandomAgent(CellAgent):
         Si encuentra estaciones de carga, guarda sus coordenadas en known_chargers.
         """
         # Incluir la celda actual
-        if any(isinstance(obj, ChargingCell) for obj in self.cell.agents):
+        if self._cell_has(self.cell, ChargingCell):
             self.known_chargers.add(self.cell.coordinate)
 
         # Incluir vecinos que tengan cargador
@@ -209,11 +268,42 @@ class RandomAgent(CellAgent):
         for c in neighbor_chargers:
             self.known_chargers.add(c.coordinate)
 
+    def _step_to_frontier(self):
+        """
+        Avanza un paso hacia la celda de frontera más cercana.
+        Solo recalcula el BFS si el camino guardado ya no sirve (alguien
+        visitó el destino o el roomba se desvió). Regresa False si no hay
+        frontera alcanzable.
+        """
+        frontier = self.model.coverage.frontier
+        path = self.path_to_frontier
+
+        if path:
+            x, y = self.cell.coordinate
+            nx, ny = path[0].coordinate
+            if (
+                path[-1].coordinate not in frontier
+                or abs(nx - x) + abs(ny - y) != 1
+                or self.model.is_blocked(path[0])
+            ):
+                path = []
+
+        if not path and frontier:
+            path = self._bfs_path(goal_condition=lambda coord: coord in frontier)
+
+        self.path_to_frontier = path
+        if not path:
+            return False
+
+        self.cell = path.pop(0)
+        return True
+
     def _explore_step(self):
         """
         Movimiento de exploración:
-        1. Si hay vecinos nunca visitados, ir a uno de ellos.
-        2. Si no se puede, ir al vecino menos visitado.
+        1. Si hay vecinos que nadie ha visitado, ir a uno de ellos.
+        2. Si no, ir hacia la frontera compartida más cercana.
+        3. Si no se puede, ir al vecino menos visitado.
         """
         neighbors = self._neighbors_no_obstacle(self.cell)
         if not neighbors:
@@ -221,9 +311,13 @@ class RandomAgent(CellAgent):
 
         target = self._pick_unvisited_neighbor()
         if target is not None:
+            self.path_to_frontier = []
             self.cell = target
             return
 
+        if self._step_to_frontier():
+            return
+
         # Si no hay no visitados, ir a menos visitado
         visit_pairs = [
             (c, self.visit_count.get(c.coordinate, 0))
@@ -232,97 +326,200 @@ class RandomAgent(CellAgent):
         min_visits = min(v for (_, v) in visit_pairs)
         best = [c for (c, v) in visit_pairs if v == min_visits]
 
-        self.cell = self.model.random.choice(best)
+        self.cell = self.stream.choice(best)
             
 
+    def _next_step_to_charger(self, target):
+        """
+        Siguiente coordenada hacia el cargador target. En un piso fijo sale
+        del campo de distancias del scheduler; con layout dinámico se usa
+        D* Lite, que repara el camino cuando cambian celdas en vez de buscar
+        de nuevo.
+        """
+        layout = self.model.layout
+        if layout is None:
+            return self.model.charger_scheduler.next_step(target, self.cell.coordinate)
+
+        if self.charger_planner is None or self.charger_planner.goal != target:
+            self.charger_planner = DStarLite(layout, target, self.cell.coordinate)
+        return self.charger_planner.next_step(self.cell.coordinate)
+
     def moveToCharger(self):
         """
-        Se mueve hacia la estación de carga (celda inicial) usando BFS.
+        Se mueve un paso hacia el cargador reservado en el scheduler del modelo.
+        El camino sale del campo de distancias del cargador (o de D* Lite si
+        el layout es dinámico), así que no se hace BFS. Si el siguiente cargador está ocupado, intenta redirigirse
+        a otro conocido; si ninguno queda libre antes, espera sin moverse.
+        Regresa True si el roomba se quedó esperando.
         """
+        scheduler = self.model.charger_scheduler
+
         # Ver si hay cargadores cerca y actualizarlos en la memoria
         self._see_chargers_in_neighborhood()
 
         # Si ya está sobre un cargador, empezar a cargar
-        if any(isinstance(obj, ChargingCell) for obj in self.cell.agents):
+        if self._cell_has(self.cell, ChargingCell):
+            scheduler.reserve(self, self.cell.coordinate)
             self.charging = True
             self.just_finished_charging = False  
             self.going_to_charger = False   # Ya llegó
             self.path_to_charger = []
-            return
-
-        # Asegurarnos de que por lo menos conozca su cargador inicial
-        if not self.known_chargers:
-            self.known_chargers.add(self.charger_coord)
+            return False
 
         self.going_to_charger = True
 
-        # Usar BFS para encontrar el camino más corto
-        # a cualquiera de los cargadores conocidos
-        self.path_to_charger = self._bfs_path(
-            goal_coord=None,
-            goal_condition=lambda coord: coord in self.known_chargers
+        # Solo se recuerda el punto de regreso, no todo el recorrido
+        if self.resume_coord is None:
+            self.resume_coord = self.cell.coordinate
+        self.return_path = bytearray()
+
+        target = scheduler.reservation(self)
+        if target is None:
+            target = scheduler.request(self, candidates=self.known_chargers)
+            if target is None:
+                # No hay forma de llegar a ningún cargador conocido
+                return False
+
+        next_coord = self._next_step_to_charger(target)
+        if next_coord is None:
+            return False
+
+        x, y = next_coord
+        next_cell = self.model.grid[x, y]
+        has_charger = self._cell_has(next_cell, ChargingCell)
+        has_other_roomba = any(
+            isinstance(obj, RandomAgent) and obj is not self
+            for obj in next_cell.agents
         )
 
-        # Si por alguna razón no encontró camino, intentar al cargador inicial directo
-        if not self.path_to_charger:
-            self.path_to_charger = self._bfs_path(goal_coord=self.charger_coord)
-            if not self.path_to_charger:
-                # No hay forma de llegar a ningún cargador
-                return
-        
-        self._follow_path(self.path_to_charger)
+        if has_charger and has_other_roomba:
+            # Cargador ocupado: cambiar de cargador si otro queda libre antes
+            new_target = scheduler.redirect(self, candidates=self.known_chargers)
+            if new_target == target:
+                return True
+            next_coord = self._next_step_to_charger(new_target)
+            if next_coord is None:
+                return True
+            x, y = next_coord
+            next_cell = self.model.grid[x, y]
+
+        self.cell = next_cell
+        return False
+
+    def _follow_return_path(self):
+        """
+        Avanza un paso por el camino de regreso al trabajo. Lo abandona si
+        ve suciedad o si el paso quedó bloqueado. Regresa True si se movió.
+        """
+        coord = self.cell.coordinate
+        if self.model.dirt_index.nearest(coord, self.model.sensing_radius) is not None:
+            self.return_path = bytearray()
+            self.resume_coord = None
+            return False
+
+        x, y = step_coord(coord, self.return_path.pop())
+        cell = self.model.grid[x, y]
+        if self.model.is_blocked(cell):
+            self.return_path = bytearray()
+            self.resume_coord = None
+            return False
+
+        self.cell = cell
+        if not self.return_path:
+            self.resume_coord = None
+        return True
 
-    def move_with_return_stack(self):
-        coord = self.return_stack.pop()   # última celda donde estuvo
-        x, y = coord
-        self.cell = self.model.grid[x, y]
+    def _step_towards(self, coord):
+        """
+        Celda vecina (vecindad de Moore) que acerca al roomba a coord,
+        evitando obstáculos. Regresa None si no hay paso posible.
+        """
+        x, y = self.cell.coordinate
+        tx, ty = coord
+        sx = (tx > x) - (tx < x)
+        sy = (ty > y) - (ty < y)
+
+        # Primero en diagonal, luego por cada eje
+        for dx, dy in ((sx, sy), (sx, 0), (0, sy)):
+            if dx == 0 and dy == 0:
+                continue
+            try:
+                cell = self.model.grid[x + dx, y + dy]
+            except Exception:
+                continue
+            if not self.model.is_blocked(cell):
+                return cell
+        return None
 
     def move(self):
         """
-        Si hay suciedad en vecinos, se acerca a ella.
+        Si hay suciedad dentro del radio de sensado, se acerca a ella.
         Si no hay, explora.
         """
 
         self._see_chargers_in_neighborhood()
 
-        neighbor_dirt_cells = self._neighbor_cells_with(DirtPatch)
+        dirt_coord = self.model.dirt_index.nearest(
+            self.cell.coordinate,
+            self.model.sensing_radius,
+            rng=self.stream,
+        )
+
+        target = None
+        if dirt_coord is not None:
+            target = self._step_towards(dirt_coord)
 
-        if len(neighbor_dirt_cells) == 0:
+        if target is None:
             self._explore_step()
             return
 
-        # elegir una celda con suciedad (todas están a distancia 1)
-        target = neighbor_dirt_cells.select_random_cell()
         self.cell = target
 
 
     def step(self):
 
+        # Si estuvo dormido cargando, ponerse al día
+        self._settle_sleep()
+
         # Limpiar si hay suciedad en la celda actual
-        if [obj for obj in self.cell.agents if isinstance(obj, DirtPatch)]:
+        if self._cell_has(self.cell, DirtPatch):
             self.clean()
             self.energy -= 1
 
         # Si se queda sin energía, muere
         if self.energy <= 0:
-            if any(isinstance(obj, ChargingCell) for obj in self.cell.agents):
+            if self._cell_has(self.cell, ChargingCell):
                 self.charging = True
                 self._charge_if_on_station()
                 self._register_visit()
-            # Si no está en un cargador, se queda "muerto" ahí, sin moverse
+            else:
+                # Si no está en un cargador, se queda "muerto" ahí, sin moverse
+                # y su reserva ya no le sirve a nadie. Solo vuelve a despertar
+                # si aparece suciedad debajo de él.
+                self.model.charger_scheduler.release(self)
+                self.model.activation.sleep(self, event=cell_event(self.cell.coordinate))
             return
 
         # Cargar si tiene estado de cargando y esta encima de un cargador
-        if self.charging and any(isinstance(obj, ChargingCell) for obj in self.cell.agents):
+        if self.charging and self._cell_has(self.cell, ChargingCell):
             self._charge_if_on_station()
             self._register_visit()
-            # OJO: si SIGUE cargando, sí nos salimos
+            # OJO: si SIGUE cargando, sí nos salimos (y dormimos hasta terminar)
             if self.charging:
+                self._sleep_while_charging()
                 return
 
         # Ir al cargador mas cercano si la bateria es baja y el estado de charging es falso
         if self.energy <= self.low_battery and self.charging == False:
-            self.moveToCharger()
+            # Esperar turno en un cargador ocupado no gasta energía;
+            # se duerme hasta que se libere alguna reserva
+            if self.moveToCharger():
+                self.model.activation.sleep(
+                    self,
+                    until=self.model.steps + WAIT_TIMEOUT,
+                    event=CHARGER_RELEASED,
+                )
+                return
             self._register_visit()
             self.energy -= 1
             self.movements += 1
@@ -330,26 +527,34 @@ class RandomAgent(CellAgent):
         
         # Condicion de movimiento despues de cargar
         if self.just_finished_charging:
+            # Ya manejamos este "evento"
+            self.just_finished_charging = False
+
             # Si hay vecino no visitado, priorizarlo
             target = self._pick_unvisited_neighbor()
 
             if target is not None:
+                self.resume_coord = None
                 self.cell = target
                 self.energy -= 1
                 self.movements += 1
                 self._register_visit()
-            elif self.return_stack:
-                # Si no hay no visitados, usar la ruta de regreso
-                coord = self.return_stack.pop()
-                x, y = coord
-                self.cell = self.model.grid[x, y]
+                return
+
+            # Si no, planear el camino más corto de regreso (o ir a la frontera)
+            self.return_path = self.model.return_planner.plan(
+                self.cell.coordinate, self.resume_coord
+            ) or bytearray()
+            if not self.return_path:
+                self.resume_coord = None
+
+        # Regresar al trabajo siguiendo el camino planeado
+        if self.return_path and self.charging == False and self.energy > self.low_battery:
+            if self._follow_return_path():
                 self.energy -= 1
                 self.movements += 1
                 self._register_visit()
-
-            # Ya manejamos este "evento"
-            self.just_finished_charging = False
-            return
+                return
 
         if self.charging == False and self.energy > self.low_battery:
             self.move()
@@ -372,10 +577,16 @@ class ObstacleAgent(FixedAgent):
 class DirtPatch(FixedAgent):
     """
     A dirt patch that appears at a fixed rate and can be cleaned by the roomba.
+    Se registra en model.dirt_index al crearse y se borra de él al limpiarse.
     """
     def __init__(self, model, cell):
         super().__init__(model)
         self.cell=cell
+        model.dirt_index.add(cell.coordinate)
+
+    def remove(self):
+        self.model.dirt_index.discard(self.cell.coordinate)
+        super().remove()
 
 class ChargingCell(FixedAgent):
     """
@@ -0,0 +1,169 @@
+import math
+
+from .fields import DIRECTIONS, distance_field
+
+
+class ChargerScheduler:
+    """
+    Reparte los cargadores entre los roombas que necesitan cargar.
+
+    Cada cargador tiene un campo de distancias (BFS hecho una sola vez), así
+    que estimar la llegada o dar el siguiente paso hacia un cargador es una
+    consulta O(1), sin volver a buscar caminos. Un roomba pide cargador con
+    request(), se queda con la reserva hasta que termina de cargar y llama a
+    release(). Si su cargador está ocupado puede esperar o usar redirect()
+    para cambiarse a otro que quede libre antes. on_release(cargador), si se
+    da, se llama cada vez que se suelta una reserva.
+
+    Con planner (HierarchicalPlanner) no se hacen campos de distancias: en
+    pisos enormes cada campo cuesta todo el piso, y las rutas jerárquicas
+    solo tocan los clusters por donde pasan.
+    """
+
+    def __init__(self, free, chargers, charge_rate=5, on_release=None, planner=None):
+        self.free = free
+        self.width, self.height = free.shape
+        self.chargers = sorted(set(chargers))
+        self.charge_rate = charge_rate
+        self.on_release = on_release
+        self.planner = planner
+        self.reservations = {}                       # agente -> coordenada del cargador
+        self.queues = {c: [] for c in self.chargers}  # cargador -> agentes con reserva
+        self._fields = {}
+
+    def _field(self, charger):
+        """Campo de distancias del cargador, calculado la primera vez que se usa."""
+        field = self._fields.get(charger)
+        if field is None:
+            field = distance_field(self.free, [charger])
+            self._fields[charger] = field
+        return field
+
+    def distance(self, charger, coord):
+        """Pasos desde coord hasta el cargador, o -1 si no hay camino."""
+        if self.planner is not None:
+            return self.planner.distance(coord, charger)
+        x, y = coord
+        return int(self._field(charger)[x, y])
+
+    def next_direction(self, charger, coord):
+        """
+        Índice en DIRECTIONS del paso que acerca coord al cargador, o None si
+        ya llegó o no hay camino.
+        """
+        if self.planner is not None:
+            next_coord = self.planner.next_step(coord, charger)
+            if next_coord is None:
+                return None
+            return DIRECTIONS.index((next_coord[0] - coord[0], next_coord[1] - coord[1]))
+
+        field = self._field(charger)
+        x, y = coord
+        d = field[x, y]
+        if d <= 0:
+            return None
+
+        for code, (dx, dy) in enumerate(DIRECTIONS):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height and field[nx, ny] == d - 1:
+                return code
+        return None
+
+    def next_step(self, charger, coord):
+        """Siguiente coordenada hacia el cargador, o None si ya llegó o no hay camino."""
+        code = self.next_direction(charger, coord)
+        if code is None:
+            return None
+        dx, dy = DIRECTIONS[code]
+        return (coord[0] + dx, coord[1] + dy)
+
+    def _charge_time(self, energy, max_energy):
+        return max(0, math.ceil((max_energy - energy) / self.charge_rate))
+
+    def _ready_time(self, charger, agent, coord):
+        """
+        Paso estimado (relativo a ahora) en que el agente podría empezar a
+        cargar en este cargador, tomando en cuenta la cola de reservas.
+        Regresa None si el cargador no es alcanzable.
+        """
+        eta = self.distance(charger, coord)
+        if eta < 0:
+            return None
+
+        # Simular la cola: cada reserva llega en su ETA y carga lo que le falta
+        arrivals = []
+        for other in self.queues[charger]:
+            if other is agent:
+                continue
+            if other.charging:
+                arrivals.append((0, self._charge_time(other.energy, other.max_energy)))
+            else:
+                other_eta = max(0, self.distance(charger, other.cell.coordinate))
+                energy_left = max(0, other.energy - other_eta)
+                arrivals.append((other_eta, self._charge_time(energy_left, other.max_energy)))
+
+        free_at = 0
+        for other_eta, duration in sorted(arrivals):
+            if other_eta > eta:
+                break
+            free_at = max(free_at, other_eta) + duration
+
+        return max(eta, free_at)
+
+    def _best(self, agent, coord, candidates):
+        best, best_time = None, None
+        for charger in self.chargers:
+            if candidates is not None and charger not in candidates:
+                continue
+            ready = self._ready_time(charger, agent, coord)
+            if ready is not None and (best_time is None or ready < best_time):
+                best, best_time = charger, ready
+        return best, best_time
+
+    def reservation(self, agent):
+        return self.reservations.get(agent)
+
+    def reserve(self, agent, charger):
+        """Asigna un cargador específico al agente (suelta la reserva anterior)."""
+        if self.reservations.get(agent) == charger:
+            return
+        self.release(agent)
+        self.reservations[agent] = charger
+        self.queues[charger].append(agent)
+
+    def request(self, agent, candidates=None):
+        """
+        Reserva para el agente el cargador donde podría empezar a cargar
+        antes. candidates limita la búsqueda (p. ej. a los cargadores que el
+        roomba conoce). Regresa la coordenada o None si no alcanza ninguno.
+        """
+        charger, _ = self._best(agent, agent.cell.coordinate, candidates)
+        if charger is not None:
+            self.reserve(agent, charger)
+        return charger
+
+    def redirect(self, agent, candidates=None):
+        """
+        Revisa si otro cargador quedaría libre antes que el reservado y, si
+        es así, cambia la reserva. Regresa el cargador asignado.
+        """
+        current = self.reservations.get(agent)
+        coord = agent.cell.coordinate
+        best, best_time = self._best(agent, coord, candidates)
+        if best is None or best == current:
+            return current
+
+        current_time = None
+        if current is not None:
+            current_time = self._ready_time(current, agent, coord)
+        if current_time is None or best_time < current_time:
+            self.reserve(agent, best)
+            return best
+        return current
+
+    def release(self, agent):
+        charger = self.reservations.pop(agent, None)
+        if charger is not None:
+            self.queues[charger].remove(agent)
+            if self.on_release is not None:
+                self.on_release(charger)
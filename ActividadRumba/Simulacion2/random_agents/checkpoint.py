@@ -0,0 +1,282 @@
+import json
+
+import numpy as np
+
+from .activation import CHARGER_RELEASED
+from .agent import RandomAgent, ObstacleAgent, DirtPatch, ChargingCell
+from .model import RandomModel
+from .streams import RandomStreams
+
+FORMAT = "random_model"
+VERSION = 1
+
+# Códigos del evento por el que duerme un roomba
+_NO_EVENT, _CHARGER_EVENT, _CELL_EVENT = 0, 1, 2
+
+
+def _python_state(rng):
+    """Estado de un random.Random como (arreglo, gauss)."""
+    version, internal, gauss = rng.getstate()
+    return np.asarray(internal, dtype=np.int64), (np.nan if gauss is None else gauss)
+
+
+def _set_python_state(rng, internal, gauss):
+    gauss = None if np.isnan(gauss) else float(gauss)
+    rng.setstate((3, tuple(int(v) for v in internal), gauss))
+
+
+def _coords(values):
+    """Lista de coordenadas como arreglo (n, 2) de int32."""
+    return np.asarray(list(values), dtype=np.int32).reshape(-1, 2)
+
+
+def _rows(rows, width):
+    """Renglones de enteros como arreglo (n, width), aunque no haya ninguno."""
+    return np.asarray(rows, dtype=np.int64).reshape(-1, width)
+
+
+def _as_tuples(array):
+    return [tuple(int(v) for v in row) for row in array]
+
+
+def _roombas(model):
+    return sorted(model.agents_by_type.get(RandomAgent, []), key=lambda a: a.unique_id)
+
+
+def _obstacles(model):
+    if model.sparse:
+        return model.grid.walls
+    return _coords(sorted(a.cell.coordinate for a in model.agents_by_type.get(ObstacleAgent, [])))
+
+
+def save_checkpoint(model, path):
+    """
+    Guarda el estado completo de un RandomModel en un .npz comprimido.
+
+    Todo va en arreglos planos (un renglón por roomba, por celda sucia, por
+    visita, etc.) más un encabezado JSON con la versión del formato y los
+    parámetros del modelo. Incluye el estado de todos los generadores
+    aleatorios, así que al cargar la corrida sigue exactamente igual.
+    El historial del DataCollector no se guarda.
+    """
+    roombas = _roombas(model)
+    index = {agent: i for i, agent in enumerate(roombas)}
+    n = len(roombas)
+
+    params = dict(
+        num_agents=model.num_agents, num_obstacle=model.num_obstacle, dirt=model.dirt,
+        charge=model.charge, width=model.width, height=model.height, seed=model._seed,
+        sensing_radius=model.sensing_radius, sparse=model.sparse, dirt_rate=model.dirt_rate,
+        dynamic=model.layout is not None, hierarchical=model.path_planner is not None,
+    )
+    meta = dict(format=FORMAT, version=VERSION, params=params,
+                steps=model.steps, running=model.running,
+                numpy_rng=model.rng.bit_generator.state,
+                dirt_rng=model.dirt_spawner.rng.bit_generator.state,
+                metrics=model.metrics.state())
+
+    arrays = {}
+    if model.dirt_heatmap is not None:
+        arrays["dirt_heatmap"] = np.asarray(model.dirt_heatmap, dtype=float)
+
+    # Piso
+    arrays["dirt_coords"] = _coords(sorted(model.dirt_index))
+    arrays["obstacles"] = _obstacles(model)
+    arrays["chargers"] = _coords(sorted(a.cell.coordinate for a in model.agents_by_type.get(ChargingCell, [])))
+    arrays["blocked"] = _coords(sorted(model.layout.blocked) if model.layout is not None else [])
+    arrays["coverage_counts"] = model.coverage.counts
+    arrays["frontier"] = _coords(sorted(model.coverage.frontier))
+
+    # Roombas, un renglón por agente
+    arrays["unique_id"] = np.array([a.unique_id for a in roombas], dtype=np.int64)
+    arrays["position"] = _coords(a.cell.coordinate for a in roombas)
+    arrays["energy"] = np.array([a._energy for a in roombas], dtype=np.int64)
+    arrays["movements"] = np.array([a.movements for a in roombas], dtype=np.int64)
+    arrays["max_energy"] = np.array([a.max_energy for a in roombas], dtype=np.int64)
+    arrays["low_battery"] = np.array([a.low_battery for a in roombas], dtype=np.int64)
+    arrays["flags"] = np.array(
+        [[a.charging, a.going_to_charger, a.just_finished_charging] for a in roombas], dtype=bool
+    ).reshape(n, 3)
+    arrays["charger_coord"] = _coords(a.charger_coord for a in roombas)
+    arrays["last_coordinate"] = _coords(a.last_coordinate for a in roombas)
+    arrays["resume_coord"] = _coords(
+        a.resume_coord if a.resume_coord is not None else (-1, -1) for a in roombas
+    )
+    arrays["charge_sleep"] = _rows(
+        [(-1 if a._charge_since is None else a._charge_since, a._sleep_ticks) for a in roombas], 2
+    )
+
+    # Colecciones de tamaño variable: un renglón (roomba, ...) por elemento
+    arrays["visit_count"] = _rows(
+        [(i, x, y, c) for i, a in enumerate(roombas) for (x, y), c in a.visit_count.items()], 4
+    )
+    arrays["known_chargers"] = _rows(
+        [(i, x, y) for i, a in enumerate(roombas) for (x, y) in sorted(a.known_chargers)], 3
+    )
+    arrays["path_to_frontier"] = _rows(
+        [(i,) + c.coordinate for i, a in enumerate(roombas) for c in a.path_to_frontier], 3
+    )
+    arrays["return_path"] = _rows(
+        [(i, code) for i, a in enumerate(roombas) for code in a.return_path], 2
+    )
+
+    # Estado de los generadores de cada roomba
+    states = [_python_state(a.stream) for a in roombas]
+    arrays["agent_stream"] = np.stack([s for s, _ in states]) if states else np.zeros((0, 625), np.int64)
+    arrays["agent_gauss"] = np.array([g for _, g in states], dtype=float)
+    arrays["model_random"], gauss = _python_state(model.random)
+    arrays["activation_random"], activation_gauss = _python_state(model.activation.random)
+    meta["gauss"] = [None if np.isnan(gauss) else gauss,
+                     None if np.isnan(activation_gauss) else activation_gauss]
+
+    # Agenda: activos en orden y dormidos en el orden en que se durmieron
+    activation = model.activation
+    arrays["active"] = _rows([index[a] for a in activation.active], 1)[:, 0]
+    sleeping = []
+    for agent, (until, event) in activation.sleeping.items():
+        kind, ex, ey = _NO_EVENT, -1, -1
+        if event == CHARGER_RELEASED:
+            kind = _CHARGER_EVENT
+        elif event is not None:
+            kind, (ex, ey) = _CELL_EVENT, event[1]
+        sleeping.append((index[agent], -1 if until is None else until, kind, ex, ey))
+    arrays["sleeping"] = _rows(sleeping, 5)
+
+    # Reservas de cargadores, en el orden de cada cola
+    scheduler = model.charger_scheduler
+    arrays["reservations"] = _rows(
+        [(index[a], x, y) for (x, y) in scheduler.chargers for a in scheduler.queues[(x, y)]], 3
+    )
+
+    np.savez_compressed(path, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def load_checkpoint(path, reseed=None, **overrides):
+    """
+    Reconstruye un RandomModel desde un checkpoint de save_checkpoint.
+
+    overrides cambia parámetros que no afectan el piso (charge, dirt_rate,
+    sensing_radius...). Con reseed se cambian todos los flujos aleatorios
+    después de restaurar: así varias corridas de un barrido pueden partir
+    del mismo calentamiento y divergir desde ahí.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files}
+    meta = json.loads(str(arrays.pop("meta")))
+    if meta.get("format") != FORMAT or meta.get("version") != VERSION:
+        raise ValueError(f"{path}: checkpoint no compatible ({meta.get('format')} v{meta.get('version')})")
+
+    params = dict(meta["params"], **overrides)
+    params["dirt_heatmap"] = arrays.get("dirt_heatmap")
+    model = RandomModel(**params)
+
+    # El piso fijo se reconstruye con la misma semilla; revisar que coincida
+    if not np.array_equal(_obstacles(model), arrays["obstacles"]):
+        raise ValueError(f"{path}: los obstáculos no coinciden con los parámetros del modelo")
+    chargers = _coords(sorted(a.cell.coordinate for a in model.agents_by_type.get(ChargingCell, [])))
+    if not np.array_equal(chargers, arrays["chargers"]):
+        raise ValueError(f"{path}: los cargadores no coinciden con los parámetros del modelo")
+
+    model.steps = meta["steps"]
+    model.running = meta["running"]
+    grid = model.grid
+
+    # Suciedad
+    for dirt in list(model.agents_by_type.get(DirtPatch, [])):
+        dirt.remove()
+    dirt_coords = _as_tuples(arrays["dirt_coords"])
+    DirtPatch.create_agents(model, len(dirt_coords), cell=[grid[c] for c in dirt_coords])
+
+    if model.layout is not None:
+        for coord in _as_tuples(arrays["blocked"]):
+            model.layout.block(coord)
+
+    coverage = model.coverage
+    coverage.counts[...] = arrays["coverage_counts"]
+    coverage.covered = int(np.count_nonzero(coverage.counts))
+    coverage.frontier = set(_as_tuples(arrays["frontier"]))
+    model.metrics.load(meta.get("metrics", {}))
+
+    # Roombas
+    roombas = _roombas(model)
+    if [a.unique_id for a in roombas] != arrays["unique_id"].tolist():
+        raise ValueError(f"{path}: los roombas no coinciden con los parámetros del modelo")
+
+    for i, agent in enumerate(roombas):
+        agent.cell = grid[tuple(int(v) for v in arrays["position"][i])]
+        agent._energy = int(arrays["energy"][i])
+        agent.movements = int(arrays["movements"][i])
+        agent.max_energy = int(arrays["max_energy"][i])
+        agent.low_battery = int(arrays["low_battery"][i])
+        agent.charging, agent.going_to_charger, agent.just_finished_charging = (
+            bool(v) for v in arrays["flags"][i]
+        )
+        agent.charger_coord = tuple(int(v) for v in arrays["charger_coord"][i])
+        agent.last_coordinate = tuple(int(v) for v in arrays["last_coordinate"][i])
+        resume = tuple(int(v) for v in arrays["resume_coord"][i])
+        agent.resume_coord = None if resume == (-1, -1) else resume
+        since, ticks = (int(v) for v in arrays["charge_sleep"][i])
+        agent._charge_since = None if since < 0 else since
+        agent._sleep_ticks = ticks
+        agent.visit_count = {}
+        agent.known_chargers = set()
+        agent.path_to_frontier = []
+        agent.return_path = bytearray()
+        agent.charger_planner = None
+        _set_python_state(agent.stream, arrays["agent_stream"][i], arrays["agent_gauss"][i])
+
+    for i, x, y, count in arrays["visit_count"].tolist():
+        roombas[i].visit_count[(x, y)] = count
+    for i, x, y in arrays["known_chargers"].tolist():
+        roombas[i].known_chargers.add((x, y))
+    for i, x, y in arrays["path_to_frontier"].tolist():
+        roombas[i].path_to_frontier.append(grid[x, y])
+    for i, code in arrays["return_path"].tolist():
+        roombas[i].return_path.append(code)
+
+    if model.layout is not None:
+        model._sync_layout()
+
+    # Agenda
+    activation = model.activation
+    activation.active = {roombas[i]: None for i in arrays["active"].tolist()}
+    activation.sleeping = {}
+    activation._timers = []
+    activation._listeners = {}
+    for i, until, kind, ex, ey in arrays["sleeping"].tolist():
+        event = None
+        if kind == _CHARGER_EVENT:
+            event = CHARGER_RELEASED
+        elif kind == _CELL_EVENT:
+            event = ("cell", (ex, ey))
+        activation.sleep(roombas[i], until=None if until < 0 else until, event=event)
+
+    scheduler = model.charger_scheduler
+    scheduler.reservations = {}
+    scheduler.queues = {c: [] for c in scheduler.chargers}
+    for i, x, y in arrays["reservations"].tolist():
+        scheduler.reservations[roombas[i]] = (x, y)
+        scheduler.queues[(x, y)].append(roombas[i])
+
+    # Generadores
+    gauss, activation_gauss = (np.nan if g is None else g for g in meta["gauss"])
+    _set_python_state(model.random, arrays["model_random"], gauss)
+    _set_python_state(activation.random, arrays["activation_random"], activation_gauss)
+    model.rng.bit_generator.state = meta["numpy_rng"]
+    model.dirt_spawner.rng.bit_generator.state = meta["dirt_rng"]
+
+    if reseed is not None:
+        _reseed(model, roombas, reseed)
+    return model
+
+
+def _reseed(model, roombas, seed):
+    """Nuevos flujos para todo el modelo a partir de seed."""
+    model.streams = streams = RandomStreams(seed)
+    # En su lugar: el grid y sus celdas comparten este mismo objeto
+    model.random.seed(streams.entropy)
+    model.rng = np.random.default_rng(streams.seed_sequence("model"))
+    model.activation.random = streams.python("activation")
+    model.dirt_spawner.rng = streams.generator("dirt")
+    for agent in roombas:
+        agent.stream = streams.python("exploration", agent.index)
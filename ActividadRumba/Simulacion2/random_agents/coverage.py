@@ -0,0 +1,54 @@
+import numpy as np
+
+from .fields import DIRECTIONS
+
+
+class CoverageMap:
+    """
+    Mapa de cobertura compartido por todos los roombas del modelo.
+
+    counts[x, y] guarda cuántas veces se ha visitado cada celda. El conjunto
+    frontier contiene las celdas libres que nadie ha visitado pero que
+    están junto a una celda visitada; se actualiza en O(1) en cada visita.
+    """
+
+    def __init__(self, free):
+        self.free = free
+        self.width, self.height = free.shape
+        self.counts = np.zeros(free.shape, dtype=np.int32)
+        self.frontier = set()
+        self.covered = 0
+
+    def count(self, coord):
+        x, y = coord
+        return int(self.counts[x, y])
+
+    def is_unvisited(self, coord):
+        x, y = coord
+        return self.counts[x, y] == 0
+
+    def visit(self, coord, times=1):
+        """
+        Registra la visita de una celda. Regresa True si era la primera vez
+        que alguien la visitaba.
+        """
+        x, y = coord
+        first = self.counts[x, y] == 0
+        self.counts[x, y] += times
+        if not first:
+            return False
+
+        self.covered += 1
+        self.frontier.discard(coord)
+
+        # Los vecinos libres sin visitar pasan a ser frontera
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if (
+                0 <= nx < self.width
+                and 0 <= ny < self.height
+                and self.free[nx, ny]
+                and self.counts[nx, ny] == 0
+            ):
+                self.frontier.add((nx, ny))
+        return True
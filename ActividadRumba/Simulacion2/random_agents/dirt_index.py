@@ -0,0 +1,110 @@
+class DirtIndex:
+    """
+    Índice espacial de la suciedad: divide el piso en cubetas de
+    bucket_size x bucket_size celdas y guarda en cada una las coordenadas
+    sucias que contiene.
+
+    nearest() busca por anillos de cubetas a partir de la del roomba y se
+    detiene en cuanto ningún anillo más lejano puede mejorar el resultado,
+    así que el costo depende de qué tan lejos está la suciedad más cercana
+    y no del número total de DirtPatch.
+    """
+
+    def __init__(self, bucket_size=8):
+        self.bucket_size = bucket_size
+        self.buckets = {}   # (bx, by) -> set de coordenadas sucias
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for bucket in self.buckets.values():
+            yield from bucket
+
+    def __contains__(self, coord):
+        bucket = self.buckets.get(self._key(coord))
+        return bucket is not None and coord in bucket
+
+    def _key(self, coord):
+        x, y = coord
+        return (x // self.bucket_size, y // self.bucket_size)
+
+    def add(self, coord):
+        bucket = self.buckets.setdefault(self._key(coord), set())
+        if coord not in bucket:
+            bucket.add(coord)
+            self.size += 1
+
+    def discard(self, coord):
+        key = self._key(coord)
+        bucket = self.buckets.get(key)
+        if bucket is None or coord not in bucket:
+            return
+        bucket.remove(coord)
+        self.size -= 1
+        if not bucket:
+            del self.buckets[key]
+
+    def _buckets_in_ring(self, center, ring):
+        """Llaves de las cubetas a distancia (Chebyshev) exactamente ring."""
+        cx, cy = center
+        if ring == 0:
+            yield center
+            return
+        for bx in range(cx - ring, cx + ring + 1):
+            yield (bx, cy - ring)
+            yield (bx, cy + ring)
+        for by in range(cy - ring + 1, cy + ring):
+            yield (cx - ring, by)
+            yield (cx + ring, by)
+
+    def nearest(self, coord, radius, rng=None, min_distance=1):
+        """
+        Coordenada sucia más cercana (distancia de Chebyshev) dentro de
+        radius, ignorando las que estén a menos de min_distance. Los empates
+        se rompen con rng si se da. Regresa None si no hay.
+        """
+        if not self.size:
+            return None
+
+        x, y = coord
+        b = self.bucket_size
+        center = self._key(coord)
+        max_ring = radius // b + 1
+
+        # Si hay menos cubetas ocupadas que cubetas por revisar, es más
+        # barato recorrer solo las ocupadas
+        if len(self.buckets) < (2 * max_ring + 1) ** 2:
+            cx, cy = center
+            rings = {}
+            for key in self.buckets:
+                ring = max(abs(key[0] - cx), abs(key[1] - cy))
+                if ring <= max_ring:
+                    rings.setdefault(ring, []).append(key)
+            candidates = lambda ring: rings.get(ring, ())
+        else:
+            candidates = lambda ring: self._buckets_in_ring(center, ring)
+
+        best_d = radius + 1
+        best = []
+        for ring in range(max_ring + 1):
+            # Todo lo que está en este anillo queda al menos a esta distancia
+            if (ring - 1) * b + 1 > min(radius, best_d):
+                break
+            for key in candidates(ring):
+                for other in self.buckets.get(key, ()):
+                    d = max(abs(other[0] - x), abs(other[1] - y))
+                    if d < min_distance or d > radius or d > best_d:
+                        continue
+                    if d < best_d:
+                        best_d = d
+                        best = [other]
+                    else:
+                        best.append(other)
+
+        if not best:
+            return None
+        if rng is None or len(best) == 1:
+            return min(best)
+        return rng.choice(sorted(best))
@@ -0,0 +1,65 @@
+import numpy as np
+
+from .activation import cell_event
+from .agent import DirtPatch
+
+
+class DirtSpawner:
+    """
+    Hace aparecer suciedad nueva en cada paso.
+
+    Cada celda libre recibe suciedad con probabilidad rate por paso,
+    multiplicada por heatmap[x, y] si se da (zonas de mucho tránsito). En vez
+    de sortear celda por celda, cada paso hace una sola muestra de Poisson
+    con el total esperado y luego elige esas celdas en lote:
+    - sin heatmap, por adelgazamiento: se sortean celdas de todo el piso y
+      se descartan las bloqueadas;
+    - con heatmap, con búsqueda binaria sobre los pesos acumulados.
+    Solo se crea un DirtPatch por celda que realmente se ensucia.
+    """
+
+    def __init__(self, model, free, rate, heatmap=None, rng=None):
+        self.model = model
+        self.free = free
+        self.rate = rate
+        self.rng = model.rng if rng is None else rng
+        self.width, self.height = free.shape
+
+        self.cdf = None
+        if heatmap is None:
+            self.expected = rate * free.size
+        else:
+            weights = np.where(free, np.asarray(heatmap, dtype=float), 0.0).ravel()
+            self.cdf = np.cumsum(weights)
+            self.expected = rate * self.cdf[-1]
+
+    def _draw(self):
+        """Índices planos (x * height + y) de las celdas que se ensucian."""
+        k = self.rng.poisson(self.expected)
+        if not k:
+            return np.empty(0, dtype=np.int64)
+
+        if self.cdf is None:
+            flat = self.rng.integers(0, self.free.size, size=k)
+            flat = flat[self.free.ravel()[flat]]
+        else:
+            flat = np.searchsorted(self.cdf, self.rng.random(k) * self.cdf[-1], side="right")
+        return np.unique(flat)
+
+    def step(self):
+        """Genera la suciedad de este paso. Regresa las coordenadas nuevas."""
+        if self.expected <= 0:
+            return []
+
+        spawned = []
+        for flat in self._draw():
+            coord = (int(flat) // self.height, int(flat) % self.height)
+            if coord in self.model.dirt_index:
+                continue
+            x, y = coord
+            DirtPatch(self.model, self.model.grid[x, y])
+            self.model.activation.notify(cell_event(coord))
+            if self.model.event_log is not None:
+                self.model.event_log.dirt_spawned(coord)
+            spawned.append(coord)
+        return spawned
@@ -0,0 +1,141 @@
+import heapq
+
+INF = float("inf")
+
+
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class DStarLite:
+    """
+    Planeador incremental D* Lite hacia una meta fija (p. ej. un cargador).
+
+    La búsqueda va de la meta hacia el roomba, así que cuando el roomba se
+    mueve no hay que buscar de nuevo. Cuando cambian celdas del
+    DynamicLayout (puertas, muebles, otros roombas), solo se actualizan los
+    vecinos de esas celdas y se repara lo que dependía de ellas: el costo
+    es proporcional al cambio, no al tamaño del piso.
+
+    g y rhs se guardan en diccionarios; la cola usa borrado perezoso (las
+    entradas viejas se descartan al sacarlas).
+    """
+
+    def __init__(self, layout, goal, start):
+        self.layout = layout
+        self.goal = goal
+        self.start = start
+        self.last = start
+        self.km = 0
+        self.version = layout.version
+        self._reset()
+
+    def _reset(self):
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.open = []
+        self._queued = {}   # celda -> llave con la que está en la cola
+        self._push(self.goal, self._key(self.goal))
+
+    def _key(self, s):
+        m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (m + manhattan(self.start, s) + self.km, m)
+
+    def _push(self, s, key):
+        self._queued[s] = key
+        heapq.heappush(self.open, (key, s))
+
+    def _top_key(self):
+        open_ = self.open
+        while open_:
+            key, s = open_[0]
+            if self._queued.get(s) == key:
+                return key
+            heapq.heappop(open_)
+        return (INF, INF)
+
+    def _best_successor(self, u):
+        """(costo, vecino) del mejor paso desde u, o (INF, None)."""
+        best, best_coord = INF, None
+        layout = self.layout
+        g = self.g
+        for s in layout.neighbors(u):
+            cost = layout.cost(s)
+            if cost is None:
+                continue
+            total = cost + g.get(s, INF)
+            if total < best:
+                best, best_coord = total, s
+        return best, best_coord
+
+    def _update_vertex(self, u):
+        if u != self.goal:
+            self.rhs[u] = self._best_successor(u)[0]
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u, self._key(u))
+        else:
+            self._queued.pop(u, None)
+
+    def _compute(self):
+        g, rhs = self.g, self.rhs
+        start = self.start
+        while True:
+            top = self._top_key()
+            if top >= self._key(start) and rhs.get(start, INF) == g.get(start, INF):
+                return
+            if top == (INF, INF):
+                return
+
+            _, u = heapq.heappop(self.open)
+            new_key = self._key(u)
+            if top < new_key:
+                self._push(u, new_key)
+                continue
+
+            del self._queued[u]
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+            for p in self.layout.neighbors(u):
+                self._update_vertex(p)
+
+    def _apply_changes(self):
+        layout = self.layout
+        if layout.version == self.version:
+            return
+        changes = layout.changes_since(self.version)
+        self.version = layout.version
+        if changes is None:
+            # Demasiados cambios perdidos: empezar de nuevo
+            self.km = 0
+            self.last = self.start
+            self._reset()
+            return
+
+        self.km += manhattan(self.last, self.start)
+        self.last = self.start
+        # El costo de una arista depende de la celda a la que se entra, así
+        # que un cambio en v solo afecta a los vecinos que llegan a v
+        for v in changes:
+            for p in layout.neighbors(v):
+                self._update_vertex(p)
+
+    def distance(self, start):
+        """Costo del mejor camino desde start a la meta (INF si no hay)."""
+        self.start = start
+        self._apply_changes()
+        self._compute()
+        return self.g.get(start, INF)
+
+    def next_step(self, start):
+        """
+        Siguiente coordenada desde start hacia la meta, o None si ya llegó
+        o si no hay camino.
+        """
+        if start == self.goal:
+            return None
+        if self.distance(start) == INF:
+            return None
+        return self._best_successor(start)[1]
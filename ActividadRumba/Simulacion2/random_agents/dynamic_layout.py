@@ -0,0 +1,105 @@
+from .fields import DIRECTIONS
+
+# Costo extra de pasar por una celda donde hay otro roomba
+SOFT_COST = 4
+
+# Cambios que se guardan en la bitácora antes de descartar los más viejos
+MAX_LOG = 4096
+
+
+class DynamicLayout:
+    """
+    Obstáculos que cambian durante la simulación.
+
+    Sobre la máscara estática free[x, y] se agregan:
+    - celdas bloqueadas (puertas cerradas, muebles que se movieron), que
+      nadie puede pisar;
+    - celdas ocupadas por roombas, que se pueden pisar pero cuestan
+      soft_cost pasos extra (obstáculo suave).
+
+    Cada cambio se anota en una bitácora con número de versión. Los
+    planeadores guardan la versión que ya vieron y con changes_since()
+    obtienen solo las celdas que cambiaron desde entonces.
+    """
+
+    def __init__(self, free, soft_cost=SOFT_COST, max_log=MAX_LOG):
+        self.free = free
+        self.width, self.height = free.shape
+        self._free_rows = free.tolist()   # listas: más rápido que indexar NumPy
+        self.soft_cost = soft_cost
+        self.max_log = max_log
+        self.blocked = set()
+        self.occupants = {}   # coordenada -> número de roombas
+        self.version = 0
+        self._log = []
+        self._log_start = 0   # versión del primer cambio que sigue en _log
+
+    def _record(self, coord):
+        self._log.append(coord)
+        self.version += 1
+        if len(self._log) > 2 * self.max_log:
+            drop = len(self._log) - self.max_log
+            del self._log[:drop]
+            self._log_start += drop
+
+    def changes_since(self, version):
+        """
+        Celdas que cambiaron después de version. Regresa None si la
+        bitácora ya no llega tan atrás (hay que replanear desde cero).
+        """
+        if version < self._log_start:
+            return None
+        return set(self._log[version - self._log_start:])
+
+    def in_bounds(self, coord):
+        x, y = coord
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def neighbors(self, coord):
+        """Vecinos ortogonales dentro del piso (en el orden de DIRECTIONS)."""
+        x, y = coord
+        for dx, dy in DIRECTIONS:
+            ncoord = (x + dx, y + dy)
+            if self.in_bounds(ncoord):
+                yield ncoord
+
+    def is_blocked(self, coord):
+        """True si la celda está bloqueada por un obstáculo dinámico."""
+        return coord in self.blocked
+
+    def passable(self, coord):
+        x, y = coord
+        return self._free_rows[x][y] and coord not in self.blocked
+
+    def cost(self, coord):
+        """Costo de entrar a coord, o None si no se puede pisar."""
+        if not self.passable(coord):
+            return None
+        if coord in self.occupants:
+            return 1 + self.soft_cost
+        return 1
+
+    def block(self, coord):
+        if coord not in self.blocked:
+            self.blocked.add(coord)
+            self._record(coord)
+
+    def unblock(self, coord):
+        if coord in self.blocked:
+            self.blocked.discard(coord)
+            self._record(coord)
+
+    def set_occupants(self, coords):
+        """
+        Actualiza las celdas ocupadas por roombas. Solo se anotan las que
+        cambiaron de libre a ocupada o al revés.
+        """
+        occupants = {}
+        for coord in coords:
+            occupants[coord] = occupants.get(coord, 0) + 1
+
+        for coord in self.occupants.keys() - occupants.keys():
+            self._record(coord)
+        for coord in occupants.keys() - self.occupants.keys():
+            self._record(coord)
+        self.occupants = occupants
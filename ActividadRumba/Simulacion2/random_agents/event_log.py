@@ -0,0 +1,338 @@
+import bisect
+import mmap
+import struct
+from array import array
+
+MAGIC = b"RMBLOG\x00\x01"
+VERSION = 1
+
+# Direcciones de un movimiento (vecindad de Moore); el código es el índice
+MOVE_CODES = (
+    (1, 0), (-1, 0), (0, 1), (0, -1),
+    (1, 1), (1, -1), (-1, 1), (-1, -1),
+)
+_CODE_OF = {delta: code for code, delta in enumerate(MOVE_CODES)}
+
+# Etiquetas (nibble alto del primer byte de cada registro)
+STEP = 0
+MOVE = 1          # nibble bajo = código de dirección
+CLEAN = 2
+CHARGE_START = 3
+CHARGE_STOP = 4
+DEATH = 5
+REVIVE = 6
+ENERGY = 7        # cambio de energía distinto del esperado
+MOVES = 8         # cambio del contador de movimientos distinto del esperado
+DIRT = 9
+KEYFRAME = 10
+
+_HEADER = struct.Struct("<8sHIIII")   # magic, versión, ancho, alto, keyframe_every, roombas
+_AGENT_EVENT = struct.Struct("<BI")   # etiqueta, roomba (STEP usa el paso)
+_DELTA_EVENT = struct.Struct("<BIi")  # etiqueta, roomba, delta
+_CELL_EVENT = struct.Struct("<BII")   # etiqueta, x, y
+_COUNT = struct.Struct("<I")
+_AGENT_STATE = struct.Struct("<IIiiB")  # x, y, energía, movimientos, banderas
+_INDEX_ENTRY = struct.Struct("<IQ")   # paso, offset del keyframe
+_TRAILER = struct.Struct("<QI8s")     # offset del índice, entradas, magic
+
+CHARGING_FLAG = 1
+DEAD_FLAG = 2
+
+
+class ReplayFrame:
+    """Estado reconstruido de la simulación en un paso."""
+
+    def __init__(self, step, positions, energy, movements, flags, dirt):
+        self.step = step
+        self.positions = positions
+        self.energy = energy
+        self.movements = movements
+        self.flags = flags
+        self.dirt = dirt
+
+    def charging(self, i):
+        return bool(self.flags[i] & CHARGING_FLAG)
+
+    def dead(self, i):
+        return bool(self.flags[i] & DEAD_FLAG)
+
+
+class EventRecorder:
+    """
+    Graba una corrida de RandomModel en un log binario compacto.
+
+    Cada paso se guarda como eventos: movimientos como código de dirección
+    (un byte de etiqueta + el índice del roomba), limpiezas, inicio y fin
+    de carga, muertes y suciedad nueva. Energía y contador de movimientos
+    solo se anotan cuando cambian distinto de lo esperado (−1 por moverse,
+    −1 por limpiar). Cada keyframe_every pasos se escribe el estado
+    completo, y al cerrar se agrega un índice de keyframes al final del
+    archivo para poder saltar a cualquier paso.
+
+    Uso:
+        with EventRecorder(model, "corrida.rmb"):
+            for _ in range(1000):
+                model.step()
+    """
+
+    def __init__(self, model, path, keyframe_every=100):
+        from .agent import RandomAgent
+
+        self.model = model
+        self.keyframe_every = keyframe_every
+        self.agents = sorted(model.agents_by_type.get(RandomAgent, []), key=lambda a: a.unique_id)
+        self._index = {agent: i for i, agent in enumerate(self.agents)}
+        self._keyframes = []
+        self._cleaned = set()
+        self._last = [self._state_of(agent) for agent in self.agents]
+
+        self.file = open(path, "wb")
+        self.file.write(_HEADER.pack(
+            MAGIC, VERSION, model.width, model.height, keyframe_every, len(self.agents)
+        ))
+        self.file.write(array("I", [agent.unique_id for agent in self.agents]).tobytes())
+        self._write_keyframe()
+        model.event_log = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _state_of(agent):
+        energy = agent.energy
+        flags = CHARGING_FLAG if agent.charging else 0
+        if energy <= 0 and not agent.charging:
+            flags |= DEAD_FLAG
+        return (agent.cell.coordinate, energy, agent.movements, flags)
+
+    def _write_keyframe(self):
+        write = self.file.write
+        self._keyframes.append((self.model.steps, self.file.tell()))
+        write(_AGENT_EVENT.pack(KEYFRAME << 4, self.model.steps))
+        for (x, y), energy, movements, flags in self._last:
+            write(_AGENT_STATE.pack(x, y, energy, movements, flags))
+        dirt = sorted(self.model.dirt_index)
+        write(_COUNT.pack(len(dirt)))
+        write(array("I", [v for coord in dirt for v in coord]).tobytes())
+
+    # -- Ganchos que llama el modelo ------------------------------------
+
+    def begin_step(self, step):
+        self.file.write(_AGENT_EVENT.pack(STEP << 4, step))
+
+    def dirt_spawned(self, coord):
+        self.file.write(_CELL_EVENT.pack(DIRT << 4, coord[0], coord[1]))
+
+    def cleaned(self, agent):
+        self.file.write(_AGENT_EVENT.pack(CLEAN << 4, self._index[agent]))
+        self._cleaned.add(agent)
+
+    def end_step(self):
+        """Compara cada roomba con el paso anterior y escribe los cambios."""
+        write = self.file.write
+        cleaned = self._cleaned
+        for i, agent in enumerate(self.agents):
+            coord, energy, movements, flags = state = self._state_of(agent)
+            old_coord, old_energy, old_movements, old_flags = self._last[i]
+            if state == self._last[i] and agent not in cleaned:
+                continue
+            self._last[i] = state
+
+            moved = coord != old_coord
+            if moved:
+                code = _CODE_OF[(coord[0] - old_coord[0], coord[1] - old_coord[1])]
+                write(_AGENT_EVENT.pack(MOVE << 4 | code, i))
+
+            expected = old_energy - moved - (agent in cleaned)
+            if energy != expected:
+                write(_DELTA_EVENT.pack(ENERGY << 4, i, energy - expected))
+            if movements != old_movements + moved:
+                write(_DELTA_EVENT.pack(MOVES << 4, i, movements - old_movements - moved))
+
+            changed = flags ^ old_flags
+            if changed & CHARGING_FLAG:
+                tag = CHARGE_START if flags & CHARGING_FLAG else CHARGE_STOP
+                write(_AGENT_EVENT.pack(tag << 4, i))
+            if changed & DEAD_FLAG:
+                tag = DEATH if flags & DEAD_FLAG else REVIVE
+                write(_AGENT_EVENT.pack(tag << 4, i))
+        cleaned.clear()
+
+        if self.model.steps % self.keyframe_every == 0:
+            self._write_keyframe()
+
+    def close(self):
+        if self.file.closed:
+            return
+        offset = self.file.tell()
+        for step, position in self._keyframes:
+            self.file.write(_INDEX_ENTRY.pack(step, position))
+        self.file.write(_TRAILER.pack(offset, len(self._keyframes), MAGIC))
+        self.file.close()
+        if self.model.event_log is self:
+            self.model.event_log = None
+
+
+class EventReplay:
+    """
+    Reproduce un log de EventRecorder sin correr la simulación.
+
+    seek(paso) salta al keyframe anterior más cercano (usando el índice
+    del final del archivo) y aplica los eventos que faltan; step() avanza
+    un paso. El archivo se lee con mmap, así que el costo es leer bytes.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.width, self.height, self.keyframe_every, n = \
+            _HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} no es un log de eventos válido")
+        offset = _HEADER.size
+        self.agent_ids = list(array("I", self.data[offset:offset + 4 * n]))
+        self.num_agents = n
+
+        index_offset, entries, magic = _TRAILER.unpack_from(self.data, len(self.data) - _TRAILER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path} no tiene índice (¿no se cerró el recorder?)")
+        self._events_end = index_offset
+        self.keyframes = [
+            _INDEX_ENTRY.unpack_from(self.data, index_offset + i * _INDEX_ENTRY.size)
+            for i in range(entries)
+        ]
+        self._keyframe_steps = [step for step, _ in self.keyframes]
+        self.frame = None
+        self._offset = None
+        self.seek(self._keyframe_steps[0])
+
+    def close(self):
+        self.data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def last_step(self):
+        """Último paso grabado."""
+        data, offset, last = self.data, self.keyframes[-1][1], self.keyframes[-1][0]
+        while offset < self._events_end:
+            tag = data[offset] >> 4
+            if tag == STEP:
+                last = _AGENT_EVENT.unpack_from(data, offset)[1]
+            offset = self._skip(offset)
+        return last
+
+    def _read_keyframe(self, offset):
+        data = self.data
+        _, step = _AGENT_EVENT.unpack_from(data, offset)
+        offset += _AGENT_EVENT.size
+        positions, energy, movements, flags = [], [], [], []
+        for _ in range(self.num_agents):
+            x, y, e, m, f = _AGENT_STATE.unpack_from(data, offset)
+            offset += _AGENT_STATE.size
+            positions.append((x, y))
+            energy.append(e)
+            movements.append(m)
+            flags.append(f)
+        count, = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        values = array("I", data[offset:offset + 8 * count])
+        offset += 8 * count
+        dirt = set(zip(values[0::2], values[1::2]))
+        return ReplayFrame(step, positions, energy, movements, flags, dirt), offset
+
+    def _skip(self, offset):
+        """Offset del registro que sigue al de offset."""
+        tag = self.data[offset] >> 4
+        if tag in (ENERGY, MOVES):
+            return offset + _DELTA_EVENT.size
+        if tag == DIRT:
+            return offset + _CELL_EVENT.size
+        if tag == KEYFRAME:
+            return self._read_keyframe(offset)[1]
+        return offset + _AGENT_EVENT.size
+
+    def _apply(self, offset, frame):
+        """Aplica el registro en offset. Regresa el offset siguiente."""
+        data = self.data
+        tag = data[offset] >> 4
+        if tag == MOVE:
+            _, i = _AGENT_EVENT.unpack_from(data, offset)
+            dx, dy = MOVE_CODES[data[offset] & 0x0F]
+            x, y = frame.positions[i]
+            frame.positions[i] = (x + dx, y + dy)
+            frame.energy[i] -= 1
+            frame.movements[i] += 1
+        elif tag == CLEAN:
+            _, i = _AGENT_EVENT.unpack_from(data, offset)
+            frame.dirt.discard(frame.positions[i])
+            frame.energy[i] -= 1
+        elif tag in (ENERGY, MOVES):
+            _, i, delta = _DELTA_EVENT.unpack_from(data, offset)
+            target = frame.energy if tag == ENERGY else frame.movements
+            target[i] += delta
+            return offset + _DELTA_EVENT.size
+        elif tag == DIRT:
+            _, x, y = _CELL_EVENT.unpack_from(data, offset)
+            frame.dirt.add((x, y))
+            return offset + _CELL_EVENT.size
+        elif tag in (CHARGE_START, CHARGE_STOP, DEATH, REVIVE):
+            _, i = _AGENT_EVENT.unpack_from(data, offset)
+            bit = CHARGING_FLAG if tag in (CHARGE_START, CHARGE_STOP) else DEAD_FLAG
+            if tag in (CHARGE_START, DEATH):
+                frame.flags[i] |= bit
+            else:
+                frame.flags[i] &= ~bit
+        elif tag == KEYFRAME:
+            return self._read_keyframe(offset)[1]
+        return offset + _AGENT_EVENT.size
+
+    def seek(self, step):
+        """Reconstruye el estado al final del paso step."""
+        k = bisect.bisect_right(self._keyframe_steps, step) - 1
+        if k < 0:
+            raise ValueError(f"el log empieza en el paso {self._keyframe_steps[0]}")
+
+        # Si ya vamos antes de step y no hay un keyframe más cerca, seguir de aquí
+        if self.frame is None or not (self.keyframes[k][0] <= self.frame.step <= step):
+            self.frame, self._offset = self._read_keyframe(self.keyframes[k][1])
+        while self.frame.step < step:
+            if not self.step():
+                break
+        return self.frame
+
+    def step(self):
+        """Avanza un paso. Regresa False si ya no hay más pasos grabados."""
+        data, end, frame = self.data, self._events_end, self.frame
+        offset = self._offset
+        # Saltar hasta el inicio del siguiente paso
+        while offset < end and data[offset] >> 4 != STEP:
+            offset = self._skip(offset)
+        if offset >= end:
+            return False
+
+        _, frame.step = _AGENT_EVENT.unpack_from(data, offset)
+        offset += _AGENT_EVENT.size
+        while offset < end and data[offset] >> 4 not in (STEP, KEYFRAME):
+            offset = self._apply(offset, frame)
+        self._offset = offset
+        return True
+
+    def frames(self, start=None, stop=None):
+        """
+        Itera los frames de start a stop (incluido). Es el mismo objeto
+        ReplayFrame, actualizado en cada paso.
+        """
+        self.seek(self._keyframe_steps[0] if start is None else start)
+        yield self.frame
+        while (stop is None or self.frame.step < stop) and self.step():
+            yield self.frame
@@ -0,0 +1,57 @@
+import numpy as np
+
+# Desplazamientos ortogonales (dx, dy), mismo orden que usa RandomAgent
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def _dedupe(values):
+    """Valores únicos ordenados (más rápido que np.unique para arreglos chicos)."""
+    values = np.sort(values)
+    if values.size < 2:
+        return values
+    keep = np.empty(values.size, dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def distance_field(free, sources):
+    """
+    BFS multi-fuente sobre una máscara booleana free[x, y].
+
+    Devuelve un arreglo int32 (width, height) con la distancia, en pasos
+    ortogonales, a la fuente más cercana. Las celdas bloqueadas o
+    inalcanzables quedan en -1.
+
+    Se expande un frente completo por iteración, así que el costo total es
+    O(celdas) con unas pocas llamadas de NumPy por nivel.
+    """
+    width, height = free.shape
+    flat_free = free.ravel()
+    dist = np.full(width * height, -1, dtype=np.int32)
+
+    frontier = _dedupe(
+        np.asarray([x * height + y for (x, y) in sources], dtype=np.int64)
+    )
+    frontier = frontier[flat_free[frontier]]
+    dist[frontier] = 0
+
+    level = 0
+    while frontier.size:
+        level += 1
+        xs = frontier // height
+        ys = frontier % height
+
+        candidates = []
+        for dx, dy in DIRECTIONS:
+            nx = xs + dx
+            ny = ys + dy
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+            candidates.append(nx[inside] * height + ny[inside])
+
+        frontier = np.concatenate(candidates)
+        frontier = frontier[flat_free[frontier] & (dist[frontier] < 0)]
+        frontier = _dedupe(frontier)
+        dist[frontier] = level
+
+    return dist.reshape(width, height)
@@ -0,0 +1,298 @@
+import numpy as np
+
+from .fields import distance_field
+from .streams import RandomStreams
+
+# Modos de cada roomba dentro del motor
+EXPLORE = 0
+SEEK = 1        # batería baja, va hacia un cargador
+CHARGING = 2
+DEAD = 3
+
+
+def _choose(valid, noise):
+    """
+    Para cada fila elige al azar una columna válida.
+    Regresa (columna elegida, si la fila tenía alguna opción).
+    """
+    score = np.where(valid, noise, 2.0)
+    return score.argmin(axis=1), valid.any(axis=1)
+
+
+class RoombaFleet:
+    """
+    Motor "struct-of-arrays" para flotas de miles de roombas.
+
+    Reproduce la máquina de estados de RandomAgent.step (limpiar, cargar,
+    ir al cargador, explorar) pero guarda el estado de toda la flota en
+    arreglos de NumPy y aplica cada fase en lote.
+
+    Diferencias con los agentes de Mesa:
+    - El conteo de visitas es compartido por toda la flota; un dict por
+      roomba no escala a miles de agentes.
+    - Todos los cargadores se conocen desde el inicio y el camino al más
+      cercano sale de un campo de distancias precalculado, sin BFS.
+    - No hay return_stack: al terminar de cargar solo se prioriza un vecino
+      no visitado.
+
+    El ruido de cada paso sale del flujo ("fleet", paso) de RandomStreams y
+    siempre se sortea para toda la flota, así que no depende de cómo se
+    repartan los roombas en lotes.
+    """
+
+    def __init__(self, width, height, obstacles=(), chargers=(), dirt=(), starts=(),
+                 energy=100, max_energy=100, low_battery=40, charge_rate=5, seed=None):
+        self.width = width
+        self.height = height
+        self.max_energy = max_energy
+        self.low_battery = low_battery
+        self.charge_rate = charge_rate
+        self.streams = RandomStreams(seed)
+        self.steps = 0
+
+        # Mapa: el borde siempre es pared, igual que en RandomModel
+        free = np.ones((width, height), dtype=bool)
+        free[0, :] = free[-1, :] = False
+        free[:, 0] = free[:, -1] = False
+        for x, y in obstacles:
+            free[x, y] = False
+
+        cells = width * height
+        self.free = free.ravel()
+        self.charger = np.zeros(cells, dtype=bool)
+        self.charger[self._flat(chargers)] = True
+        self.dirt = np.zeros(cells, dtype=bool)
+        self.dirt[self._flat(dirt)] = True
+        self.visits = np.zeros(cells, dtype=np.int32)
+        self.charger_dist = distance_field(free, chargers).ravel()
+
+        self._init_roombas(self._flat(starts), energy)
+        self._init_offsets()
+
+    def _init_roombas(self, pos, energy):
+        """Estado por roomba."""
+        self.pos = pos
+        n = pos.size
+        self.energy = np.full(n, energy, dtype=np.int32)
+        self.mode = np.full(n, EXPLORE, dtype=np.uint8)
+        self.charging = np.zeros(n, dtype=bool)
+        self.just_finished = np.zeros(n, dtype=bool)
+        self.movements = np.zeros(n, dtype=np.int64)
+
+    def _init_offsets(self):
+        # Vecindades como desplazamientos sobre el índice plano x * height + y
+        h = self.height
+        self._ortho = np.array([h, -h, 1, -1], dtype=np.int64)
+        self._moore = np.array([-h - 1, -h, -h + 1, -1, 1, h - 1, h, h + 1], dtype=np.int64)
+
+    @classmethod
+    def view(cls, height, free, charger, charger_dist, dirt, visits,
+             max_energy=100, low_battery=40, charge_rate=5, seed=None, steps=0):
+        """
+        Flota sobre una franja de columnas completas de otro mapa (p. ej. una
+        región de PartitionedFleet con su halo). free, charger y
+        charger_dist se usan tal cual, sin copiarlos, así que pueden ser
+        vistas de memoria compartida; dirt y visits son de la flota. Los
+        índices planos son relativos al inicio de la franja y la flota
+        empieza sin roombas.
+        """
+        fleet = cls.__new__(cls)
+        fleet.width, fleet.height = free.size // height, height
+        fleet.max_energy = max_energy
+        fleet.low_battery = low_battery
+        fleet.charge_rate = charge_rate
+        fleet.streams = RandomStreams(seed)
+        fleet.steps = steps
+        fleet.free = free
+        fleet.charger = charger
+        fleet.charger_dist = charger_dist
+        fleet.dirt = dirt
+        fleet.visits = visits
+        fleet._init_roombas(np.zeros(0, dtype=np.int64), max_energy)
+        fleet._init_offsets()
+        return fleet
+
+    @classmethod
+    def from_model(cls, model, seed=None):
+        """Construye la flota con el mismo mapa y roombas de un RandomModel."""
+        from .agent import RandomAgent, DirtPatch, ChargingCell
+
+        def coords(agent_type):
+            return [a.cell.coordinate for a in model.agents_by_type.get(agent_type, [])]
+
+        # Con sparse=True las paredes están en el mapa de bits, no son
+        # ObstacleAgent; la máscara del modelo cubre los dos casos
+        blocked = np.argwhere(~model._free_mask())
+
+        roombas = list(model.agents_by_type.get(RandomAgent, []))
+        fleet = cls(
+            model.width,
+            model.height,
+            obstacles=[tuple(coord) for coord in blocked],
+            chargers=coords(ChargingCell),
+            dirt=coords(DirtPatch),
+            starts=[a.cell.coordinate for a in roombas],
+            seed=model.seed if seed is None else seed,
+        )
+        fleet.energy[:] = [a.energy for a in roombas]
+        fleet.charging[:] = [a.charging for a in roombas]
+        return fleet
+
+    def _flat(self, coords):
+        arr = np.asarray(list(coords), dtype=np.int64).reshape(-1, 2)
+        return arr[:, 0] * self.height + arr[:, 1]
+
+    @property
+    def num_agents(self):
+        return self.pos.size
+
+    @property
+    def dirt_count(self):
+        return int(self.dirt.sum())
+
+    def coordinates(self):
+        """Posiciones (x, y) de todos los roombas."""
+        return np.stack([self.pos // self.height, self.pos % self.height], axis=1)
+
+    def _clean(self, priority):
+        """Limpia la celda actual; si hay varios roombas, limpia el de mayor prioridad."""
+        pos = self.pos
+        on_dirt = np.flatnonzero(self.dirt[pos])
+        if not on_dirt.size:
+            return
+        order = on_dirt[np.lexsort((priority[on_dirt], pos[on_dirt]))]
+        _, first = np.unique(pos[order], return_index=True)
+        cleaners = order[first]
+        self.dirt[pos[cleaners]] = False
+        self.energy[cleaners] -= 1
+
+    def _charge(self):
+        """
+        Carga a los roombas que están sobre un cargador (incluye a los que
+        se quedaron sin energía encima de uno).
+        Regresa la máscara de roombas que todavía pueden actuar este paso.
+        """
+        pos = self.pos
+        on_charger = self.charger[pos]
+        alive = self.energy > 0
+
+        idx = np.flatnonzero(on_charger & (~alive | self.charging))
+        if idx.size:
+            self.charging[idx] = True
+            self.energy[idx] += self.charge_rate
+            full = idx[self.energy[idx] >= self.max_energy]
+            self.charging[full] = False
+            self.just_finished[full] = True
+            np.add.at(self.visits, pos[idx], 1)
+
+        return alive & ~self.charging
+
+    def _plan(self, active, noise):
+        """
+        Decide el destino de cada roomba activo.
+        Regresa (destinos, máscara de roombas que van al cargador,
+        máscara de roombas que gastan un movimiento).
+        """
+        pos = self.pos
+        target = pos.copy()
+        low = self.energy <= self.low_battery
+        seek = active & low
+        resume = active & ~low & self.just_finished
+        explore = active & ~low & ~self.just_finished
+
+        # Batería baja: bajar por el campo de distancias al cargador más cercano
+        arrived = seek & self.charger[pos]
+        self.charging[arrived] = True
+        s = np.flatnonzero(seek & ~arrived)
+        if s.size:
+            nb = pos[s, None] + self._ortho
+            d = self.charger_dist[nb]
+            ok = self.free[nb] & (d >= 0) & (d == self.charger_dist[pos[s], None] - 1)
+            j, has = _choose(ok, noise[s, :4])
+            target[s[has]] = nb[has, j[has]]
+
+        # Recién cargado: solo se mueve si hay un vecino sin visitar
+        spent = seek | explore
+        r = np.flatnonzero(resume)
+        if r.size:
+            nb = pos[r, None] + self._ortho
+            ok = self.free[nb] & (self.visits[nb] == 0)
+            j, has = _choose(ok, noise[r, :4])
+            target[r[has]] = nb[has, j[has]]
+            spent[r[has]] = True
+            self.just_finished[r] = False
+
+        # Exploración: suciedad en la vecindad de Moore, si no el vecino menos visitado
+        e = np.flatnonzero(explore)
+        if e.size:
+            nb = pos[e, None] + self._moore
+            j, has_dirt = _choose(self.dirt[nb], noise[e])
+            target[e[has_dirt]] = nb[has_dirt, j[has_dirt]]
+
+            rest = e[~has_dirt]
+            nb = pos[rest, None] + self._ortho
+            ok = self.free[nb]
+            score = np.where(ok, self.visits[nb] + noise[rest, :4], np.inf)
+            j = score.argmin(axis=1)
+            has = ok.any(axis=1)
+            target[rest[has]] = nb[has, j[has]]
+
+        return target, seek, spent
+
+    def _resolve(self, target, seek, priority):
+        """
+        Pasada vectorizada de conflictos: un roomba que va a cargar no entra
+        a un cargador ocupado y, si varios llegan al mismo cargador libre,
+        entra el de mayor prioridad.
+        """
+        pos = self.pos
+        moving = target != pos
+        cand = np.flatnonzero(seek & moving & self.charger[target])
+        if not cand.size:
+            return target
+
+        blocked = np.isin(target[cand], pos[~moving])
+        losers = [cand[blocked]]
+        cand = cand[~blocked]
+
+        order = cand[np.lexsort((priority[cand], target[cand]))]
+        _, first = np.unique(target[order], return_index=True)
+        winners = np.zeros(order.size, dtype=bool)
+        winners[first] = True
+        losers.append(order[~winners])
+
+        losers = np.concatenate(losers)
+        target[losers] = pos[losers]
+        return target
+
+    def _commit(self, target, spent):
+        self.pos = target
+        self.energy[spent] -= 1
+        self.movements[spent] += 1
+        np.add.at(self.visits, target[spent], 1)
+
+    def _update_modes(self):
+        mode = np.full(self.pos.size, EXPLORE, dtype=np.uint8)
+        mode[self.energy <= self.low_battery] = SEEK
+        mode[self.charging] = CHARGING
+        mode[(self.energy <= 0) & ~self.charger[self.pos]] = DEAD
+        self.mode = mode
+
+    def step(self):
+        """Avanza un paso a toda la flota."""
+        n = self.pos.size
+        rng = self.streams.generator("fleet", self.steps)
+        priority = rng.random(n)
+        noise = rng.random((n, 8))
+
+        self._clean(priority)
+        active = self._charge()
+        target, seek, spent = self._plan(active, noise)
+        target = self._resolve(target, seek, priority)
+        self._commit(target, spent)
+        self._update_modes()
+        self.steps += 1
+
+    def run(self, steps):
+        for _ in range(steps):
+            self.step()
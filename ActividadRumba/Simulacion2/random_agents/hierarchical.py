@@ -0,0 +1,320 @@
+import heapq
+from collections import deque
+
+from .fields import DIRECTIONS
+
+# Tramos de frontera más largos que esto tienen dos entradas (una en cada punta)
+LONG_ENTRANCE = 6
+
+
+class HierarchicalPlanner:
+    """
+    Búsqueda de caminos jerárquica (estilo HPA*) para pisos grandes.
+
+    El piso se divide en clusters de cluster_size x cluster_size. En cada
+    frontera entre dos clusters vecinos se ponen entradas (pares de celdas
+    libres, una de cada lado) y dentro de cada cluster se guardan las
+    distancias entre sus entradas. Un camino largo se busca primero con A*
+    sobre ese grafo abstracto y después se refina tramo por tramo con BFS
+    local dentro de cada cluster. Los caminos son casi óptimos, no siempre
+    los más cortos.
+
+    Todo se construye la primera vez que una búsqueda toca el cluster, así
+    que en un piso enorme solo se pagan los clusters cerca de las rutas.
+    Si hay un DynamicLayout, las celdas que se bloquean o desbloquean solo
+    invalidan su cluster (y las entradas que comparte con sus vecinos).
+
+    next_step() y distance() guardan las rutas ya refinadas por meta, así
+    que seguir una ruta paso a paso es O(1).
+    """
+
+    def __init__(self, free, cluster_size=16, layout=None):
+        self.free = free
+        self.width, self.height = free.shape
+        self.cluster_size = cluster_size
+        self.layout = layout
+        self.version = layout.version if layout is not None else 0
+        self.blocked = set(layout.blocked) if layout is not None else set()
+
+        self._masks = {}     # cluster -> filas de bools (coordenadas locales)
+        self._borders = {}   # (cluster, cluster vecino) -> [(celda, celda vecina)]
+        self._inter = {}     # cluster -> {entrada: [celdas vecinas en otros clusters]}
+        self._intra = {}     # cluster -> {entrada: {entrada: distancia}} (perezoso)
+        self._routes = {}    # meta -> {celda: (siguiente celda, pasos restantes)}
+
+    # -- Clusters --------------------------------------------------------
+
+    def cluster_of(self, coord):
+        return (coord[0] // self.cluster_size, coord[1] // self.cluster_size)
+
+    def _bounds(self, cluster):
+        size = self.cluster_size
+        x0, y0 = cluster[0] * size, cluster[1] * size
+        return x0, y0, min(x0 + size, self.width), min(y0 + size, self.height)
+
+    def _mask(self, cluster):
+        rows = self._masks.get(cluster)
+        if rows is None:
+            x0, y0, x1, y1 = self._bounds(cluster)
+            rows = self.free[x0:x1, y0:y1].tolist()
+            for (x, y) in self.blocked:
+                if x0 <= x < x1 and y0 <= y < y1:
+                    rows[x - x0][y - y0] = False
+            self._masks[cluster] = rows
+        return rows
+
+    def passable(self, coord):
+        x, y = coord
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        cluster = self.cluster_of(coord)
+        x0, y0, _, _ = self._bounds(cluster)
+        return self._mask(cluster)[x - x0][y - y0]
+
+    def _neighbor_clusters(self, cluster):
+        cx, cy = cluster
+        max_cx = (self.width - 1) // self.cluster_size
+        max_cy = (self.height - 1) // self.cluster_size
+        for dx, dy in DIRECTIONS:
+            nx, ny = cx + dx, cy + dy
+            if 0 <= nx <= max_cx and 0 <= ny <= max_cy:
+                yield (nx, ny)
+
+    # -- Entradas --------------------------------------------------------
+
+    def _border(self, a, b):
+        """Pares (celda en a, celda en b) por donde se cruza de a a b."""
+        if (a, b) in self._borders:
+            return self._borders[(a, b)]
+        if (b, a) in self._borders:
+            return [(q, p) for (p, q) in self._borders[(b, a)]]
+
+        # Recorrer la frontera desde el cluster de la izquierda / de abajo
+        first, second = (a, b) if a < b else (b, a)
+        x0, y0, x1, y1 = self._bounds(first)
+        if second[0] != first[0]:
+            line = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            line = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+
+        pairs = []
+        run = []
+        for p, q in line + [(None, None)]:
+            if p is not None and self.passable(p) and self.passable(q):
+                run.append((p, q))
+                continue
+            if run:
+                if len(run) >= LONG_ENTRANCE:
+                    pairs.extend((run[0], run[-1]))
+                else:
+                    pairs.append(run[len(run) // 2])
+                run = []
+
+        self._borders[(first, second)] = pairs
+        return pairs if first == a else [(q, p) for (p, q) in pairs]
+
+    def _entrances(self, cluster):
+        """Celdas de entrada del cluster y sus pares en clusters vecinos."""
+        inter = self._inter.get(cluster)
+        if inter is None:
+            inter = {}
+            for other in self._neighbor_clusters(cluster):
+                for p, q in self._border(cluster, other):
+                    inter.setdefault(p, []).append(q)
+            self._inter[cluster] = inter
+        return inter
+
+    def _local_bfs(self, cluster, source, goal=None):
+        """BFS dentro del cluster. Regresa (distancias, padres)."""
+        x0, y0, x1, y1 = self._bounds(cluster)
+        rows = self._mask(cluster)
+        dist = {source: 0}
+        parent = {source: None}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == goal:
+                break
+            x, y = current
+            d = dist[current] + 1
+            for dx, dy in DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if x0 <= nx < x1 and y0 <= ny < y1 and rows[nx - x0][ny - y0]:
+                    ncoord = (nx, ny)
+                    if ncoord not in dist:
+                        dist[ncoord] = d
+                        parent[ncoord] = current
+                        queue.append(ncoord)
+        return dist, parent
+
+    def _intra_edges(self, cluster, node):
+        """
+        Distancias de la entrada node a las demás entradas del cluster. Se
+        calculan con un BFS local la primera vez que se expande node.
+        """
+        edges = self._intra.setdefault(cluster, {})
+        node_edges = edges.get(node)
+        if node_edges is None:
+            dist, _ = self._local_bfs(cluster, node)
+            node_edges = {
+                other: dist[other]
+                for other in self._entrances(cluster)
+                if other != node and other in dist
+            }
+            edges[node] = node_edges
+        return node_edges
+
+    # -- Cambios en el layout -------------------------------------------
+
+    def invalidate(self, coord):
+        """Olvida lo que dependía del cluster de coord."""
+        cluster = self.cluster_of(coord)
+        self._masks.pop(cluster, None)
+        self._inter.pop(cluster, None)
+        self._intra.pop(cluster, None)
+        for other in self._neighbor_clusters(cluster):
+            self._borders.pop((cluster, other), None)
+            self._borders.pop((other, cluster), None)
+            # Sus entradas en esa frontera pudieron cambiar
+            self._inter.pop(other, None)
+            self._intra.pop(other, None)
+        self._routes.clear()
+
+    def _refresh(self):
+        layout = self.layout
+        if layout is None or layout.version == self.version:
+            return
+        changes = layout.changes_since(self.version)
+        self.version = layout.version
+        if changes is None:
+            changes = self.blocked ^ layout.blocked
+
+        # Solo importan los bloqueos; los roombas (obstáculos suaves) no
+        for coord in changes:
+            now = layout.is_blocked(coord)
+            if now != (coord in self.blocked):
+                if now:
+                    self.blocked.add(coord)
+                else:
+                    self.blocked.discard(coord)
+                self.invalidate(coord)
+
+    # -- Búsqueda --------------------------------------------------------
+
+    def _abstract_path(self, start, goal):
+        """A* sobre las entradas, con start y goal conectados temporalmente."""
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        start_dist, _ = self._local_bfs(start_cluster, start)
+        goal_dist, _ = self._local_bfs(goal_cluster, goal)
+
+        def h(coord):
+            return abs(coord[0] - goal[0]) + abs(coord[1] - goal[1])
+
+        g = {start: 0}
+        parent = {start: None}
+        # En empates se prefiere el nodo más avanzado (mayor g)
+        open_ = [(h(start), 0, start)]
+        closed = set()
+        while open_:
+            _, d, node = heapq.heappop(open_)
+            d = -d
+            if node == goal:
+                break
+            if node in closed:
+                continue
+            closed.add(node)
+
+            cluster = self.cluster_of(node)
+            edges = []
+            if node == start:
+                if goal in start_dist:
+                    edges.append((goal, start_dist[goal]))
+                edges.extend(
+                    (other, start_dist[other])
+                    for other in self._entrances(cluster) if other in start_dist
+                )
+                # start también puede ser una entrada
+                edges.extend((q, 1) for q in self._entrances(cluster).get(start, ()))
+            else:
+                edges.extend(self._intra_edges(cluster, node).items())
+                edges.extend((q, 1) for q in self._entrances(cluster)[node])
+            if cluster == goal_cluster and node in goal_dist:
+                edges.append((goal, goal_dist[node]))
+
+            for other, cost in edges:
+                nd = d + cost
+                if nd < g.get(other, float("inf")):
+                    g[other] = nd
+                    parent[other] = node
+                    heapq.heappush(open_, (nd + h(other), -nd, other))
+
+        if goal not in parent:
+            return None
+        nodes = []
+        node = goal
+        while node is not None:
+            nodes.append(node)
+            node = parent[node]
+        nodes.reverse()
+        return nodes
+
+    def find_path(self, start, goal):
+        """
+        Camino (lista de coordenadas, sin start) de start a goal, o [] si
+        no hay camino.
+        """
+        self._refresh()
+        if start == goal or not self.passable(start) or not self.passable(goal):
+            return []
+
+        nodes = self._abstract_path(start, goal)
+        if nodes is None:
+            return []
+
+        # Refinar: cada tramo abstracto es un paso entre clusters o un BFS local
+        path = []
+        for a, b in zip(nodes, nodes[1:]):
+            if abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1:
+                path.append(b)
+                continue
+            _, parent = self._local_bfs(self.cluster_of(a), a, goal=b)
+            segment = []
+            node = b
+            while node != a:
+                segment.append(node)
+                node = parent[node]
+            path.extend(reversed(segment))
+        return path
+
+    def _route(self, start, goal):
+        self._refresh()
+        route = self._routes.setdefault(goal, {})
+        if start not in route:
+            path = self.find_path(start, goal)
+            if not path:
+                return None
+            coords = [start] + path
+            remaining = len(path)
+            for coord, nxt in zip(coords, path):
+                route[coord] = (nxt, remaining)
+                remaining -= 1
+        return route
+
+    def distance(self, start, goal):
+        """Pasos de start a goal por la ruta jerárquica, o -1 si no hay camino."""
+        if start == goal:
+            return 0
+        route = self._route(start, goal)
+        if route is None:
+            return -1
+        return route[start][1]
+
+    def next_step(self, start, goal):
+        """Siguiente coordenada de start hacia goal, o None."""
+        if start == goal:
+            return None
+        route = self._route(start, goal)
+        if route is None:
+            return None
+        return route[start][0]
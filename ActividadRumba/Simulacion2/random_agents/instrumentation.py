@@ -0,0 +1,248 @@
+import functools
+import time
+import tracemalloc
+
+PHASES = ("sensing", "planning", "moving", "cleaning", "charging", "collect")
+COUNTERS = ("bfs_calls", "bfs_nodes", "path_cache_hits", "isinstance_scans")
+
+# Métodos de RandomAgent que se miden y la fase a la que pertenecen
+AGENT_PHASES = {
+    "_see_chargers_in_neighborhood": "sensing",
+    "_pick_unvisited_neighbor": "sensing",
+    "_bfs_path": "planning",
+    "_step_to_frontier": "planning",
+    "_next_step_to_charger": "planning",
+    "move": "moving",
+    "moveToCharger": "moving",
+    "_follow_return_path": "moving",
+    "_explore_step": "moving",
+    "_step_towards": "moving",
+    "clean": "cleaning",
+    "_charge_if_on_station": "charging",
+    "_sleep_while_charging": "charging",
+    "_settle_sleep": "charging",
+}
+
+
+class Profiler:
+    """
+    Instrumentación opcional de RandomModel.
+
+    Mide el tiempo de cada fase (exclusivo: si planear pasa dentro de
+    moverse, ese tiempo cuenta solo como planear) y cuenta BFS, nodos
+    expandidos, reutilización de caminos y revisiones isinstance de celdas.
+    path_cache_hits cuenta las consultas hacia un cargador que no buscaron
+    de nuevo: campo de distancias ya calculado, ruta jerárquica guardada o
+    D* Lite del roomba reutilizado (que solo repara lo que cambió).
+    Con tracemalloc_every=N guarda la memoria cada N pasos.
+
+    attach() reemplaza métodos solo en las instancias del modelo (no en
+    las clases), así que con model.profiler = None no hay costo extra.
+    Si se usó tracemalloc, llamar stop() al terminar.
+    Los totales quedan en totals/counters, los del último paso en
+    last_step, y reporters() da columnas para el DataCollector.
+    """
+
+    def __init__(self, tracemalloc_every=None, keep_snapshots=10):
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.current = dict.fromkeys(PHASES + COUNTERS, 0)
+        self.last_step = dict(self.current)
+        self.tracemalloc_every = tracemalloc_every
+        self.keep_snapshots = keep_snapshots
+        self.memory = []   # (paso, bytes actuales, pico, snapshot)
+        self._stack = []   # [fase, inicio] de las fases abiertas
+        self._bfs_depth = 0
+        self._started_tracemalloc = False
+
+    # -- Medición ------------------------------------------------------------
+
+    def _enter(self, phase):
+        now = time.perf_counter()
+        if self._stack:
+            outer = self._stack[-1]
+            self.current[outer[0]] += now - outer[1]
+        self._stack.append([phase, now])
+
+    def _exit(self):
+        now = time.perf_counter()
+        phase, start = self._stack.pop()
+        self.current[phase] += now - start
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def timed(self, phase, func):
+        """Envuelve func para que su tiempo cuente en phase."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self._enter(phase)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit()
+        return wrapper
+
+    def count(self, name, n=1):
+        self.current[name] += n
+
+    # -- Conexión con el modelo ---------------------------------------------
+
+    def attach(self, model):
+        """Instrumenta el modelo y sus roombas."""
+        from .agent import RandomAgent
+
+        model.profiler = self
+        for agent in model.agents_by_type.get(RandomAgent, []):
+            self._attach_agent(agent)
+
+        model.datacollector.collect = self.timed("collect", model.datacollector.collect)
+        model.dirt_index.nearest = self.timed("sensing", model.dirt_index.nearest)
+
+        is_blocked = model.is_blocked
+
+        def counted_is_blocked(cell):
+            if not model.sparse:
+                self.current["isinstance_scans"] += 1
+            return is_blocked(cell)
+        model.is_blocked = counted_is_blocked
+
+        scheduler = model.charger_scheduler
+        field = scheduler._field
+
+        def counted_field(charger):
+            if charger in scheduler._fields:
+                self.current["path_cache_hits"] += 1
+            return field(charger)
+        scheduler._field = counted_field
+
+        planner = model.path_planner
+        if planner is not None:
+            route = planner._route
+            find_path = planner.find_path
+            searched = [False]
+
+            def counted_find_path(start, goal):
+                searched[0] = True
+                return find_path(start, goal)
+
+            def counted_route(start, goal):
+                searched[0] = False
+                result = route(start, goal)
+                if result is not None and not searched[0]:
+                    self.current["path_cache_hits"] += 1
+                return result
+            planner.find_path = counted_find_path
+            planner._route = counted_route
+
+        if self.tracemalloc_every and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return self
+
+    def stop(self):
+        """Apaga tracemalloc si lo encendió este profiler (hace lento todo el proceso)."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def detach(self, model):
+        """Quita la instrumentación del modelo (p. ej. antes de model.reset())."""
+        self.stop()
+        model.__dict__.pop("is_blocked", None)
+        if model.path_planner is not None:
+            model.path_planner.__dict__.pop("_route", None)
+            model.path_planner.__dict__.pop("find_path", None)
+        model.profiler = None
+
+    def _attach_agent(self, agent):
+        for name, phase in AGENT_PHASES.items():
+            setattr(agent, name, self.timed(phase, getattr(agent, name)))
+
+        bfs_path = agent._bfs_path
+        neighbors = agent._neighbors_no_obstacle
+        cell_has = agent._cell_has
+
+        def counted_bfs(*args, **kwargs):
+            self.current["bfs_calls"] += 1
+            self._bfs_depth += 1
+            try:
+                return bfs_path(*args, **kwargs)
+            finally:
+                self._bfs_depth -= 1
+
+        def counted_neighbors(cell):
+            # Dentro del BFS, cada nodo expandido pide sus vecinos una vez
+            if self._bfs_depth:
+                self.current["bfs_nodes"] += 1
+            return neighbors(cell)
+
+        def counted_cell_has(cell, agent_type):
+            self.current["isinstance_scans"] += 1
+            return cell_has(cell, agent_type)
+
+        next_step_to_charger = agent._next_step_to_charger
+
+        def counted_next_step_to_charger(target):
+            planner = agent.charger_planner
+            if agent.model.layout is not None and planner is not None and planner.goal == target:
+                self.current["path_cache_hits"] += 1
+            return next_step_to_charger(target)
+
+        agent._bfs_path = counted_bfs
+        agent._neighbors_no_obstacle = counted_neighbors
+        agent._cell_has = counted_cell_has
+        agent._next_step_to_charger = counted_next_step_to_charger
+
+    def end_step(self, step):
+        """Cierra el paso: acumula totales y, si toca, toma memoria."""
+        for phase in PHASES:
+            self.totals[phase] += self.current[phase]
+        for name in COUNTERS:
+            self.counters[name] += self.current[name]
+        self.last_step = self.current
+        self.current = dict.fromkeys(PHASES + COUNTERS, 0)
+
+        if self.tracemalloc_every and step % self.tracemalloc_every == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            self.memory.append((step, current, peak, tracemalloc.take_snapshot()))
+            del self.memory[:-self.keep_snapshots]
+
+    # -- Salida ----------------------------------------------------------------
+
+    def reporters(self):
+        """
+        Reporters por paso para DataCollector(model_reporters=...).
+
+        time_collect es el del paso anterior: los reporters corren dentro
+        de collect, cuando su tiempo todavía no se suma.
+        """
+        reporters = {
+            f"time_{phase}": functools.partial(_current, name=phase)
+            for phase in PHASES if phase != "collect"
+        }
+        reporters["time_collect"] = functools.partial(_last_step, name="collect")
+        reporters.update({name: functools.partial(_current, name=name) for name in COUNTERS})
+        if self.tracemalloc_every:
+            reporters["traced_memory"] = lambda m: tracemalloc.get_traced_memory()[0]
+        return reporters
+
+    def report(self):
+        """Resumen en texto de los totales."""
+        total = sum(self.totals.values()) or 1.0
+        lines = [f"{'fase':12s} {'segundos':>10s} {'%':>6s}"]
+        for phase in PHASES:
+            seconds = self.totals[phase]
+            lines.append(f"{phase:12s} {seconds:10.4f} {100 * seconds / total:6.1f}")
+        lines.extend(f"{name:18s} {value:>10d}" for name, value in self.counters.items())
+        if self.memory:
+            step, current, peak, _ = self.memory[-1]
+            lines.append(f"memoria (paso {step}): {current / 1e6:.1f} MB, pico {peak / 1e6:.1f} MB")
+        return "\n".join(lines)
+
+
+def _current(model, name):
+    return model.profiler.current[name]
+
+
+def _last_step(model, name):
+    return model.profiler.last_step[name]
@@ -0,0 +1,74 @@
+class FleetMetrics:
+    """
+    Métricas de eficiencia de los roombas, actualizadas en O(1) por evento.
+
+    Los roombas avisan al visitar una celda, limpiar, gastar energía y
+    cargar; los reporters solo dividen contadores, así que no hay que
+    recorrer los visit_count de cada roomba.
+
+    - coverage: % de celdas libres visitadas al menos una vez
+    - revisit_ratio: fracción de movimientos que llegaron a una celda ya visitada
+    - cleaned_per_energy: suciedad limpiada por unidad de energía gastada
+    - idle_at_charger: fracción de los pasos-roomba que se pasaron cargando
+      (los pasos que un roomba duerme cargando cuentan cuando despierta)
+    """
+
+    def __init__(self, coverage):
+        self.coverage = coverage
+        self.free_cells = int(coverage.free.sum())
+        self.roombas = 0
+        self.moves = 0
+        self.revisits = 0
+        self.cleaned = 0
+        self.energy_used = 0
+        self.charge_ticks = 0
+
+    # -- Eventos -------------------------------------------------------------
+
+    def visited(self, moved, first):
+        """Un roomba registró su celda; moved=False si no se movió (cargando)."""
+        if moved:
+            self.moves += 1
+            if not first:
+                self.revisits += 1
+
+    def cleaned_dirt(self, n=1):
+        self.cleaned += n
+
+    def spent(self, energy):
+        self.energy_used += energy
+
+    def charged(self, ticks=1):
+        self.charge_ticks += ticks
+
+    # -- Valores -------------------------------------------------------------
+
+    def coverage_pct(self):
+        return 100 * self.coverage.covered / self.free_cells if self.free_cells else 0.0
+
+    def revisit_ratio(self):
+        return self.revisits / self.moves if self.moves else 0.0
+
+    def cleaned_per_energy(self):
+        return self.cleaned / self.energy_used if self.energy_used else 0.0
+
+    def idle_at_charger(self, steps):
+        total = steps * self.roombas
+        return self.charge_ticks / total if total else 0.0
+
+    def reporters(self):
+        """Reporters para DataCollector(model_reporters=...)."""
+        return {
+            "Coverage": lambda m: m.metrics.coverage_pct(),
+            "Revisit_ratio": lambda m: m.metrics.revisit_ratio(),
+            "Cleaned_per_energy": lambda m: m.metrics.cleaned_per_energy(),
+            "Idle_at_charger": lambda m: m.metrics.idle_at_charger(m.steps),
+        }
+
+    def state(self):
+        return dict(moves=self.moves, revisits=self.revisits, cleaned=self.cleaned,
+                    energy_used=self.energy_used, charge_ticks=self.charge_ticks)
+
+    def load(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
@@ -1,8 +1,24 @@
+import numpy as np
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
 from mesa.datacollection import DataCollector
 
+from sim_tools.model_pool import clear_agents, reset_model_state
+from sim_tools.placement import border_coords, sample_placements
+
 from .agent import RandomAgent, ObstacleAgent, DirtPatch, ChargingCell
+from .coverage import CoverageMap
+from .chargers import ChargerScheduler
+from .dirt_index import DirtIndex
+from .return_planner import ReturnPlanner
+from .sparse_grid import SparseGrid
+from .activation import ActivationSchedule, CHARGER_RELEASED
+from .dirt_spawner import DirtSpawner
+from .dynamic_layout import DynamicLayout
+from .hierarchical import HierarchicalPlanner
+from .streams import RandomStreams
+from .instrumentation import Profiler
+from .metrics import FleetMetrics
 
 class RandomModel(Model):
     """
@@ -10,10 +26,58 @@ class RandomModel(Model):
     Args:
         num_agents: Number of agents in the simulation
         height, width: The size of the grid to model
+        sensing_radius: Distancia (Chebyshev) a la que un roomba detecta suciedad
+        sparse: Usar SparseGrid (celdas por bloques y paredes en mapa de bits)
+            para pisos muy grandes
+        dirt_rate: Probabilidad por celda y por paso de que aparezca suciedad
+        dirt_heatmap: Arreglo [x, y] opcional que multiplica dirt_rate por celda
+        dynamic: Activar obstáculos dinámicos (model.layout): puertas y muebles
+            que se bloquean durante la simulación y roombas como obstáculos
+            suaves. Los viajes al cargador se planean con D* Lite.
+        hierarchical: Planear rutas largas por clusters (HierarchicalPlanner)
+            en vez de campos de distancias. None = solo si sparse.
+        profile: Medir tiempos por fase y contadores (model.profiler); con
+            tracemalloc_every=N además se toma la memoria cada N pasos
     """
-    def __init__(self, num_agents=1, num_obstacle = 50, dirt = 200, charge = 5, width=8, height=8, seed=42):
+    def __init__(self, num_agents=1, num_obstacle = 50, dirt = 200, charge = 5, width=8, height=8, seed=42,
+                 sensing_radius=1, sparse=False, dirt_rate=0.0, dirt_heatmap=None,
+                 dynamic=False, hierarchical=None, profile=False, tracemalloc_every=None):
 
         super().__init__(seed=seed)
+        self.grid = None
+        self.profiler = None
+        self.reset(
+            num_agents=num_agents, num_obstacle=num_obstacle, dirt=dirt, charge=charge,
+            width=width, height=height, seed=seed, sensing_radius=sensing_radius,
+            sparse=sparse, dirt_rate=dirt_rate, dirt_heatmap=dirt_heatmap, dynamic=dynamic,
+            hierarchical=hierarchical, profile=profile, tracemalloc_every=tracemalloc_every,
+        )
+
+    def reset(self, num_agents=1, num_obstacle = 50, dirt = 200, charge = 5, width=8, height=8, seed=42,
+              sensing_radius=1, sparse=False, dirt_rate=0.0, dirt_heatmap=None,
+              dynamic=False, hierarchical=None, profile=False, tracemalloc_every=None):
+        """
+        Reinicia el modelo en su lugar con otros parámetros; queda igual que
+        RandomModel(**params). Si el tamaño no cambia se reutiliza el grid
+        (celdas y vecindades ya conectadas) y solo se recrean los agentes.
+        """
+        # En __init__ todavía no hay grid ni agentes que limpiar
+        reused = self.grid is not None
+        if reused:
+            reset_model_state(self, seed)
+        if self.profiler is not None:
+            self.profiler.detach(self)
+
+        reuse_grid = (
+            isinstance(self.grid, OrthogonalMooreGrid)
+            and not sparse
+            and (self.grid.width, self.grid.height) == (width, height)
+        )
+        if not reuse_grid:
+            self.grid = None
+        if reused:
+            clear_agents(self)
+
         self.num_agents = num_agents
         self.num_obstacle = num_obstacle
         self.dirt = dirt
@@ -21,65 +85,129 @@ class RandomModel(Model):
         self.seed = seed
         self.width = width
         self.height = height
+        self.sensing_radius = sensing_radius
+        self.sparse = sparse
+        self.dirt_rate = dirt_rate
+        self.dirt_heatmap = dirt_heatmap
 
-        self.grid = OrthogonalMooreGrid([width, height], torus=False)
+        # Instrumentación opcional (None = sin costo extra)
+        self.profiler = None
 
-        # Identify the coordinates of the border of the grid
-        border = [(x,y)
-                  for y in range(height)
-                  for x in range(width)
-                  if y in [0, height-1] or x in [0, width - 1]]
+        # EventRecorder se engancha aquí mientras graba (ver event_log.py)
+        self.event_log = None
 
-        # Create the border cells
-        for _, cell in enumerate(self.grid):
-            if cell.coordinate in border:
-                ObstacleAgent(self, cell=cell)
-        
-        ObstacleAgent.create_agents(
-            self,
-            self.num_obstacle,
-            cell=self.random.choices(self.grid.empties.cells, k=self.num_obstacle)
+        # Un flujo aleatorio por subsistema y por roomba (ver RandomStreams)
+        self.streams = RandomStreams(self._seed)
+        self.roomba_count = 0   # RandomAgent toma su índice (y su flujo) de aquí
+
+        # Índice espacial de la suciedad (DirtPatch se registra solo)
+        self.dirt_index = DirtIndex()
+
+        # Solo los roombas se agendan; obstáculos, cargadores y suciedad no
+        self.activation = ActivationSchedule(self.streams.python("activation"))
+
+        if self.sparse:
+            self.grid = SparseGrid((width, height), random=self.random)
+        elif self.grid is None:
+            # Con el random del modelo, reset() y los checkpoints también lo reinician
+            self.grid = OrthogonalMooreGrid([width, height], torus=False, random=self.random)
+
+        # Cargadores, obstáculos y suciedad se sortean juntos y sin reemplazo
+        # (si no caben, los roombas tienen prioridad)
+        start_coords, obstacle_coords, dirt_coords = sample_placements(
+            self.streams.python("placement"), width, height,
+            [self.num_agents, self.num_obstacle, self.dirt]
         )
 
+        if self.sparse:
+            # Paredes y obstáculos van al mapa de bits, no son agentes
+            for coord in border_coords(width, height):
+                self.grid.set_wall(coord)
+            for coord in obstacle_coords:
+                self.grid.set_wall(coord)
+        else:
+            # Create the border cells
+            for coord in border_coords(width, height):
+                ObstacleAgent(self, cell=self.grid[coord])
+
+            ObstacleAgent.create_agents(
+                self,
+                len(obstacle_coords),
+                cell=[self.grid[coord] for coord in obstacle_coords]
+            )
+
         DirtPatch.create_agents(
             self,
-            self.dirt,
-            cell=self.random.choices(self.grid.empties.cells, k=self.dirt)
+            len(dirt_coords),
+            cell=[self.grid[coord] for coord in dirt_coords]
         )
 
-        
-
         #Esto se usara para tener mas de un roomba
-        start_cells = self.random.choices(self.grid.empties.cells, k=self.num_agents)
+        start_cells = [self.grid[coord] for coord in start_coords]
+
+        # Mapa de cobertura compartido (las paredes ya están colocadas)
+        free = self._free_mask()
+        self.coverage = CoverageMap(free)
+        self.metrics = FleetMetrics(self.coverage)
+
+        # Obstáculos que cambian durante la simulación (None si el piso es fijo)
+        self.layout = DynamicLayout(free) if dynamic else None
+
+        # Rutas largas por clusters; en pisos enormes evita campos completos
+        if hierarchical is None:
+            hierarchical = self.sparse
+        self.path_planner = (
+            HierarchicalPlanner(free, layout=self.layout) if hierarchical else None
+        )
 
         ChargingCell.create_agents(
             self,
-            self.num_agents,
+            len(start_cells),
             cell=start_cells
         )
 
         RandomAgent.create_agents(
             self,
-            self.num_agents,
+            len(start_cells),
             cell=start_cells
         )
+        self.metrics.roombas = len(start_cells)
+
+        # Reservas y colas de los cargadores
+        self.charger_scheduler = ChargerScheduler(
+            free,
+            [cell.coordinate for cell in start_cells],
+            charge_rate=self.charge,
+            on_release=lambda charger: self.activation.notify(CHARGER_RELEASED),
+            planner=self.path_planner,
+        )
+        self.return_planner = ReturnPlanner(self.charger_scheduler, self.coverage)
+
+        if self.layout is not None:
+            self._sync_layout()
+
+        # Suciedad que sigue apareciendo durante la simulación
+        self.dirt_spawner = DirtSpawner(
+            self, free, dirt_rate, heatmap=dirt_heatmap, rng=self.streams.generator("dirt")
+        )
 
         # AQUÍ construimos model_reporters por agente
         model_reporters = {
-            "Suciedad": lambda m: len(m.agents_by_type[DirtPatch]),
+            "Suciedad": lambda m: len(m.dirt_index),
+            **self.metrics.reporters(),
         }
 
         def make_energy_reporter(idx):
             return lambda m: (
-                list(m.agents_by_type[RandomAgent])[idx].energy
-                if len(m.agents_by_type[RandomAgent]) > idx
+                list(m.agents_by_type.get(RandomAgent, []))[idx].energy
+                if len(m.agents_by_type.get(RandomAgent, [])) > idx
                 else None
             )
 
         def make_moves_reporter(idx):
             return lambda m: (
-                list(m.agents_by_type[RandomAgent])[idx].movements
-                if len(m.agents_by_type[RandomAgent]) > idx
+                list(m.agents_by_type.get(RandomAgent, []))[idx].movements
+                if len(m.agents_by_type.get(RandomAgent, [])) > idx
                 else None
             )
 
@@ -91,18 +219,61 @@ class RandomModel(Model):
             model_reporters[f"Energy_agent_{i}"] = make_energy_reporter(i)
             model_reporters[f"Movements_agent_{i}"] = make_moves_reporter(i)
 
+        profiler = Profiler(tracemalloc_every) if profile else None
+        if profiler is not None:
+            model_reporters.update(profiler.reporters())
+
         self.datacollector = DataCollector(
             model_reporters=model_reporters,
-            agent_reporters={
-                "Energy": lambda a: a.energy if isinstance(a, RandomAgent) else None,
-                "Movimientos": lambda a: a.movements if isinstance(a, RandomAgent) else None,
+            agenttype_reporters={
+                RandomAgent: {
+                    "Energy": "energy",
+                    "Movimientos": "movements",
+                },
             }
         )
         
 
         self.running = True
 
+        if profiler is not None:
+            profiler.attach(self)
+
+    def is_blocked(self, cell):
+        """True si la celda es pared u obstáculo (fijo o dinámico)."""
+        if self.layout is not None and self.layout.is_blocked(cell.coordinate):
+            return True
+        if self.sparse:
+            return self.grid.is_wall(cell.coordinate)
+        return any(isinstance(obj, ObstacleAgent) for obj in cell.agents)
+
+    def _free_mask(self):
+        """Máscara booleana [x, y] de las celdas sin obstáculo."""
+        if self.sparse:
+            return ~self.grid.blocked_mask()
+
+        free = np.ones((self.width, self.height), dtype=bool)
+        for obstacle in self.agents_by_type[ObstacleAgent]:
+            x, y = obstacle.cell.coordinate
+            free[x, y] = False
+        return free
+
+    def _sync_layout(self):
+        """Marca en el layout dinámico dónde están los roombas ahora."""
+        self.layout.set_occupants(
+            agent.cell.coordinate for agent in self.agents_by_type.get(RandomAgent, [])
+        )
+
     def step(self):
         '''Advance the model by one step.'''
-        self.agents.shuffle_do("step")
+        if self.event_log is not None:
+            self.event_log.begin_step(self.steps)
+        self.dirt_spawner.step()
+        self.activation.step(self.steps)
+        if self.layout is not None:
+            self._sync_layout()
+        if self.event_log is not None:
+            self.event_log.end_step()
         self.datacollector.collect(self)
+        if self.profiler is not None:
+            self.profiler.end_step(self.steps)
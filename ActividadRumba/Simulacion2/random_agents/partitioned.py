@@ -0,0 +1,375 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .fleet import RoombaFleet
+
+
+def _strips(width, workers):
+    """Columnas [x0, x1) de cada región; franjas verticales casi iguales."""
+    workers = max(1, min(workers, width))
+    bounds = np.linspace(0, width, workers + 1).round().astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def resolve_chargers(gids, targets, priority, occupied):
+    """
+    Misma regla que RoombaFleet._resolve, pero con los candidatos de todas
+    las regiones: un roomba que va a cargar no entra a un cargador ocupado
+    por un roomba que no se mueve y, si varios llegan al mismo cargador
+    libre, entra el de menor prioridad sorteada. Regresa los ids perdedores.
+    """
+    blocked = np.isin(targets, occupied)
+    losers = [gids[blocked]]
+    gids, targets, priority = gids[~blocked], targets[~blocked], priority[~blocked]
+
+    order = np.lexsort((priority, targets))
+    _, first = np.unique(targets[order], return_index=True)
+    winners = np.zeros(order.size, dtype=bool)
+    winners[first] = True
+    losers.append(gids[order[~winners]])
+    return np.concatenate(losers)
+
+
+class _SharedArray:
+    """Arreglo de NumPy en memoria compartida (solo lectura para las regiones)."""
+
+    def __init__(self, array=None, spec=None):
+        if spec is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self.spec = (self.shm.name, array.shape, array.dtype.str)
+            self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf)
+            self.array[...] = array
+            self.owner = True
+        else:
+            name, shape, dtype = spec
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.spec = spec
+            self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+            self.owner = False
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class _Region:
+    """
+    Una franja de columnas [x0, x1) dentro de un proceso.
+
+    Guarda sus celdas más una columna de halo a cada lado en un RoombaFleet
+    local (RoombaFleet.view), indexado con el índice plano global menos
+    base, así que los métodos de RoombaFleet (_clean, _charge, _plan,
+    _commit) se usan tal cual. free, charger y charger_dist son vistas de
+    la memoria compartida.
+    """
+
+    def __init__(self, spec):
+        self.x0, self.x1 = spec["bounds"]
+        width, height = spec["width"], spec["height"]
+        self.n = spec["n"]
+        self.lo = max(self.x0 - 1, 0)
+        self.hi = min(self.x1 + 1, width)
+        self.base = self.lo * height
+        self.own = ((self.x0 - self.lo) * height, (self.x1 - self.lo) * height)
+        size = (self.hi - self.lo) * height
+
+        self.shared = [_SharedArray(spec=s) for s in spec["shared"]]
+        free, charger, charger_dist = (s.array for s in self.shared)
+
+        self.fleet = RoombaFleet.view(
+            height,
+            free[self.base:self.base + size],
+            charger[self.base:self.base + size],
+            charger_dist[self.base:self.base + size],
+            dirt=spec["dirt"].copy(),
+            visits=spec["visits"].copy(),
+            max_energy=spec["max_energy"],
+            low_battery=spec["low_battery"],
+            charge_rate=spec["charge_rate"],
+            seed=spec["seed"],
+            steps=spec["steps"],
+        )
+        self._set_roombas(spec["roombas"])
+
+    # -- Roombas -----------------------------------------------------------
+
+    def _set_roombas(self, roombas):
+        fleet = self.fleet
+        self.gid = roombas["gid"]
+        fleet.pos = roombas["pos"] - self.base
+        fleet.energy = roombas["energy"]
+        fleet.charging = roombas["charging"]
+        fleet.just_finished = roombas["just_finished"]
+        fleet.movements = roombas["movements"]
+        fleet.mode = roombas["mode"]
+
+    def _roombas(self, mask=None):
+        """Estado de los roombas (con posición global), opcionalmente filtrado."""
+        fleet = self.fleet
+        roombas = dict(
+            gid=self.gid, pos=fleet.pos + self.base, energy=fleet.energy,
+            charging=fleet.charging, just_finished=fleet.just_finished,
+            movements=fleet.movements, mode=fleet.mode,
+        )
+        if mask is None:
+            return roombas
+        return {k: v[mask] for k, v in roombas.items()}
+
+    def _take(self, mask):
+        """Saca los roombas de mask (para mandarlos a otra región)."""
+        out = self._roombas(mask)
+        self._set_roombas(self._roombas(~mask))
+        return out
+
+    def _arrive(self, arrivals):
+        """Recibe roombas de otras regiones; su movimiento cuenta como visita aquí."""
+        if not arrivals:
+            return
+        current = self._roombas()
+        self._set_roombas({k: np.concatenate([current[k]] + [a[k] for a in arrivals]) for k in current})
+        for a in arrivals:
+            np.add.at(self.fleet.visits, a["pos"][a["spent"]] - self.base, 1)
+
+    # -- Fases de un paso ---------------------------------------------------
+
+    def _edges(self):
+        """Columnas propias que las vecinas usan como halo (suciedad y visitas)."""
+        fleet, (a, b), h = self.fleet, self.own, self.fleet.height
+        return (
+            (fleet.dirt[a:a + h].copy(), fleet.visits[a:a + h].copy()),
+            (fleet.dirt[b - h:b].copy(), fleet.visits[b - h:b].copy()),
+        )
+
+    def clean_and_charge(self, arrivals):
+        self._arrive(arrivals)
+        rng = self.fleet.streams.generator("fleet", self.fleet.steps)
+        priority = rng.random(self.n)
+        noise = rng.random((self.n, 8))
+        self.priority = priority[self.gid]
+        self.noise = noise[self.gid]
+
+        self.fleet._clean(self.priority)
+        self.active = self.fleet._charge()
+        return self._edges()
+
+    def plan(self, left, right):
+        fleet, h = self.fleet, self.fleet.height
+        if left is not None:
+            fleet.dirt[:h], fleet.visits[:h] = left
+        if right is not None:
+            fleet.dirt[-h:], fleet.visits[-h:] = right
+
+        self.target, self.seek, self.spent = fleet._plan(self.active, self.noise)
+
+        # Candidatos a cargador para la resolución global
+        pos, target = fleet.pos, self.target
+        moving = target != pos
+        cand = np.flatnonzero(self.seek & moving & fleet.charger[target])
+        still = pos[~moving]
+        occupied = still[fleet.charger[still]] + self.base
+        return self.gid[cand], target[cand] + self.base, self.priority[cand], occupied
+
+    def commit(self, losers):
+        fleet = self.fleet
+        lost = np.isin(self.gid, losers)
+        self.target[lost] = fleet.pos[lost]
+
+        # Igual que RoombaFleet._commit, salvo que la visita de los que salen
+        # de la franja la cuenta la región que los recibe
+        target, spent = self.target, self.spent
+        leaving = (target < self.own[0]) | (target >= self.own[1])
+        fleet.pos = target
+        fleet.energy[spent] -= 1
+        fleet.movements[spent] += 1
+        np.add.at(fleet.visits, target[spent & ~leaving], 1)
+        fleet._update_modes()
+        fleet.steps += 1
+
+        emigrants = self._take(leaving)
+        emigrants["spent"] = spent[leaving]
+        return emigrants, int(fleet.dirt[self.own[0]:self.own[1]].sum())
+
+    def gather(self):
+        a, b = self.own
+        return self._roombas(), self.fleet.dirt[a:b].copy(), self.fleet.visits[a:b].copy()
+
+    def close(self):
+        for s in self.shared:
+            s.close()
+
+
+def _worker(conn, spec):
+    region = _Region(spec)
+    try:
+        while True:
+            command, args = conn.recv()
+            if command == "close":
+                break
+            conn.send(getattr(region, command)(*args))
+    finally:
+        region.close()
+        conn.close()
+
+
+class PartitionedFleet:
+    """
+    RoombaFleet repartido en varios procesos por franjas de columnas.
+
+    Cada proceso es dueño de las celdas (suciedad y visitas) y de los
+    roombas de su franja. En cada paso:
+
+    1. cada región limpia y carga (solo toca sus celdas) y entrega sus
+       columnas de borde;
+    2. se reparten los halos (una columna por lado, una vez por paso) y
+       cada región planea con ellos; para bajar al cargador usa el campo
+       de distancias global, que está en memoria compartida de solo lectura;
+    3. los conflictos por cargadores se resuelven con los candidatos de
+       todas las regiones (resolve_chargers) y cada región confirma sus
+       movimientos;
+    4. los roombas que cruzaron a otra franja se entregan a su nueva región
+       junto con el siguiente paso.
+
+    El ruido de cada paso se sortea para toda la flota con el mismo flujo
+    que RoombaFleet y se indexa por id global, así que el resultado es el
+    mismo que el de un solo RoombaFleet con la misma semilla.
+
+    Usar como context manager (o llamar close()) para terminar los
+    procesos y liberar la memoria compartida.
+    """
+
+    def __init__(self, fleet, workers=2):
+        self.width, self.height = fleet.width, fleet.height
+        self.n = fleet.num_agents
+        self.steps = fleet.steps
+        self.strips = _strips(fleet.width, workers)
+        h = self.height
+
+        self.shared = [
+            _SharedArray(fleet.free),
+            _SharedArray(fleet.charger),
+            _SharedArray(fleet.charger_dist),
+        ]
+
+        gid = np.arange(self.n)
+        owner = self._owner(fleet.pos)
+        context = multiprocessing.get_context()
+        self.conns = []
+        self.processes = []
+        self.dirt_count = fleet.dirt_count
+        for i, (x0, x1) in enumerate(self.strips):
+            lo, hi = max(x0 - 1, 0) * h, min(x1 + 1, self.width) * h
+            mine = owner == i
+            spec = dict(
+                bounds=(x0, x1), width=self.width, height=h, n=self.n,
+                shared=[s.spec for s in self.shared], seed=fleet.streams.entropy,
+                steps=fleet.steps, max_energy=fleet.max_energy, low_battery=fleet.low_battery,
+                charge_rate=fleet.charge_rate,
+                dirt=fleet.dirt[lo:hi], visits=fleet.visits[lo:hi],
+                roombas=dict(
+                    gid=gid[mine], pos=fleet.pos[mine], energy=fleet.energy[mine],
+                    charging=fleet.charging[mine], just_finished=fleet.just_finished[mine],
+                    movements=fleet.movements[mine], mode=fleet.mode[mine],
+                ),
+            )
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, spec), daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+        self._arrivals = [[] for _ in self.strips]
+
+    @classmethod
+    def from_model(cls, model, workers=2, seed=None):
+        return cls(RoombaFleet.from_model(model, seed=seed), workers=workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def num_agents(self):
+        return self.n
+
+    def _owner(self, pos):
+        starts = np.array([x0 for x0, _ in self.strips])
+        return np.searchsorted(starts, pos // self.height, side="right") - 1
+
+    def _call(self, command, args_per_region):
+        for conn, args in zip(self.conns, args_per_region):
+            conn.send((command, args))
+        return [conn.recv() for conn in self.conns]
+
+    def step(self):
+        """Avanza un paso a toda la flota."""
+        edges = self._call("clean_and_charge", [(a,) for a in self._arrivals])
+
+        last = len(self.strips) - 1
+        halos = [
+            (edges[i - 1][1] if i > 0 else None, edges[i + 1][0] if i < last else None)
+            for i in range(len(self.strips))
+        ]
+        plans = self._call("plan", halos)
+
+        gids, targets, priority, occupied = (np.concatenate(parts) for parts in zip(*plans))
+        losers = resolve_chargers(gids, targets, priority, occupied)
+        results = self._call("commit", [(losers,)] * len(self.strips))
+
+        self._arrivals = [[] for _ in self.strips]
+        for emigrants, _ in results:
+            if not emigrants["gid"].size:
+                continue
+            owner = self._owner(emigrants["pos"])
+            for i in np.unique(owner):
+                mask = owner == i
+                self._arrivals[i].append({k: v[mask] for k, v in emigrants.items()})
+        self.dirt_count = sum(count for _, count in results)
+        self.steps += 1
+
+    def run(self, steps):
+        for _ in range(steps):
+            self.step()
+
+    def gather(self):
+        """
+        Estado completo en orden de id global, como los arreglos de
+        RoombaFleet: pos, energy, mode, charging, just_finished, movements,
+        dirt y visits (planos, índice x * height + y).
+        """
+        # Los que van en camino se entregan antes de juntar
+        if any(self._arrivals):
+            self._call("_arrive", [(a,) for a in self._arrivals])
+            self._arrivals = [[] for _ in self.strips]
+
+        parts = self._call("gather", [()] * len(self.strips))
+        state = {}
+        for key in ("pos", "energy", "mode", "charging", "just_finished", "movements"):
+            values = np.concatenate([roombas[key] for roombas, _, _ in parts])
+            out = np.empty_like(values)
+            out[np.concatenate([roombas["gid"] for roombas, _, _ in parts])] = values
+            state[key] = out
+        state["dirt"] = np.concatenate([dirt for _, dirt, _ in parts])
+        state["visits"] = np.concatenate([visits for _, _, visits in parts])
+        return state
+
+    def coordinates(self):
+        pos = self.gather()["pos"]
+        return np.stack([pos // self.height, pos % self.height], axis=1)
+
+    def close(self):
+        if not self.conns:
+            return
+        for conn in self.conns:
+            conn.send(("close", ()))
+            conn.close()
+        for process in self.processes:
+            process.join()
+        for s in self.shared:
+            s.close()
+        self.conns = []
@@ -0,0 +1,56 @@
+from .fields import DIRECTIONS
+
+# Dirección contraria de cada código de DIRECTIONS
+OPPOSITE = (1, 0, 3, 2)
+
+
+def step_coord(coord, code):
+    """Coordenada a la que se llega desde coord con el código de dirección."""
+    dx, dy = DIRECTIONS[code]
+    return (coord[0] + dx, coord[1] + dy)
+
+
+class ReturnPlanner:
+    """
+    Planea el regreso al trabajo después de cargar.
+
+    El roomba solo guarda la coordenada donde se quedó (resume_coord). Al
+    terminar de cargar, el camino de regreso se obtiene bajando por el campo
+    de distancias del cargador desde resume_coord, así que es el más corto y
+    no requiere búsqueda. Se guarda como un bytearray de códigos de
+    dirección, invertido para que pop() dé el siguiente paso.
+    """
+
+    def __init__(self, scheduler, coverage):
+        self.scheduler = scheduler
+        self.coverage = coverage
+
+    def worth_returning(self, coord):
+        """Solo vale la pena volver si junto a coord queda área sin visitar."""
+        x, y = coord
+        frontier = self.coverage.frontier
+        return any((x + dx, y + dy) in frontier for dx, dy in DIRECTIONS)
+
+    def plan(self, charger, resume_coord):
+        """
+        Camino empacado del cargador a resume_coord. Regresa None si no hay
+        a dónde volver (el roomba debe ir a la frontera más cercana).
+        """
+        if resume_coord is None or resume_coord == charger:
+            return None
+        if not self.worth_returning(resume_coord):
+            return None
+        if self.scheduler.distance(charger, resume_coord) < 0:
+            return None
+
+        # Bajar desde resume_coord hasta el cargador y voltear cada paso:
+        # el último elemento queda como el primer paso desde el cargador
+        path = bytearray()
+        coord = resume_coord
+        while True:
+            code = self.scheduler.next_direction(charger, coord)
+            if code is None:
+                break
+            path.append(OPPOSITE[code])
+            coord = step_coord(coord, code)
+        return path
@@ -0,0 +1,114 @@
+import numpy as np
+from mesa.discrete_space import Cell
+from mesa.discrete_space.discrete_space import DiscreteSpace
+
+# Vecindad de Moore, igual que OrthogonalMooreGrid
+MOORE_OFFSETS = [
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1),           (0, 1),
+    (1, -1),  (1, 0),  (1, 1),
+]
+
+
+class LazyCell(Cell):
+    """
+    Celda de SparseGrid. Sus vecinas se piden al grid la primera vez que se
+    consultan, así que tocar una celda no obliga a crear todo el piso.
+    """
+
+    @property
+    def connections(self):
+        connections = self.__dict__.get("_lazy_connections")
+        if connections is None:
+            connections = self.grid._connections_of(self.coordinate)
+            self.__dict__["_lazy_connections"] = connections
+        return connections
+
+    @connections.setter
+    def connections(self, value):
+        # Cell.__init__ asigna {}; las conexiones siempre se calculan solas
+        pass
+
+
+class SparseGrid(DiscreteSpace):
+    """
+    Grid 2D para pisos muy grandes y casi vacíos.
+
+    Las celdas se crean por bloques de chunk_size x chunk_size la primera vez
+    que se toca alguna coordenada del bloque. Paredes y obstáculos fijos no
+    son agentes: se guardan en un mapa de bits (un bit por celda).
+
+    Expone la misma API que usa RandomAgent (grid[x, y], cell.neighborhood,
+    cell.agents); all_cells y empties solo incluyen celdas ya creadas.
+    """
+
+    def __init__(self, dimensions, chunk_size=16, capacity=None, random=None):
+        super().__init__(capacity=capacity, cell_klass=LazyCell, random=random)
+        self.dimensions = tuple(dimensions)
+        self.torus = False
+        self.chunk_size = chunk_size
+        self.chunks = set()
+
+        width, height = self.dimensions
+        self.walls = np.zeros((width, (height + 7) // 8), dtype=np.uint8)
+
+    @property
+    def width(self):
+        return self.dimensions[0]
+
+    @property
+    def height(self):
+        return self.dimensions[1]
+
+    def _in_bounds(self, coord):
+        x, y = coord
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def _allocate_chunk(self, key):
+        """Crea todas las celdas de un bloque."""
+        cx, cy = key
+        size = self.chunk_size
+        for x in range(cx * size, min((cx + 1) * size, self.width)):
+            for y in range(cy * size, min((cy + 1) * size, self.height)):
+                cell = self.cell_klass((x, y), self.capacity, random=self.random)
+                cell.grid = self
+                self._cells[(x, y)] = cell
+        self.chunks.add(key)
+        self.__dict__.pop("all_cells", None)
+
+    def __getitem__(self, key):
+        cell = self._cells.get(key)
+        if cell is not None:
+            return cell
+        if not self._in_bounds(key):
+            raise KeyError(key)
+
+        x, y = key
+        self._allocate_chunk((x // self.chunk_size, y // self.chunk_size))
+        return self._cells[key]
+
+    def _connections_of(self, coord):
+        x, y = coord
+        connections = {}
+        for dx, dy in MOORE_OFFSETS:
+            ncoord = (x + dx, y + dy)
+            if self._in_bounds(ncoord):
+                connections[(dx, dy)] = self[ncoord]
+        return connections
+
+    def set_wall(self, coord, value=True):
+        x, y = coord
+        bit = np.uint8(1 << (y & 7))
+        if value:
+            self.walls[x, y >> 3] |= bit
+        else:
+            self.walls[x, y >> 3] &= ~bit
+
+    def is_wall(self, coord):
+        x, y = coord
+        return bool(self.walls[x, y >> 3] & (1 << (y & 7)))
+
+    def blocked_mask(self):
+        """Mapa de bits desempacado como arreglo booleano [x, y]."""
+        bits = np.unpackbits(self.walls, axis=1, bitorder="little")
+        return bits[:, :self.height].astype(bool)
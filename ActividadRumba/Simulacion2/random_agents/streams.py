@@ -0,0 +1,58 @@
+import random
+import zlib
+
+import numpy as np
+
+# Las semillas negativas se toman en complemento a dos de 128 bits
+# (SeedSequence no acepta negativos y abs() juntaría -5 con 5)
+NEGATIVE_MASK = (1 << 128) - 1
+
+
+def _entropy(seed):
+    """Convierte la semilla del modelo (int, float, str o None) en entropía."""
+    if seed is None:
+        return np.random.SeedSequence().entropy
+    if isinstance(seed, float) and seed.is_integer():
+        seed = int(seed)
+    if isinstance(seed, int):
+        return seed if seed >= 0 else seed & NEGATIVE_MASK
+    return zlib.crc32(repr(seed).encode("utf-8"))
+
+
+def _key(part):
+    """Cada parte de la llave se vuelve un entero (los nombres por crc32)."""
+    if isinstance(part, str):
+        return zlib.crc32(part.encode("utf-8"))
+    return int(part)
+
+
+class RandomStreams:
+    """
+    Flujos de números aleatorios independientes a partir de una sola semilla.
+
+    Cada flujo se deriva con SeedSequence a partir de la semilla y de una
+    llave (nombre del subsistema y, opcionalmente, ids o número de paso),
+    no del orden en que se piden. Así, agregar un roomba o cambiar el orden
+    en que se actualizan no mueve los números de los demás, y una ejecución
+    en lotes o en paralelo da los mismos resultados que una secuencial.
+
+    Subsistemas que usa RandomModel: "placement", "activation", "dirt" y
+    "exploration" (uno por roomba, con su orden de creación). RoombaFleet usa
+    "fleet" con el número de paso.
+    """
+
+    def __init__(self, seed=None):
+        self.entropy = _entropy(seed)
+
+    def seed_sequence(self, name, *key):
+        spawn_key = tuple(_key(part) for part in (name,) + key)
+        return np.random.SeedSequence(self.entropy, spawn_key=spawn_key)
+
+    def generator(self, name, *key):
+        """numpy.random.Generator para el flujo (name, *key)."""
+        return np.random.default_rng(self.seed_sequence(name, *key))
+
+    def python(self, name, *key):
+        """random.Random (stdlib) para el flujo (name, *key)."""
+        state = self.seed_sequence(name, *key).generate_state(4, dtype=np.uint32)
+        return random.Random(int.from_bytes(state.tobytes(), "little"))
@@ -0,0 +1,74 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from random_agents.checkpoint import load_checkpoint, save_checkpoint
+from random_agents.model import RandomModel
+from sim_tools.differential import roomba_state, state_diff
+
+BASE = dict(num_agents=5, num_obstacle=70, dirt=90, width=26, height=22, seed=12)
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"sparse": True},
+    {"dynamic": True},
+    {"dirt_rate": 0.5, "sensing_radius": 3},
+    {"hierarchical": True, "charge": 2},
+], ids=["dense", "sparse", "dynamic", "spawning", "hierarchical"])
+def test_resumed_run_matches_uninterrupted(tmp_path, options):
+    model = RandomModel(**BASE, **options)
+    for _ in range(60):
+        model.step()
+    path = tmp_path / "run.npz"
+    save_checkpoint(model, path)
+
+    resumed = load_checkpoint(path)
+    assert state_diff(roomba_state(model), roomba_state(resumed)) == {}
+    assert resumed.metrics.state() == model.metrics.state()
+
+    for _ in range(120):
+        model.step()
+        resumed.step()
+        assert state_diff(roomba_state(model), roomba_state(resumed)) == {}, model.steps
+    assert resumed.metrics.state() == model.metrics.state()
+
+
+def test_reseed_branches_from_the_same_state(tmp_path):
+    model = RandomModel(**BASE)
+    for _ in range(30):
+        model.step()
+    path = tmp_path / "warm.npz"
+    save_checkpoint(model, path)
+
+    a = load_checkpoint(path, reseed=1)
+    b = load_checkpoint(path, reseed=2)
+    assert state_diff(roomba_state(a), roomba_state(b)) == {}
+    for _ in range(40):
+        a.step()
+        b.step()
+    assert state_diff(roomba_state(a), roomba_state(b))
+
+
+def test_rejects_other_formats(tmp_path):
+    path = tmp_path / "other.npz"
+    np.savez_compressed(path, meta=np.array('{"format": "otro", "version": 1}'))
+    with pytest.raises(ValueError):
+        load_checkpoint(path)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_grid_shares_the_model_random(tmp_path, sparse):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        model = RandomModel(num_agents=3, width=15, height=15, seed=2, sparse=sparse)
+    assert model.grid.random is model.random
+
+    path = tmp_path / "roomba.npz"
+    save_checkpoint(model, path)
+    for reseed in (None, 5):
+        loaded = load_checkpoint(path, reseed=reseed)
+        assert loaded.grid.random is loaded.random
+    model.reset(num_agents=3, width=15, height=15, seed=3, sparse=sparse)
+    assert model.grid.random is model.random
@@ -0,0 +1,15 @@
+import pytest
+
+from random_agents.model import RandomModel
+from sim_tools.differential import roomba_state, run_lockstep
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("extra", [{}, dict(dirt_rate=0.2), dict(dynamic=True)], ids=["fixed", "spawning", "dynamic"])
+def test_sparse_grid_matches_dense(seed, extra):
+    params = dict(num_agents=6, width=28, height=28, seed=seed, hierarchical=False, **extra)
+    divergence = run_lockstep(
+        lambda: RandomModel(**params), lambda: RandomModel(**dict(params, sparse=True)),
+        roomba_state, steps=300, every=25,
+    )
+    assert divergence is None, str(divergence)
@@ -0,0 +1,87 @@
+import heapq
+import random
+
+import numpy as np
+import pytest
+
+from random_agents.dstar_lite import DStarLite, INF
+from random_agents.dynamic_layout import DynamicLayout
+
+
+def dijkstra(layout, start, goal):
+    """Costo de start a goal pagando layout.cost() de cada celda a la que se entra."""
+    dist = {start: 0}
+    queue = [(0, start)]
+    while queue:
+        d, u = heapq.heappop(queue)
+        if u == goal:
+            return d
+        if d > dist[u]:
+            continue
+        for s in layout.neighbors(u):
+            cost = layout.cost(s)
+            if cost is None:
+                continue
+            if d + cost < dist.get(s, INF):
+                dist[s] = d + cost
+                heapq.heappush(queue, (d + cost, s))
+    return INF
+
+
+def random_floor(rng, width, height, density):
+    free = rng.random((width, height)) > density
+    free[0, :] = free[-1, :] = False
+    free[:, 0] = free[:, -1] = False
+    return free
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_matches_dijkstra_through_changes(seed):
+    rng = np.random.default_rng(seed)
+    pick = random.Random(seed)
+    free = random_floor(rng, 18, 14, 0.25)
+    cells = [tuple(map(int, c)) for c in np.argwhere(free)]
+
+    layout = DynamicLayout(free)
+    goal = pick.choice(cells)
+    start = pick.choice(cells)
+    planner = DStarLite(layout, goal, start)
+
+    for _ in range(40):
+        # Puertas que se cierran o abren y roombas que se mueven
+        for coord in pick.sample(cells, 3):
+            if coord == goal:
+                continue
+            if layout.is_blocked(coord):
+                layout.unblock(coord)
+            else:
+                layout.block(coord)
+        layout.set_occupants(pick.sample(cells, 4))
+
+        open_cells = [c for c in cells if layout.passable(c)]
+        start = pick.choice(open_cells)
+        assert planner.distance(start) == dijkstra(layout, start, goal)
+
+
+def test_next_step_follows_a_shortest_path():
+    rng = np.random.default_rng(11)
+    free = random_floor(rng, 20, 20, 0.2)
+    cells = [tuple(map(int, c)) for c in np.argwhere(free)]
+    layout = DynamicLayout(free)
+    layout.set_occupants(cells[::7])
+
+    goal, start = cells[0], cells[-1]
+    planner = DStarLite(layout, goal, start)
+    expected = dijkstra(layout, start, goal)
+    if expected == INF:
+        assert planner.next_step(start) is None
+        return
+
+    paid = 0
+    coord = start
+    while coord != goal:
+        nxt = planner.next_step(coord)
+        assert nxt in set(layout.neighbors(coord))
+        paid += layout.cost(nxt)
+        coord = nxt
+    assert paid == expected
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from random_agents.event_log import EventRecorder, EventReplay
+from random_agents.model import RandomModel
+
+STEPS = 150
+
+
+def live_state(recorder):
+    states = [recorder._state_of(agent) for agent in recorder.agents]
+    return (
+        [s[0] for s in states], [s[1] for s in states], [s[2] for s in states],
+        [s[3] for s in states], set(recorder.model.dirt_index),
+    )
+
+
+def frame_state(frame):
+    return (list(frame.positions), list(frame.energy), list(frame.movements),
+            list(frame.flags), set(frame.dirt))
+
+
+@pytest.fixture(scope="module")
+def recorded(tmp_path_factory):
+    path = tmp_path_factory.mktemp("log") / "run.rmb"
+    model = RandomModel(num_agents=6, num_obstacle=60, dirt=80, width=24, height=20,
+                        seed=3, dirt_rate=0.4)
+    expected = {}
+    with EventRecorder(model, path, keyframe_every=25) as recorder:
+        expected[model.steps] = live_state(recorder)
+        for _ in range(STEPS):
+            model.step()
+            expected[model.steps] = live_state(recorder)
+    return path, expected
+
+
+def test_replay_matches_every_step(recorded):
+    path, expected = recorded
+    assert expected[STEPS] != expected[0]
+    with EventReplay(path) as replay:
+        assert replay.last_step == STEPS
+        seen = []
+        for frame in replay.frames():
+            assert frame_state(frame) == expected[frame.step]
+            seen.append(frame.step)
+    assert seen == sorted(expected)
+
+
+def test_random_seeks_match(recorded):
+    path, expected = recorded
+    pick = random.Random(0)
+    with EventReplay(path) as replay:
+        for step in [STEPS, 0, 25, 24, 26] + [pick.randrange(STEPS + 1) for _ in range(40)]:
+            assert frame_state(replay.seek(step)) == expected[step]
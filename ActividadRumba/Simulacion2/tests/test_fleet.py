@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from random_agents.fleet import RoombaFleet
+from random_agents.model import RandomModel
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_from_model_copies_walls(sparse):
+    model = RandomModel(num_agents=3, num_obstacle=40, dirt=30, width=20, height=15,
+                        seed=4, sparse=sparse)
+    fleet = RoombaFleet.from_model(model)
+
+    free = fleet.free.reshape(model.width, model.height)
+    assert np.array_equal(free, model._free_mask())
+    assert (~free).sum() > 2 * (model.width + model.height) - 4
+
+
+def test_from_model_copies_roombas_and_dirt():
+    model = RandomModel(num_agents=4, num_obstacle=20, dirt=25, width=12, height=12, seed=7)
+    fleet = RoombaFleet.from_model(model)
+
+    assert fleet.num_agents == 4
+    assert fleet.dirt_count == len(model.dirt_index)
+    assert fleet.charger[fleet.pos].all()
@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pytest
+
+from random_agents.dynamic_layout import DynamicLayout
+from random_agents.fields import distance_field
+from random_agents.hierarchical import HierarchicalPlanner
+
+
+def random_floor(seed, width, height, density):
+    free = np.random.default_rng(seed).random((width, height)) > density
+    free[0, :] = free[-1, :] = False
+    free[:, 0] = free[:, -1] = False
+    return free
+
+
+def check_path(planner, passable, start, goal, shortest):
+    path = planner.find_path(start, goal)
+    if shortest < 0:
+        assert path == []
+        return
+
+    assert path, f"sin camino de {start} a {goal} aunque hay uno de {shortest} pasos"
+    assert path[-1] == goal
+    assert len(path) >= shortest
+    previous = start
+    for coord in path:
+        assert abs(coord[0] - previous[0]) + abs(coord[1] - previous[1]) == 1
+        assert passable(coord)
+        previous = coord
+    assert planner.distance(start, goal) == len(path)
+
+
+@pytest.mark.parametrize("seed, cluster_size", [(0, 4), (1, 5), (2, 8), (3, 16)])
+def test_paths_are_valid_and_complete(seed, cluster_size):
+    free = random_floor(seed, 40, 33, 0.3)
+    cells = [tuple(map(int, c)) for c in np.argwhere(free)]
+    planner = HierarchicalPlanner(free, cluster_size=cluster_size)
+    pick = random.Random(seed)
+
+    for _ in range(30):
+        start, goal = pick.sample(cells, 2)
+        shortest = distance_field(free, [goal])[start]
+        check_path(planner, lambda c: bool(free[c]), start, goal, shortest)
+
+
+def test_blocked_cells_invalidate_their_cluster():
+    free = random_floor(5, 36, 36, 0.2)
+    cells = [tuple(map(int, c)) for c in np.argwhere(free)]
+    layout = DynamicLayout(free)
+    planner = HierarchicalPlanner(free, cluster_size=6, layout=layout)
+    pick = random.Random(5)
+
+    for _ in range(15):
+        start, goal = pick.sample(cells, 2)
+        planner.find_path(start, goal)
+
+        for coord in pick.sample(cells, 12):
+            if coord in (start, goal):
+                continue
+            if layout.is_blocked(coord):
+                layout.unblock(coord)
+            else:
+                layout.block(coord)
+
+        current = free.copy()
+        for x, y in layout.blocked:
+            current[x, y] = False
+        shortest = distance_field(current, [goal])[start]
+        check_path(planner, layout.passable, start, goal, shortest)
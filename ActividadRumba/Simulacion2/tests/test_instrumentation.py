@@ -0,0 +1,59 @@
+import pytest
+
+from random_agents.instrumentation import PHASES
+from random_agents.model import RandomModel
+
+PARAMS = dict(num_agents=4, num_obstacle=30, dirt=60, width=20, height=20, seed=3)
+
+
+@pytest.fixture
+def profiled():
+    model = RandomModel(**PARAMS, profile=True)
+    for _ in range(30):
+        model.step()
+    return model
+
+
+def test_every_phase_column_is_measured(profiled):
+    df = profiled.datacollector.get_model_vars_dataframe()
+    for phase in PHASES:
+        column = df[f"time_{phase}"]
+        assert (column > 0).any(), phase
+    # El collect de cada paso aparece en el renglón siguiente
+    assert (df["time_collect"].iloc[1:] > 0).all()
+
+
+def test_columns_add_up_to_the_totals(profiled):
+    df = profiled.datacollector.get_model_vars_dataframe()
+    profiler = profiled.profiler
+    for phase in PHASES:
+        if phase == "collect":
+            measured = df["time_collect"].sum() + profiler.last_step["collect"]
+        else:
+            measured = df[f"time_{phase}"].sum()
+        assert measured == pytest.approx(profiler.totals[phase])
+    assert df["bfs_calls"].sum() == profiler.counters["bfs_calls"]
+
+
+def test_profiling_does_not_change_the_run(profiled):
+    plain = RandomModel(**PARAMS)
+    for _ in range(30):
+        plain.step()
+    a = plain.datacollector.get_model_vars_dataframe()
+    b = profiled.datacollector.get_model_vars_dataframe()
+    assert a.equals(b[a.columns])
+    assert "is_blocked" not in vars(plain)
+
+
+@pytest.mark.parametrize("floor", [dict(sparse=True), dict(dynamic=True)], ids=["hierarchical", "dstar"])
+def test_path_reuse_is_counted_for_every_planner(floor):
+    params = dict(PARAMS, num_agents=6, dirt=150, width=24, height=24, **floor)
+    plain = RandomModel(**params)
+    profiled = RandomModel(**params, profile=True)
+    for _ in range(200):
+        plain.step()
+        profiled.step()
+    assert profiled.profiler.counters["path_cache_hits"] > 0
+    a = plain.datacollector.get_model_vars_dataframe()
+    b = profiled.datacollector.get_model_vars_dataframe()
+    assert a.equals(b[a.columns])
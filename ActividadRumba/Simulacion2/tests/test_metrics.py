@@ -0,0 +1,40 @@
+from collections import Counter
+
+import pytest
+
+from random_agents.agent import RandomAgent
+from random_agents.model import RandomModel
+
+PARAMS = dict(num_agents=5, num_obstacle=60, dirt=120, width=24, height=20, seed=6)
+
+
+def roombas(model):
+    return list(model.agents_by_type.get(RandomAgent, []))
+
+
+@pytest.mark.parametrize("sparse", [False, True], ids=["dense", "sparse"])
+@pytest.mark.parametrize("steps", [1, 40, 120])
+def test_incremental_metrics_match_agent_state(sparse, steps):
+    model = RandomModel(**PARAMS, sparse=sparse)
+    for _ in range(steps):
+        model.step()
+    metrics = model.metrics
+
+    # Cobertura: celdas en el visit_count de algún roomba
+    visits = Counter()
+    for agent in roombas(model):
+        visits.update(agent.visit_count)
+    free = model._free_mask()
+    assert all(free[coord] for coord in visits)
+    assert metrics.coverage_pct() == pytest.approx(100 * len(visits) / free.sum())
+    assert {coord: int(model.coverage.counts[coord]) for coord in visits} == dict(visits)
+
+    # Eficiencia: cada movimiento y cada limpieza gastan una unidad de energía
+    cleaned = PARAMS["dirt"] - len(model.dirt_index)
+    energy_used = sum(agent.movements for agent in roombas(model)) + cleaned
+    assert (metrics.cleaned, metrics.energy_used) == (cleaned, energy_used)
+    assert metrics.cleaned_per_energy() == pytest.approx(cleaned / energy_used if energy_used else 0.0)
+
+    row = model.datacollector.get_model_vars_dataframe().iloc[-1]
+    assert row["Coverage"] == pytest.approx(metrics.coverage_pct())
+    assert row["Cleaned_per_energy"] == pytest.approx(metrics.cleaned_per_energy())
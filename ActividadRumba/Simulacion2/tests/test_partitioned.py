@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from random_agents.fleet import RoombaFleet
+from random_agents.model import RandomModel
+from random_agents.partitioned import PartitionedFleet
+
+KEYS = ("pos", "energy", "mode", "charging", "just_finished", "movements", "dirt", "visits")
+
+
+def single_state(fleet):
+    return {key: getattr(fleet, key) for key in KEYS}
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_matches_a_single_fleet(workers):
+    model = RandomModel(num_agents=12, num_obstacle=80, dirt=150, width=30, height=16, seed=5)
+    single = RoombaFleet.from_model(model)
+    with PartitionedFleet(RoombaFleet.from_model(model), workers=workers) as parted:
+        for step in range(150):
+            single.step()
+            parted.step()
+            if step % 10 == 9:
+                expected, got = single_state(single), parted.gather()
+                for key in KEYS:
+                    assert np.array_equal(got[key], expected[key]), (step, key)
+                assert parted.dirt_count == single.dirt_count
+
+
+def test_view_uses_the_given_arrays():
+    fleet = RoombaFleet(6, 4, chargers=[(1, 1)], dirt=[(2, 2)], starts=[(1, 1)])
+    lo, hi = 1 * 4, 4 * 4
+    view = RoombaFleet.view(
+        4, fleet.free[lo:hi], fleet.charger[lo:hi], fleet.charger_dist[lo:hi],
+        dirt=fleet.dirt[lo:hi].copy(), visits=fleet.visits[lo:hi].copy(),
+    )
+    assert (view.width, view.height, view.num_agents) == (3, 4, 0)
+    assert np.shares_memory(view.free, fleet.free)
+    assert view.dirt_count == 1
+    assert list(view._moore) == list(fleet._moore)
@@ -0,0 +1,60 @@
+import pytest
+
+from random_agents.model import RandomModel
+from sim_tools.differential import roomba_state, run_lockstep, state_diff
+
+BEFORE = dict(num_agents=4, num_obstacle=50, dirt=60, width=22, height=18, seed=2)
+
+
+def used_then_reset(before, params):
+    model = RandomModel(**before)
+    for _ in range(30):
+        model.step()
+    model.reset(**params)
+    return model
+
+
+@pytest.mark.parametrize("before, params", [
+    (BEFORE, dict(BEFORE, seed=8)),
+    (BEFORE, dict(BEFORE, num_agents=7, dirt_rate=0.3, sensing_radius=2)),
+    (BEFORE, dict(BEFORE, width=30, height=12)),
+    (BEFORE, dict(BEFORE, sparse=True)),
+    (dict(BEFORE, sparse=True), BEFORE),
+    (dict(BEFORE, profile=True), dict(BEFORE, dynamic=True)),
+], ids=["seed", "params", "size", "to-sparse", "from-sparse", "from-profiled"])
+def test_reset_steps_like_a_new_model(before, params):
+    divergence = run_lockstep(
+        lambda: RandomModel(**params), lambda: used_then_reset(before, params),
+        roomba_state, steps=150, every=10,
+    )
+    assert divergence is None, str(divergence)
+
+
+def test_reset_reports_like_a_new_model():
+    fresh = RandomModel(**BEFORE)
+    reset = used_then_reset(dict(BEFORE, profile=True), BEFORE)
+    assert reset.profiler is None
+    assert "is_blocked" not in vars(reset)
+    for _ in range(80):
+        fresh.step()
+        reset.step()
+    assert reset.datacollector.model_vars == fresh.datacollector.model_vars
+    assert [a.unique_id for a in reset.agents] == [a.unique_id for a in fresh.agents]
+
+
+def test_pooled_replacement_steps_like_a_new_model():
+    from sim_tools.model_pool import pooled
+
+    Roomba = pooled(RandomModel)
+    shown = Roomba(**BEFORE)
+    for _ in range(20):
+        shown.step()
+    replaced = shown.__class__(**dict(BEFORE, seed=8))
+    again = replaced.__class__(**dict(BEFORE, seed=9))
+    assert again is shown
+
+    fresh = RandomModel(**dict(BEFORE, seed=9))
+    for step in range(100):
+        assert state_diff(roomba_state(fresh), roomba_state(again)) == {}, step
+        fresh.step()
+        again.step()
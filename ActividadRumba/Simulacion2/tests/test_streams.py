@@ -0,0 +1,40 @@
+import pytest
+
+from random_agents.agent import RandomAgent
+from random_agents.model import RandomModel
+from random_agents.streams import RandomStreams
+
+
+def draws(seed, *key):
+    return RandomStreams(seed).generator("exploration", *key).integers(0, 2**32, 8).tolist()
+
+
+@pytest.mark.parametrize("seed", [1, 5, 42, 2**64 + 3])
+def test_negative_seed_differs_from_positive(seed):
+    assert draws(-seed) != draws(seed)
+
+
+def test_same_seed_same_stream():
+    assert draws(-7, 3) == draws(-7, 3)
+    assert draws(7.0) == draws(7)
+
+
+def test_streams_are_keyed_not_ordered():
+    streams = RandomStreams(9)
+    first = streams.python("exploration", 2).random()
+    streams.python("exploration", 1).random()
+    assert RandomStreams(9).python("exploration", 2).random() == first
+    assert draws(9, 1) != draws(9, 2)
+
+
+@pytest.mark.parametrize("other", [
+    dict(dirt=41), dict(num_obstacle=31), dict(sparse=True),
+], ids=["dirt", "obstacles", "sparse"])
+def test_roomba_streams_ignore_other_agent_counts(other):
+    params = dict(num_agents=4, num_obstacle=30, dirt=40, width=20, height=20, seed=3)
+
+    def first_draws(model):
+        roombas = sorted(model.agents_by_type[RandomAgent], key=lambda a: a.index)
+        return [(a.index, a.stream.random()) for a in roombas]
+
+    assert first_draws(RandomModel(**dict(params, **other))) == first_draws(RandomModel(**params))
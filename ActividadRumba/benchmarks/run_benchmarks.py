@@ -0,0 +1,303 @@
+"""
+Benchmarks de Simulacion1 y Simulacion2.
+
+Cada caso (simulación, piso, tamaño, roombas, densidad de obstáculos,
+suciedad, semilla) corre en su propio proceso, porque las dos simulaciones tienen
+un paquete llamado random_agents y así la memoria pico de un caso no se
+mezcla con la de otro. Por caso se mide:
+
+- construction_s: tiempo de construir RandomModel
+- steps_per_s: pasos por segundo
+- bfs_calls_per_step y bfs_nodes_per_step: llamadas a RandomAgent._bfs_path
+  y nodos que expande (se cuentan envolviendo los métodos)
+- search_calls_per_step y search_nodes_per_step (Simulacion2): el resto de
+  la búsqueda de caminos hacia los cargadores. Campos de distancias
+  (celdas alcanzadas), planificador jerárquico (BFS locales y entradas
+  expandidas en el A* abstracto) y D* Lite (vértices actualizados)
+- peak_rss_mb: memoria pico del proceso
+
+Uso (desde ActividadRumba/):
+    python benchmarks/run_benchmarks.py                  # compara con el baseline
+    python benchmarks/run_benchmarks.py --save           # guarda un baseline nuevo
+    python benchmarks/run_benchmarks.py --quick --sim Simulacion2
+
+Sin baseline, el primero que se corre se guarda. Regresa 1 si alguna
+métrica empeoró más que --tolerance respecto al baseline. Simulacion1
+siempre tiene un roomba y un piso denso, así que solo Simulacion2 barre
+roombas y pisos (denso, sparse con rutas jerárquicas, dynamic con D* Lite). La llave de
+cada caso incluye los pasos, y --quick usa su propio baseline
+(baseline_quick.json): una corrida corta no se compara con una larga.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+QUICK_BASELINE = os.path.join(HERE, "baseline_quick.json")
+
+SIMULATIONS = ("Simulacion1", "Simulacion2")
+# Solo Simulacion2 tiene varios roombas y pisos distintos
+SWEPT = {"Simulacion2"}
+FLOORS = {"dense": {}, "sparse": {"sparse": True}, "dynamic": {"dynamic": True}}
+SIZES = (20, 40, 80)
+AGENTS = (1, 5, 10)
+OBSTACLE_DENSITY = (0.05, 0.15)
+DIRT_DENSITY = (0.1,)
+SEEDS = (1, 2)
+STEPS = 200
+
+QUICK_SIZES = (20, 40)
+QUICK_AGENTS = (1, 5)
+QUICK_FLOORS = ("dense", "sparse")
+QUICK_STEPS = 50
+
+# Métricas donde más es mejor; en las demás, menos es mejor
+HIGHER_IS_BETTER = {"steps_per_s"}
+
+
+def run_case(case):
+    """Corre un caso dentro del proceso actual (ya con cwd en la simulación)."""
+    import resource
+    import time
+
+    sys.path.insert(0, os.getcwd())
+    from random_agents.agent import RandomAgent
+    from random_agents.model import RandomModel
+
+    counts = dict.fromkeys(("bfs_calls", "bfs_nodes", "search_calls", "search_nodes"), 0)
+    inside = [0]
+    bfs_path = RandomAgent._bfs_path
+    neighbors = RandomAgent._neighbors_no_obstacle
+
+    def counted_bfs(self, *args, **kwargs):
+        counts["bfs_calls"] += 1
+        inside[0] += 1
+        try:
+            return bfs_path(self, *args, **kwargs)
+        finally:
+            inside[0] -= 1
+
+    def counted_neighbors(self, cell):
+        # Dentro del BFS, cada nodo expandido pide sus vecinos una vez
+        if inside[0]:
+            counts["bfs_nodes"] += 1
+        return neighbors(self, cell)
+
+    RandomAgent._bfs_path = counted_bfs
+    RandomAgent._neighbors_no_obstacle = counted_neighbors
+    _count_searches(counts)
+
+    size = case["size"]
+    interior = (size - 2) ** 2
+    start = time.perf_counter()
+    model = RandomModel(
+        num_agents=case["agents"],
+        num_obstacle=int(case["obstacles"] * interior),
+        dirt=int(case["dirt"] * interior),
+        width=size,
+        height=size,
+        seed=case["seed"],
+        **FLOORS[case["floor"]],
+    )
+    construction = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(case["steps"]):
+        model.step()
+    elapsed = time.perf_counter() - start
+
+    steps = case["steps"]
+    return {
+        "construction_s": construction,
+        "steps_per_s": steps / elapsed if elapsed else float("inf"),
+        "bfs_calls_per_step": counts["bfs_calls"] / steps,
+        "bfs_nodes_per_step": counts["bfs_nodes"] / steps,
+        "search_calls_per_step": counts["search_calls"] / steps,
+        "search_nodes_per_step": counts["search_nodes"] / steps,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _count_searches(counts):
+    """Cuenta los planificadores de Simulacion2 (Simulacion1 no los tiene)."""
+    try:
+        from random_agents import chargers
+        from random_agents.dstar_lite import DStarLite
+        from random_agents.hierarchical import HierarchicalPlanner
+    except ImportError:
+        return
+
+    distance_field = chargers.distance_field
+
+    def counted_field(free, sources):
+        field = distance_field(free, sources)
+        counts["search_calls"] += 1
+        counts["search_nodes"] += int((field >= 0).sum())
+        return field
+
+    find_path = HierarchicalPlanner.find_path
+    local_bfs = HierarchicalPlanner._local_bfs
+    intra_edges = HierarchicalPlanner._intra_edges
+
+    def counted_find_path(self, start, goal):
+        counts["search_calls"] += 1
+        return find_path(self, start, goal)
+
+    def counted_local_bfs(self, cluster, source, goal=None):
+        dist, parent = local_bfs(self, cluster, source, goal)
+        counts["search_nodes"] += len(dist)
+        return dist, parent
+
+    def counted_intra_edges(self, cluster, node):
+        # Una vez por entrada expandida en el A* abstracto
+        counts["search_nodes"] += 1
+        return intra_edges(self, cluster, node)
+
+    compute = DStarLite._compute
+    update_vertex = DStarLite._update_vertex
+
+    def counted_compute(self):
+        counts["search_calls"] += 1
+        return compute(self)
+
+    def counted_update_vertex(self, u):
+        counts["search_nodes"] += 1
+        return update_vertex(self, u)
+
+    chargers.distance_field = counted_field
+    HierarchicalPlanner.find_path = counted_find_path
+    HierarchicalPlanner._local_bfs = counted_local_bfs
+    HierarchicalPlanner._intra_edges = counted_intra_edges
+    DStarLite._compute = counted_compute
+    DStarLite._update_vertex = counted_update_vertex
+
+
+def case_key(case):
+    return (
+        "{sim}/floor={floor}/size={size}/agents={agents}/obstacles={obstacles}"
+        "/dirt={dirt}/steps={steps}"
+    ).format(**case)
+
+
+def cases(sims, quick):
+    sizes = QUICK_SIZES if quick else SIZES
+    steps = QUICK_STEPS if quick else STEPS
+    for sim in sims:
+        if sim in SWEPT:
+            agents = QUICK_AGENTS if quick else AGENTS
+            floors = QUICK_FLOORS if quick else tuple(FLOORS)
+        else:
+            agents, floors = (1,), ("dense",)
+        for floor, size, n, obstacles, dirt in itertools.product(
+            floors, sizes, agents, OBSTACLE_DENSITY, DIRT_DENSITY
+        ):
+            yield dict(sim=sim, floor=floor, size=size, agents=n, obstacles=obstacles, dirt=dirt, steps=steps)
+
+
+def measure(case):
+    """Corre el caso en un subproceso por cada semilla y junta las medianas."""
+    runs = []
+    for seed in SEEDS:
+        payload = json.dumps(dict(case, seed=seed))
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", payload],
+            cwd=os.path.join(ROOT, case["sim"]),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Lista de (caso, métrica, baseline, actual) que empeoraron más que
+    tolerance, y cuántos casos había en el baseline para comparar.
+    """
+    regressions = []
+    compared = 0
+    for key, metrics in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        compared += 1
+        for metric, value in metrics.items():
+            reference = old.get(metric)
+            if not reference:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                worse = value < reference * (1 - tolerance)
+            else:
+                worse = value > reference * (1 + tolerance)
+            if worse:
+                regressions.append((key, metric, reference, value))
+    return regressions, compared
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sim", action="append", choices=SIMULATIONS)
+    parser.add_argument("--quick", action="store_true", help="menos casos y pasos")
+    parser.add_argument("--baseline", help="por defecto baseline.json (o baseline_quick.json con --quick)")
+    parser.add_argument("--save", action="store_true", help="guardar los resultados como baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_case(json.loads(args.worker))))
+        return 0
+    if args.baseline is None:
+        args.baseline = QUICK_BASELINE if args.quick else DEFAULT_BASELINE
+
+    results = {}
+    for case in cases(args.sim or SIMULATIONS, args.quick):
+        key = case_key(case)
+        results[key] = metrics = measure(case)
+        print(
+            f"{key:72s} build {metrics['construction_s'] * 1000:8.1f} ms"
+            f"  {metrics['steps_per_s']:9.1f} steps/s"
+            f"  bfs {metrics['bfs_calls_per_step']:6.2f}/step"
+            f"  nodes {metrics['bfs_nodes_per_step']:9.1f}/step"
+            f"  search {metrics['search_calls_per_step']:6.2f}/step"
+            f"  nodes {metrics['search_nodes_per_step']:9.1f}/step"
+            f"  rss {metrics['peak_rss_mb']:7.1f} MB"
+        )
+
+    if args.save or not os.path.exists(args.baseline):
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "machine": {"python": platform.python_version(), "platform": platform.platform()},
+                    "seeds": SEEDS,
+                    "results": results,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        print(f"baseline guardado en {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions, compared = compare(results, baseline, args.tolerance)
+    for key, metric, reference, value in regressions:
+        print(f"REGRESIÓN {key} {metric}: {reference:.4g} -> {value:.4g}")
+    if compared < len(results):
+        print(f"{len(results) - compared} de {len(results)} casos no están en {args.baseline} (--save guarda uno nuevo)")
+    if not regressions:
+        print("sin regresiones")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import importlib.util
+import os
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+spec = importlib.util.spec_from_file_location(
+    "run_benchmarks", os.path.join(os.path.dirname(HERE), "run_benchmarks.py")
+)
+run_benchmarks = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(run_benchmarks)
+
+
+def test_quick_and_full_cases_have_different_keys():
+    full = {run_benchmarks.case_key(c) for c in run_benchmarks.cases(["Simulacion2"], quick=False)}
+    quick = {run_benchmarks.case_key(c) for c in run_benchmarks.cases(["Simulacion2"], quick=True)}
+    assert quick and full
+    assert not quick & full
+
+
+def test_compare_only_matching_cases():
+    baseline = {"a": {"steps_per_s": 100.0, "construction_s": 1.0}}
+    results = {
+        "a": {"steps_per_s": 60.0, "construction_s": 1.1},
+        "b": {"steps_per_s": 1.0, "construction_s": 99.0},
+    }
+    regressions, compared = run_benchmarks.compare(results, baseline, tolerance=0.25)
+    assert compared == 1
+    assert regressions == [("a", "steps_per_s", 100.0, 60.0)]
+
+
+def test_quick_runs_use_their_own_baseline(tmp_path, monkeypatch):
+    saved = []
+    monkeypatch.setattr(run_benchmarks, "QUICK_BASELINE", str(tmp_path / "quick.json"))
+    monkeypatch.setattr(run_benchmarks, "DEFAULT_BASELINE", str(tmp_path / "full.json"))
+    monkeypatch.setattr(run_benchmarks, "QUICK_SIZES", (20,))
+    monkeypatch.setattr(run_benchmarks, "QUICK_AGENTS", (1,))
+    monkeypatch.setattr(run_benchmarks, "OBSTACLE_DENSITY", (0.05,))
+    monkeypatch.setattr(run_benchmarks, "measure", lambda case: saved.append(case) or {
+        "construction_s": 0.1, "steps_per_s": 10.0, "bfs_calls_per_step": 0.0,
+        "bfs_nodes_per_step": 0.0, "search_calls_per_step": 0.0, "search_nodes_per_step": 0.0,
+        "peak_rss_mb": 1.0,
+    })
+
+    assert run_benchmarks.main(["--quick", "--sim", "Simulacion2"]) == 0
+    assert os.path.exists(tmp_path / "quick.json")
+    assert not os.path.exists(tmp_path / "full.json")
+    assert saved[0]["steps"] == run_benchmarks.QUICK_STEPS
+
+
+def test_only_simulacion2_sweeps_agents_and_floors():
+    sim1 = list(run_benchmarks.cases(["Simulacion1"], quick=False))
+    sim2 = list(run_benchmarks.cases(["Simulacion2"], quick=False))
+    assert {(c["agents"], c["floor"]) for c in sim1} == {(1, "dense")}
+    assert {c["floor"] for c in sim2} == set(run_benchmarks.FLOORS)
+    assert {c["agents"] for c in sim2} == set(run_benchmarks.AGENTS)
+    keys = [run_benchmarks.case_key(c) for c in sim1 + sim2]
+    assert len(keys) == len(set(keys))
+
+
+def test_counts_planner_searches():
+    case = dict(sim="Simulacion2", floor="dynamic", size=20, agents=3, obstacles=0.1, dirt=0.1, steps=120)
+    metrics = run_benchmarks.measure(case)
+    assert metrics["search_calls_per_step"] > 0
+    assert metrics["search_nodes_per_step"] > 0
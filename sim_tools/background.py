@@ -0,0 +1,170 @@
+import threading
+import time
+
+
+class Snapshot:
+    """Foto inmutable del modelo en un paso, lista para dibujar."""
+
+    def __init__(self, step, collected, data):
+        self.step = step
+        self.collected = collected   # renglones del DataCollector hasta este paso
+        self.data = data
+
+
+class SnapshotBuffer:
+    """
+    Buffer circular de snapshots sin locks.
+
+    Un solo escritor (el hilo de la simulación) escribe la ranura y luego
+    avanza count; los lectores (la UI) solo leen count y las ranuras, así
+    que nunca esperan al escritor. Con el GIL cada asignación es atómica.
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self.count = 0
+
+    def publish(self, snapshot):
+        self._slots[self.count % self.capacity] = snapshot
+        self.count += 1
+
+    def latest(self):
+        count = self.count
+        if not count:
+            return None
+        return self._slots[(count - 1) % self.capacity]
+
+    def history(self, n=None):
+        """Últimos n snapshots (sin la ranura que el escritor podría estar pisando)."""
+        count = self.count
+        available = min(count, self.capacity - 1)
+        if n is not None:
+            available = min(available, n)
+        return [self._slots[i % self.capacity] for i in range(count - available, count)]
+
+
+class BackgroundRunner:
+    """
+    Corre model.step() en un hilo aparte, tan rápido como pueda.
+
+    La simulación no espera a la UI: cada 1 / fps segundos publica en el
+    buffer un snapshot hecho con snapshot(model) y sigue. La UI dibuja el
+    más reciente a su propio ritmo, así que se salta los cuadros que no
+    alcanzó a dibujar. Las series de las gráficas se leen del DataCollector
+    hasta snapshot.collected (una copia de una lista, sin locks).
+    """
+
+    def __init__(self, model, snapshot, fps=10, capacity=64):
+        self.model = model
+        self.snapshot = snapshot
+        self.interval = 1.0 / fps
+        self.buffer = SnapshotBuffer(capacity)
+        self._play = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._publish()
+
+    def _collected(self):
+        model_vars = self.model.datacollector.model_vars
+        return min((len(values) for values in model_vars.values()), default=0)
+
+    def _publish(self):
+        model = self.model
+        self.buffer.publish(Snapshot(model.steps, self._collected(), self.snapshot(model)))
+
+    @property
+    def playing(self):
+        return self._play.is_set()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+        self._play.set()
+
+    def pause(self):
+        self._play.clear()
+
+    def toggle(self):
+        if self.playing:
+            self.pause()
+        else:
+            self.start()
+
+    def stop(self):
+        """Detiene el hilo y espera a que termine; start() lo vuelve a crear."""
+        self._stop.set()
+        self._play.set()   # despertar al hilo si estaba en pausa
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._play.clear()
+
+    def _loop(self):
+        last = time.monotonic()
+        while not self._stop.is_set():
+            if not self._play.wait(self.interval):
+                continue
+            if self._stop.is_set():
+                break
+            if not self.model.running:
+                self._publish()
+                self._play.clear()
+                continue
+
+            self.model.step()
+            now = time.monotonic()
+            if now - last >= self.interval or not self._play.is_set():
+                self._publish()
+                last = now
+
+    def series(self, key, snapshot=None):
+        """Valores del reporter key hasta el snapshot (por defecto el último)."""
+        snapshot = snapshot or self.buffer.latest()
+        return self.model.datacollector.model_vars.get(key, [])[:snapshot.collected]
+
+
+def make_background_page(runner, draw, series, fps=10, name="Model"):
+    """
+    Página de Solara para un BackgroundRunner: muestra el último snapshot
+    con draw(ax, snapshot) y las series del DataCollector, refrescando a
+    fps cuadros por segundo como máximo.
+    """
+    import solara
+    from matplotlib.figure import Figure
+
+    frame = solara.reactive(0)
+
+    @solara.component
+    def Page():
+        def refresh(cancel):
+            while not cancel.wait(1.0 / fps):
+                if runner.playing:
+                    frame.value += 1
+
+        solara.use_thread(refresh, dependencies=[])
+        frame.value  # volver a dibujar en cada cuadro
+
+        snapshot = runner.buffer.latest()
+        solara.Title(name)
+        with solara.Row():
+            solara.Button(
+                "Pausar" if runner.playing else "Correr",
+                on_click=lambda: (runner.toggle(), frame.set(frame.value + 1)),
+            )
+            solara.Text(f"Paso {snapshot.step}")
+
+        fig = Figure()
+        draw(fig.subplots(), snapshot)
+        solara.FigureMatplotlib(fig)
+
+        fig = Figure()
+        ax = fig.subplots()
+        for key in series:
+            ax.plot(runner.series(key, snapshot), label=key)
+        ax.legend()
+        solara.FigureMatplotlib(fig)
+
+    return Page
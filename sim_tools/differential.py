@@ -0,0 +1,249 @@
+"""
+Pruebas diferenciales: un motor rápido contra la implementación de
+referencia (agentes de Mesa), paso a paso y con la misma semilla.
+
+run_lockstep(make_reference, make_candidate, state, ...) crea los dos
+modelos, los avanza juntos y cada `every` pasos compara un digest (sha1)
+de su estado. Si los digests difieren, vuelve a correr los dos desde el
+principio hasta la última revisión buena y avanza de uno en uno hasta
+encontrar el primer paso distinto; regresa un Divergence con ese paso y
+un diff mínimo (solo las celdas, elementos o llaves que cambian).
+
+state(model) regresa un dict {componente: valor}; los valores pueden ser
+escalares, arreglos de NumPy, sets o dicts.
+
+Desde la raíz del repositorio:
+    python -m sim_tools.differential gol --width 50 --height 50 --steps 500
+    python -m sim_tools.differential roomba --candidate sparse=True --candidate hierarchical=False --steps 300
+
+sparse=True por sí solo activa también las rutas jerárquicas
+(hierarchical=True). Esas rutas son casi óptimas y rompen los empates de
+otra forma que el campo de distancias, así que con ellas solo se espera
+que coincida hasta el primer empate; el harness lo reporta como
+divergencia.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MAX_DIFF = 10   # elementos por componente en el diff
+
+
+# -- Digests y diffs ---------------------------------------------------------
+
+def _canonical(value):
+    if isinstance(value, np.ndarray):
+        return b"A" + str((value.dtype.str, value.shape)).encode() + np.ascontiguousarray(value).tobytes()
+    if isinstance(value, (set, frozenset)):
+        return b"S" + repr(sorted(value)).encode()
+    if isinstance(value, dict):
+        return b"D" + repr(sorted(value.items())).encode()
+    return b"V" + repr(value).encode()
+
+
+def digest(state):
+    """sha1 del estado, independiente del orden de sets y dicts."""
+    h = hashlib.sha1()
+    for name in sorted(state):
+        h.update(name.encode())
+        h.update(_canonical(state[name]))
+    return h.hexdigest()
+
+
+def _diff_value(ref, cand, limit):
+    if isinstance(ref, np.ndarray) or isinstance(cand, np.ndarray):
+        ref, cand = np.asarray(ref), np.asarray(cand)
+        if ref.shape != cand.shape:
+            return {"shape": (ref.shape, cand.shape)}
+        where = np.argwhere(ref != cand)
+        if not len(where):
+            return None
+        return {
+            "count": len(where),
+            "cells": [
+                (tuple(int(i) for i in idx), ref[tuple(idx)].item(), cand[tuple(idx)].item())
+                for idx in where[:limit]
+            ],
+        }
+    if isinstance(ref, (set, frozenset)) and isinstance(cand, (set, frozenset)):
+        if ref == cand:
+            return None
+        return {
+            "only_reference": sorted(ref - cand)[:limit],
+            "only_candidate": sorted(cand - ref)[:limit],
+        }
+    if isinstance(ref, dict) and isinstance(cand, dict):
+        keys = [k for k in sorted(ref.keys() | cand.keys()) if ref.get(k) != cand.get(k)]
+        if not keys:
+            return None
+        return {"count": len(keys), "keys": [(k, ref.get(k), cand.get(k)) for k in keys[:limit]]}
+    if ref == cand:
+        return None
+    return {"reference": ref, "candidate": cand}
+
+
+def state_diff(ref_state, cand_state, limit=MAX_DIFF):
+    """Diff mínimo {componente: diferencias} entre dos estados."""
+    diff = {}
+    for name in sorted(ref_state.keys() | cand_state.keys()):
+        if name not in ref_state or name not in cand_state:
+            diff[name] = {"missing": "reference" if name not in ref_state else "candidate"}
+            continue
+        d = _diff_value(ref_state[name], cand_state[name], limit)
+        if d is not None:
+            diff[name] = d
+    return diff
+
+
+class Divergence:
+    """Primer paso en que los dos motores no coinciden."""
+
+    def __init__(self, step, diff):
+        self.step = step
+        self.diff = diff
+
+    def __str__(self):
+        lines = [f"divergencia en el paso {self.step}:"]
+        for name, d in self.diff.items():
+            lines.append(f"  {name}: {d}")
+        return "\n".join(lines)
+
+
+# -- Corrida en paralelo -----------------------------------------------------
+
+def _advance(model, steps):
+    for _ in range(steps):
+        model.step()
+
+
+def _locate(make_reference, make_candidate, state, cand_state, start, end):
+    """Vuelve a correr desde cero y busca el primer paso distinto en (start, end]."""
+    ref, cand = make_reference(), make_candidate()
+    _advance(ref, start)
+    _advance(cand, start)
+    for step in range(start + 1, end + 1):
+        ref.step()
+        cand.step()
+        diff = state_diff(state(ref), cand_state(cand))
+        if diff:
+            return Divergence(step, diff)
+    # Los digests difirieron pero los estados no: algo no es determinista
+    return Divergence(end, {"nondeterministic": {"between": (start, end)}})
+
+
+def run_lockstep(make_reference, make_candidate, state, steps, every=1, candidate_state=None):
+    """
+    Corre los dos modelos steps pasos comparando digests cada `every`.
+    Regresa None si coinciden en todo o el primer Divergence.
+    """
+    cand_state = candidate_state or state
+    ref, cand = make_reference(), make_candidate()
+
+    diff = state_diff(state(ref), cand_state(cand))
+    if diff:
+        return Divergence(0, diff)
+
+    checked = 0
+    for step in range(1, steps + 1):
+        ref.step()
+        cand.step()
+        if step % every and step != steps:
+            continue
+        if digest(state(ref)) != digest(cand_state(cand)):
+            return _locate(make_reference, make_candidate, state, cand_state, checked, step)
+        checked = step
+    return None
+
+
+# -- Adaptadores ---------------------------------------------------------------
+
+def gol_state(model):
+    """Estado de ConwaysGameOfLife (agentes de Mesa) como arreglo [x, y]."""
+    states = np.zeros((model.grid.width, model.grid.height), dtype=np.uint8)
+    for (x, y), cell in model.cell_grid.items():
+        states[x, y] = cell.state
+    return {"steps": model.steps, "states": states}
+
+
+def array_gol_state(engine):
+    """Estado de ArrayAutomaton."""
+    return {"steps": engine.steps, "states": engine.states}
+
+
+def roomba_state(model):
+    """Estado de RandomModel: suciedad, roombas y cobertura."""
+    from random_agents.agent import RandomAgent
+
+    roombas = {
+        agent.index: (agent.cell.coordinate, agent.energy, agent.movements, agent.charging)
+        for agent in model.agents_by_type.get(RandomAgent, [])
+    }
+    return {
+        "steps": model.steps,
+        "dirt": frozenset(model.dirt_index),
+        "roombas": roombas,
+        "coverage": model.coverage.counts,
+    }
+
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return {"True": True, "False": False, "None": None}.get(text, text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model", choices=("gol", "roomba"))
+    parser.add_argument("--width", type=int, default=50)
+    parser.add_argument("--height", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--every", type=int, default=10)
+    parser.add_argument("--param", action="append", default=[], metavar="NOMBRE=VALOR",
+                        help="parámetro para los dos modelos")
+    parser.add_argument("--candidate", action="append", default=[], metavar="NOMBRE=VALOR",
+                        help="parámetro solo para el candidato (roomba)")
+    args = parser.parse_args(argv)
+
+    params = dict(width=args.width, height=args.height, seed=args.seed)
+    params.update((k, _parse_value(v)) for k, v in (p.split("=", 1) for p in args.param))
+
+    if args.model == "gol":
+        sys.path.insert(0, os.path.join(ROOT, "Actividad2", "cellularAutomata"))
+        from game_of_life.array_engine import ArrayAutomaton
+        from game_of_life.model import ConwaysGameOfLife
+
+        divergence = run_lockstep(
+            lambda: ConwaysGameOfLife(**params),
+            lambda: ArrayAutomaton(**params),
+            gol_state, args.steps, args.every, candidate_state=array_gol_state,
+        )
+    else:
+        sys.path.insert(0, os.path.join(ROOT, "ActividadRumba", "Simulacion2"))
+        from random_agents.model import RandomModel
+
+        candidate = dict(params)
+        candidate.update((k, _parse_value(v)) for k, v in (p.split("=", 1) for p in args.candidate))
+        divergence = run_lockstep(
+            lambda: RandomModel(**params),
+            lambda: RandomModel(**candidate),
+            roomba_state, args.steps, args.every,
+        )
+
+    if divergence is None:
+        print(f"sin diferencias en {args.steps} pasos")
+        return 0
+    print(divergence)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
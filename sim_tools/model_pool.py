@@ -0,0 +1,197 @@
+"""
+Reinicio en su lugar de modelos de Mesa y pool de modelos ya construidos.
+
+reset() de ConwaysGameOfLife y de los RandomModel reutiliza el grid en vez
+de construir todo otra vez. Para eso hay que tocar partes privadas de
+Mesa (semilla guardada, registros de agentes del modelo, contador de
+unique_id, agentes de cada celda, envoltorio de step); todo eso está aquí,
+detrás de supports_reset(). Con una versión de Mesa que no se ha probado
+los helpers fallan con RuntimeError y ModelPool construye modelos nuevos.
+"""
+import inspect
+import re
+import sys
+import threading
+import weakref
+
+import mesa
+from mesa.agent import Agent, AgentSet
+
+# Versiones (mayor, menor) de Mesa con las que se probó el reinicio
+TESTED_MESA = {(3, 3)}
+
+
+def mesa_version():
+    return tuple(int(part) for part in re.findall(r"\d+", mesa.__version__)[:2])
+
+
+def supports_reset():
+    """True si esta versión de Mesa es una con la que se probó el reinicio."""
+    return mesa_version() in TESTED_MESA
+
+
+def _check_mesa():
+    if not supports_reset():
+        tested = ", ".join(f"{major}.{minor}" for major, minor in sorted(TESTED_MESA))
+        raise RuntimeError(
+            f"reset() en su lugar solo se probó con Mesa {tested} (instalada: "
+            f"{mesa.__version__}); construye un modelo nuevo"
+        )
+
+
+def reset_model_state(model, seed):
+    """
+    Deja semilla, generadores y contador de pasos como los deja
+    Model.__init__(seed=seed): random.Random(seed) y, si numpy no acepta la
+    semilla, una derivada de random.
+    """
+    _check_mesa()
+    model.random.seed(seed)
+    model._seed = seed
+    try:
+        model.reset_rng(seed)
+    except TypeError:
+        model.reset_rng(model.random.randint(0, sys.maxsize))
+    model.steps = 0
+
+
+def clear_agents(model):
+    """
+    Quita todos los agentes de golpe; las celdas de model.grid y sus
+    vecindades se quedan. Los unique_id vuelven a empezar en 1.
+    """
+    _check_mesa()
+    grid = getattr(model, "grid", None)
+    if grid is not None:
+        for cell in grid.all_cells:
+            if cell._agents:
+                cell._agents.clear()
+                cell.empty = True
+    model._agents = {}
+    model._agents_by_type = {}
+    model._all_agents = AgentSet([], random=model.random)
+    Agent._ids.pop(model, None)
+
+
+def prepare_reinit(model):
+    """
+    Prepara model para volver a correr su __init__ completo: quita el
+    envoltorio de step que pone Model.__init__ (si no, se envolvería dos
+    veces) y reinicia el contador de unique_id.
+    """
+    _check_mesa()
+    model.__dict__.pop("step", None)
+    model.__dict__.pop("_user_step", None)
+    Agent._ids.pop(model, None)
+
+
+class ModelPool:
+    """
+    Modelos ya construidos, agrupados por tamaño (width, height).
+
+    acquire(**params) toma un modelo libre del tamaño pedido y lo reinicia
+    con model.reset(**params), que reutiliza grid y agentes; solo si no hay
+    ninguno libre se construye uno nuevo. El modelo al que reemplaza
+    (previous) vuelve al pool con release() y se reinicia hasta que alguien
+    lo vuelve a tomar, así que al mover un slider no se construye nada en
+    segundo plano compitiendo con la UI. warm() construye una sola vez, en
+    un hilo, los modelos de los tamaños comunes. Si la versión de Mesa no
+    permite reset(), siempre construye uno nuevo.
+    """
+
+    def __init__(self, factory, defaults, sizes=(), per_size=1):
+        self.factory = factory
+        self.defaults = defaults
+        self.sizes = list(sizes)
+        self.per_size = per_size
+        self._idle = {}                             # (width, height) -> [modelos]
+        self._sizes = weakref.WeakKeyDictionary()   # modelo entregado -> su tamaño
+        self._lock = threading.Lock()
+        self._warmed = False
+
+    def _size(self, params):
+        return (
+            params.get("width", self.defaults.get("width")),
+            params.get("height", self.defaults.get("height")),
+        )
+
+    def _add(self, size, model):
+        with self._lock:
+            idle = self._idle.setdefault(size, [])
+            if len(idle) < self.per_size and all(other is not model for other in idle):
+                idle.append(model)
+
+    def _fill(self):
+        for size in self.sizes:
+            width, height = size
+            self._add(size, self.factory(width=width, height=height))
+
+    def warm(self):
+        """Construye en un hilo los modelos de los tamaños comunes (una sola vez)."""
+        with self._lock:
+            if self._warmed or not self.sizes or not supports_reset():
+                return
+            self._warmed = True
+        threading.Thread(target=self._fill, daemon=True).start()
+
+    def release(self, model):
+        """Regresa al pool un modelo entregado que ya no se usa."""
+        size = self._sizes.get(model)
+        if size is not None and supports_reset():
+            self._add(size, model)
+
+    def acquire(self, previous=None, **params):
+        if not supports_reset():
+            return self.factory(**params)
+        size = self._size(params)
+        with self._lock:
+            idle = self._idle.get(size)
+            model = idle.pop() if idle else None
+
+        if model is not None:
+            model.reset(**params)
+        else:
+            model = self.factory(**params)
+        self._sizes[model] = size
+        if previous is not None and previous is not model:
+            self.release(previous)
+        self.warm()
+        return model
+
+
+def pooled(model_cls, sizes=(), per_size=1):
+    """
+    Subclase de model_cls cuya construcción pasa por un ModelPool.
+
+    SolaraViz vuelve a crear el modelo con model.__class__(**params) cada
+    vez que cambia un parámetro; con esta subclase esa llamada regresa un
+    modelo del pool ya reiniciado en vez de construir todo desde cero.
+    Cada modelo construido es de su propia subclase (con el mismo nombre),
+    así que la llamada sabe qué modelo se está reemplazando y lo regresa
+    al pool; los de otras sesiones no se tocan.
+    """
+    defaults = {
+        name: param.default
+        for name, param in inspect.signature(model_cls.__init__).parameters.items()
+        if param.default is not inspect.Parameter.empty
+    }
+
+    class PooledMeta(type(model_cls)):
+        def __call__(cls, *args, **params):
+            if args:
+                return super().__call__(*args, **params)
+            owner = cls.__dict__.get("_owner")
+            return cls.pool.acquire(previous=owner() if owner else None, **params)
+
+    attrs = {"__module__": model_cls.__module__, "__qualname__": model_cls.__qualname__}
+    cls = PooledMeta(model_cls.__name__, (model_cls,), attrs)
+
+    def build(**params):
+        # La fábrica construye de verdad (sin volver a pasar por el pool)
+        lease = PooledMeta(model_cls.__name__, (cls,), dict(attrs))
+        model = type.__call__(lease, **params)
+        lease._owner = weakref.ref(model)
+        return model
+
+    cls.pool = ModelPool(build, defaults, sizes, per_size)
+    return cls
@@ -0,0 +1,50 @@
+def border_coords(width, height):
+    """Coordenadas del borde del grid, calculadas sin recorrer el interior."""
+    for x in range(width):
+        yield (x, 0)
+        if height > 1:
+            yield (x, height - 1)
+    for y in range(1, height - 1):
+        yield (0, y)
+        if width > 1:
+            yield (width - 1, y)
+
+
+def interior_coord(index, height):
+    """Coordenada interior número index (el interior se numera columna por columna)."""
+    inner_height = height - 2
+    return (1 + index // inner_height, 1 + index % inner_height)
+
+
+def sample_placements(random, width, height, counts, exclude=()):
+    """
+    Sortea de una sola vez, sin reemplazo, las posiciones de varios grupos
+    de agentes en el interior del grid (todo lo que no es borde).
+
+    counts es una lista con el tamaño de cada grupo; se regresa una lista de
+    coordenadas por grupo, sin repetidas entre grupos. Si no caben todos,
+    se recortan los últimos grupos. exclude son coordenadas reservadas que
+    nunca se sortean.
+    """
+    inner_height = height - 2
+    free = max(0, width - 2) * max(0, inner_height)
+    exclude = set(exclude)
+    available = free - len(exclude)
+
+    sizes = []
+    for count in counts:
+        size = max(0, min(count, available))
+        sizes.append(size)
+        available -= size
+
+    total = sum(sizes)
+    drawn = random.sample(range(free), min(free, total + len(exclude)))
+    coords = [interior_coord(i, height) for i in drawn]
+    coords = [c for c in coords if c not in exclude][:total]
+
+    groups = []
+    start = 0
+    for size in sizes:
+        groups.append(coords[start:start + size])
+        start += size
+    return groups
@@ -0,0 +1,314 @@
+"""
+Réplicas Monte Carlo adaptativas.
+
+En lugar de correr un número fijo y generoso de semillas por
+configuración, AdaptiveExperiment corre réplicas en tandas paralelas,
+acumula media y varianza en línea (Welford) y deja de correr cada
+configuración en cuanto el intervalo de confianza de cada métrica es más
+angosto que el objetivo. Entre tanda y tanda, las réplicas se reparten
+según cuántas le faltan a cada configuración, así que las configuraciones
+ruidosas reciben más y las estables terminan pronto.
+
+La réplica j de cualquier configuración usa la semilla seed + j (números
+aleatorios comunes), así que las diferencias entre configuraciones no se
+deben a las semillas.
+
+Una métrica puede regresar None cuando la réplica no la observó (p. ej.
+time_to_clean de una corrida que llegó a max_steps sin terminar de
+limpiar). Esos valores censurados no entran a la media; se cuentan en
+ConfigResult.censored y en summary(). Si hay muchos, la media está
+sesgada hacia abajo: conviene subir max_steps. Si después de min_replicas
+más de max_censored de las réplicas salen censuradas en alguna métrica
+del objetivo (suciedad inalcanzable, o dirt_rate > 0 con el paro por
+defecto), la configuración se deja de correr en vez de gastar
+max_replicas corridas hasta max_steps; ConfigResult.reason dice por qué
+terminó cada configuración.
+
+Ejemplo (desde ActividadRumba/Simulacion2):
+    from random_agents.model import RandomModel
+    from sim_tools.replication import AdaptiveExperiment
+
+    configs = [dict(num_agents=n, width=20, height=20) for n in (1, 3, 5)]
+    experiment = AdaptiveExperiment(RandomModel, configs, target={"time_to_clean": 20})
+    for result in experiment.run():
+        print(result.params, result.n, result.interval("time_to_clean"), result.reason)
+"""
+import functools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+try:
+    from scipy.stats import t as _student_t
+except ImportError:   # scipy es opcional
+    _student_t = None
+
+
+class Welford:
+    """Media y varianza en línea (algoritmo de Welford)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else float("inf")
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def half_width(self, confidence=0.95):
+        """Mitad del ancho del intervalo t de la media."""
+        if self.n < 2:
+            return float("inf")
+        return t_quantile(confidence, self.n - 1) * self.std / math.sqrt(self.n)
+
+
+def t_quantile(confidence, df):
+    """
+    Cuantil bilateral de la t de Student. Con scipy es exacto; sin scipy
+    se usa la expansión de Cornish-Fisher alrededor de la normal (error
+    < 1% desde df = 3, pero 11.3 en vez de 12.706 con df = 1).
+    """
+    if _student_t is not None:
+        return float(_student_t.ppf(0.5 + confidence / 2, df))
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    z3, z5, z7, z9 = z ** 3, z ** 5, z ** 7, z ** 9
+    return (
+        z
+        + (z3 + z) / (4 * df)
+        + (5 * z5 + 16 * z3 + 3 * z) / (96 * df ** 2)
+        + (3 * z7 + 19 * z5 + 17 * z3 - 15 * z) / (384 * df ** 3)
+        + (79 * z9 + 776 * z7 + 1482 * z5 - 1920 * z3 - 945 * z) / (92160 * df ** 4)
+    )
+
+
+# -- Métricas y condiciones de paro -----------------------------------------
+# Tienen que ser funciones de módulo (o functools.partial) para poder
+# mandarlas a los procesos.
+
+def _last_value(model, name):
+    values = model.datacollector.model_vars.get(name)
+    return values[-1] if values else None
+
+
+def reporter(name):
+    """Métrica: último valor del reporter name del DataCollector."""
+    return functools.partial(_last_value, name=name)
+
+
+def is_clean(model):
+    """Paro: ya no queda suciedad."""
+    return _last_value(model, "Suciedad") == 0
+
+
+def steps_taken(model):
+    return model.steps
+
+
+def time_to_clean(model):
+    """Pasos hasta limpiar todo, o None (censurado) si quedó suciedad."""
+    return model.steps if is_clean(model) else None
+
+
+DEFAULT_METRICS = {"time_to_clean": time_to_clean}
+
+
+def run_replica(cls, params, seed, max_steps, metrics, stop):
+    """Una réplica: corre hasta stop(model) o max_steps y evalúa las métricas."""
+    model = cls(**params, seed=seed)
+    while model.running and model.steps < max_steps:
+        model.step()
+        if stop is not None and stop(model):
+            break
+    return {name: metric(model) for name, metric in metrics.items()}
+
+
+class ConfigResult:
+    """
+    Estadísticas acumuladas de una configuración.
+
+    n es el número de réplicas corridas; stats[name].n las que sí
+    observaron la métrica y censored[name] las que regresaron None.
+    reason dice por qué se dejó de correr: "target", "max_replicas" o
+    "censored: <métrica> <censuradas>/<réplicas>" (None mientras corre).
+    """
+
+    def __init__(self, params, metrics, confidence):
+        self.params = params
+        self.confidence = confidence
+        self.stats = {name: Welford() for name in metrics}
+        self.censored = dict.fromkeys(metrics, 0)
+        self.n = 0
+        self.done = False
+        self.reason = None
+
+    def add(self, values):
+        self.n += 1
+        for name, value in values.items():
+            if value is None:
+                self.censored[name] += 1
+            else:
+                self.stats[name].add(value)
+
+    def censored_fraction(self, name):
+        return self.censored[name] / self.n if self.n else 0.0
+
+    def interval(self, name):
+        stat = self.stats[name]
+        half = stat.half_width(self.confidence)
+        return stat.mean - half, stat.mean + half
+
+    def needed(self, target, relative):
+        """
+        Réplicas totales estimadas para que todas las métricas alcancen su
+        ancho (contando que una fracción de ellas sale censurada).
+        """
+        needed = self.n
+        for name, width in target.items():
+            stat = self.stats[name]
+            if stat.n < 2:
+                return self.n + 1
+            if relative:
+                width *= abs(stat.mean)
+            if stat.variance == 0:
+                continue
+            if width <= 0:
+                return math.inf
+            t = t_quantile(self.confidence, stat.n - 1)
+            observed = math.ceil((2 * t * stat.std / width) ** 2)
+            needed = max(needed, math.ceil(observed * self.n / stat.n))
+        return needed
+
+    def summary(self):
+        return {
+            name: {
+                "mean": stat.mean if stat.n else None,
+                "std": stat.std if stat.n > 1 else None,
+                "half_width": stat.half_width(self.confidence),
+                "n": stat.n,
+                "censored": self.censored[name],
+            }
+            for name, stat in self.stats.items()
+        }
+
+
+class AdaptiveExperiment:
+    """
+    Barrido de configuraciones con paro por ancho del intervalo de confianza.
+
+    target: {métrica: ancho total deseado del intervalo} (o un número para
+    todas las métricas); con relative=True el ancho es una fracción de la
+    media. Cada configuración corre al menos min_replicas y como máximo
+    max_replicas; se detiene antes si más de max_censored (fracción) de sus
+    réplicas salen censuradas en alguna métrica del objetivo. batch_size es cuántas réplicas se mandan por tanda a
+    workers procesos (workers=1 corre todo en este proceso).
+    """
+
+    def __init__(
+        self,
+        cls,
+        configs,
+        target,
+        metrics=None,
+        stop=is_clean,
+        max_steps=10_000,
+        confidence=0.95,
+        relative=False,
+        min_replicas=5,
+        max_replicas=500,
+        max_censored=0.5,
+        batch_size=None,
+        workers=None,
+        seed=0,
+    ):
+        self.cls = cls
+        self.metrics = metrics or DEFAULT_METRICS
+        if not isinstance(target, dict):
+            target = dict.fromkeys(self.metrics, target)
+        self.target = target
+        self.stop = stop
+        self.max_steps = max_steps
+        self.relative = relative
+        self.min_replicas = max(min_replicas, 2)
+        self.max_replicas = max_replicas
+        self.max_censored = max_censored
+        self.workers = workers
+        self.batch_size = batch_size
+        self.seed = seed
+        self.results = [ConfigResult(params, self.metrics, confidence) for params in configs]
+        self.total_replicas = 0
+
+    def _allocate(self, budget):
+        """Reparte budget réplicas entre las configuraciones que no han terminado."""
+        missing = {}
+        for i, result in enumerate(self.results):
+            if result.done:
+                continue
+            if result.n < self.min_replicas:
+                want = self.min_replicas - result.n
+            else:
+                # Casi todo censurado: la media no va a converger
+                censored = [
+                    name for name in self.target
+                    if result.censored_fraction(name) > self.max_censored
+                ]
+                if censored:
+                    result.done = True
+                    result.reason = "censored: " + ", ".join(
+                        f"{name} {result.censored[name]}/{result.n}" for name in censored
+                    )
+                    continue
+                want = result.needed(self.target, self.relative) - result.n
+            want = min(want, self.max_replicas - result.n)
+            if want <= 0:
+                result.done = True
+                result.reason = "max_replicas" if result.n >= self.max_replicas else "target"
+            else:
+                missing[i] = want
+
+        total = sum(missing.values())
+        if total <= budget:
+            return missing
+        # Proporcional a lo que le falta a cada una, al menos una por configuración
+        allocation = {i: max(1, int(budget * want / total)) for i, want in missing.items()}
+        return {i: min(n, missing[i]) for i, n in allocation.items()}
+
+    def _run_batch(self, pool, allocation):
+        jobs = []
+        for i, count in sorted(allocation.items()):
+            result = self.results[i]
+            start = result.n
+            for j in range(start, start + count):
+                args = (self.cls, result.params, self.seed + j, self.max_steps, self.metrics, self.stop)
+                jobs.append((i, pool.submit(run_replica, *args) if pool else run_replica(*args)))
+        # Se agregan en orden de semilla para que el resultado no dependa de los procesos
+        for i, job in jobs:
+            self.results[i].add(job.result() if pool else job)
+        self.total_replicas += len(jobs)
+
+    def run(self):
+        """Corre tandas hasta que todas las configuraciones alcanzan el objetivo."""
+        workers = self.workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(workers) if workers > 1 else None
+        budget = self.batch_size or 2 * workers
+        try:
+            while True:
+                allocation = self._allocate(max(budget, len(self.results)))
+                if not allocation:
+                    break
+                self._run_batch(pool, allocation)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.results
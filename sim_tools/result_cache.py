@@ -0,0 +1,320 @@
+"""
+Caché en disco de corridas de simulación.
+
+La llave de cada corrida es un hash de la clase del modelo, sus
+parámetros, la semilla, el número de pasos, la función de resumen y el
+código fuente del paquete del modelo y de los módulos locales que importa
+(p. ej. sim_tools), así que si cambia cualquiera de esos .py las corridas
+viejas dejan de coincidir solas. Cada resultado es
+un JSON con las métricas de resumen y, si se pide, las columnas del
+DataCollector.
+
+El tamaño total se limita con max_bytes: cuando al guardar se pasa del
+límite se borran los resultados usados hace más tiempo (LRU por mtime;
+leer un resultado le actualiza el mtime) hasta bajar al 90 %.
+
+Ejemplo:
+    from random_agents.model import RandomModel
+    from sim_tools.result_cache import ResultCache
+
+    cache = ResultCache(".sim_cache")
+    runs = [dict(num_agents=n, width=20, height=20) for n in (1, 5, 10)]
+    results = cache.run_batch(RandomModel, runs, seeds=range(10), steps=500)
+"""
+import ast
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import sysconfig
+import tempfile
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Al desalojar se baja a esta fracción de max_bytes, para no volver a
+# recorrer el directorio en cada put que siga
+LOW_WATER = 0.9
+
+_source_hashes = {}
+
+# Rutas de la biblioteca estándar y de los paquetes instalados (no se hashean)
+_INSTALLED = {
+    sysconfig.get_paths().get(key) for key in ("stdlib", "platstdlib", "purelib", "platlib")
+}
+
+
+def class_name(cls):
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _is_local(path):
+    """True si path no es de la biblioteca estándar ni de site-packages."""
+    path = os.path.realpath(path)
+    return not any(
+        path.startswith(os.path.realpath(prefix) + os.sep) for prefix in _INSTALLED if prefix
+    )
+
+
+def _imports(path, module):
+    """Nombres de los módulos que importa el archivo path (módulo module)."""
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), path)
+    package = module if path.endswith("__init__.py") else module.rpartition(".")[0]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            try:
+                base = importlib.util.resolve_name("." * node.level + (node.module or ""), package)
+            except (ImportError, ValueError):
+                continue
+            yield base
+            # from paquete import submódulo
+            yield from (f"{base}.{alias.name}" for alias in node.names)
+
+
+def _local_sources(module):
+    """
+    {nombre del módulo: archivo} de module y de todo lo que importa,
+    directa o indirectamente, sin contar la biblioteca estándar ni los
+    paquetes instalados.
+    """
+    sources = {}
+    pending = [module]
+    while pending:
+        name = pending.pop()
+        if name in sources:
+            continue
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError, AttributeError):
+            spec = None
+        path = getattr(spec, "origin", None)
+        if not path or not path.endswith(".py") or not _is_local(path):
+            sources[name] = None
+            continue
+        sources[name] = path
+        pending.extend(_imports(path, name))
+        # Un paquete cuenta con sus padres (sus __init__ se ejecutan al importarlo)
+        parent = name.rpartition(".")[0]
+        if parent:
+            pending.append(parent)
+    return {name: path for name, path in sources.items() if path}
+
+
+def source_hash(cls):
+    """
+    Hash del código del que depende cls: todos los .py de su paquete (o
+    su módulo) más los módulos locales que importan, directa o
+    indirectamente (p. ej. sim_tools.placement).
+    """
+    name = class_name(cls)
+    if name in _source_hashes:
+        return _source_hashes[name]
+
+    module = sys.modules[cls.__module__]
+    package = cls.__module__.rpartition(".")[0]
+    files = {}
+    if package and package in sys.modules and hasattr(sys.modules[package], "__path__"):
+        # __path__ también existe en paquetes sin __init__.py (namespace)
+        root = list(sys.modules[package].__path__)[0]
+        for directory, _, names in os.walk(root):
+            for f in names:
+                if f.endswith(".py"):
+                    path = os.path.join(directory, f)
+                    files[os.path.relpath(path, root)] = path
+    else:
+        files[os.path.basename(module.__file__)] = module.__file__
+
+    for dependency, path in _local_sources(cls.__module__).items():
+        if path not in files.values():
+            files[dependency] = path
+
+    digest = hashlib.sha256()
+    for label, path in sorted(files.items()):
+        digest.update(label.encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    _source_hashes[name] = digest.hexdigest()
+    return _source_hashes[name]
+
+
+def function_id(func):
+    """
+    Identidad de una función de resumen: nombre calificado más un hash de
+    su código y de los valores que captura (closures, functools.partial).
+    """
+    if isinstance(func, functools.partial):
+        return [function_id(func.func), repr(func.args), repr(sorted(func.keywords.items()))]
+
+    name = f"{getattr(func, '__module__', None)}.{getattr(func, '__qualname__', type(func).__qualname__)}"
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        code = getattr(func, "__code__", None)
+        source = code.co_code.hex() if code is not None else ""
+    captured = [repr(cell.cell_contents) for cell in getattr(func, "__closure__", None) or ()]
+    return [name, hashlib.sha256((source + repr(captured)).encode()).hexdigest()]
+
+
+def cache_key(cls, params, seed, steps, summarize=None):
+    """Llave de la corrida: sha256 del JSON canónico de todo lo que la define."""
+    payload = json.dumps(
+        {
+            "class": class_name(cls),
+            "params": params,
+            "seed": seed,
+            "steps": steps,
+            "summarize": function_id(summarize or default_summary),
+            "source": source_hash(cls),
+        },
+        sort_keys=True,
+        default=repr,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def default_summary(model):
+    """Último renglón de los reporters del modelo, más pasos y running."""
+    summary = {"steps": model.steps, "running": model.running}
+    datacollector = getattr(model, "datacollector", None)
+    if datacollector is not None:
+        for key, values in datacollector.model_vars.items():
+            if values:
+                summary[key] = values[-1]
+    return summary
+
+
+def run_model(cls, params, seed, steps, summarize=default_summary, collect=False):
+    """Corre una simulación hasta steps pasos (o hasta que se detenga)."""
+    model = cls(**params, seed=seed)
+    while model.running and model.steps < steps:
+        model.step()
+    result = {"summary": summarize(model)}
+    if collect and getattr(model, "datacollector", None) is not None:
+        result["model_vars"] = {
+            key: list(values) for key, values in model.datacollector.model_vars.items()
+        }
+    return result
+
+
+class ResultCache:
+    """Resultados de corridas guardados como JSON en directory."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None   # total en bytes; se mide al primer put
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key):
+        """Resultado guardado para key, o None."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(path)
+        return result
+
+    def put(self, key, result):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Se escribe a un temporal y se renombra para no dejar archivos a medias
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f, default=_to_json)
+        try:
+            replaced = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp, path)
+
+        # El total se lleva al día en cada put; el directorio solo se
+        # recorre la primera vez y cuando hay que desalojar
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += os.path.getsize(path) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        for directory, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".json"):
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, target=None):
+        """
+        Borra los resultados menos usados hasta quedar en target bytes (por
+        defecto LOW_WATER * max_bytes, o nada si no se pasa de max_bytes).
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        if target is None:
+            target = self.max_bytes * LOW_WATER if total > self.max_bytes else total
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+    def clear(self):
+        for _, _, path in list(self._entries()):
+            os.remove(path)
+        self._size = 0
+
+    def run(self, cls, params, seed, steps, summarize=default_summary, collect=False):
+        """Resultado de la corrida: del caché si ya existe, si no la corre y la guarda."""
+        key = cache_key(cls, params, seed, steps, summarize)
+        result = self.get(key)
+        if result is not None and (not collect or "model_vars" in result):
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = run_model(cls, params, seed, steps, summarize, collect)
+        self.put(key, result)
+        return result
+
+    def run_batch(self, cls, runs, seeds, steps, summarize=default_summary, collect=False):
+        """
+        Corre cada combinación de parámetros en runs con cada semilla.
+        Regresa una lista de dicts con params, seed y el resultado; solo se
+        simulan las combinaciones que no estaban en el caché.
+        """
+        return [
+            {"params": params, "seed": seed, **self.run(cls, params, seed, steps, summarize, collect)}
+            for params in runs
+            for seed in seeds
+        ]
+
+
+def _to_json(value):
+    # Escalares de numpy en los reporters
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return repr(value)
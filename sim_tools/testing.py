@@ -0,0 +1,57 @@
+"""
+Apoyo para las pruebas con pytest.
+
+Simulacion1 y Simulacion2 traen cada una un paquete random_agents, y
+Actividad1 y Actividad2 uno game_of_life. pytest corre todas las pruebas
+en un solo proceso, así que el primero que se importa taparía al otro.
+Cada carpeta tests/ declara en su conftest.py de qué copia es:
+
+    from sim_tools.testing import use_package
+    random_agents_package = use_package("random_agents", APP_DIR)
+
+use_package importa el paquete completo desde APP_DIR y regresa un
+fixture autouse que vuelve a poner esos módulos (y APP_DIR al frente de
+sys.path, para los procesos hijos) durante cada prueba de la carpeta.
+"""
+import importlib
+import os
+import pkgutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _modules(name):
+    return {
+        module_name: module
+        for module_name, module in sys.modules.items()
+        if module_name == name or module_name.startswith(name + ".")
+    }
+
+
+def use_package(name, directory):
+    """Importa `name` desde directory y regresa el fixture que lo deja activo."""
+    directory = os.path.abspath(directory)
+    for module_name in _modules(name):
+        del sys.modules[module_name]
+
+    sys.path.insert(0, directory)
+    try:
+        package = importlib.import_module(name)
+        for info in pkgutil.iter_modules(package.__path__):
+            importlib.import_module(f"{name}.{info.name}")
+    finally:
+        sys.path.remove(directory)
+    modules = _modules(name)
+
+    @pytest.fixture(autouse=True, name=f"{name}_package")
+    def fixture(monkeypatch):
+        for module_name in _modules(name):
+            monkeypatch.delitem(sys.modules, module_name)
+        for module_name, module in modules.items():
+            monkeypatch.setitem(sys.modules, module_name, module)
+        monkeypatch.syspath_prepend(directory)
+
+    return fixture
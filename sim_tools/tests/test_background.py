@@ -0,0 +1,130 @@
+import threading
+import time
+
+from mesa import Model
+from mesa.datacollection import DataCollector
+
+from sim_tools.background import BackgroundRunner, Snapshot, SnapshotBuffer
+
+
+class Counter(Model):
+    """Modelo mínimo: cuenta pasos y se detiene en limit."""
+
+    def __init__(self, limit=None):
+        super().__init__(seed=1)
+        self.limit = limit
+        self.datacollector = DataCollector(model_reporters={"Paso": lambda m: m.steps})
+        self.datacollector.collect(self)
+
+    def step(self):
+        self.datacollector.collect(self)
+        if self.limit is not None and self.steps >= self.limit:
+            self.running = False
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "tiempo agotado"
+        time.sleep(0.001)
+
+
+def test_buffer_wraps_around():
+    buffer = SnapshotBuffer(capacity=4)
+    assert buffer.latest() is None
+    assert buffer.history() == []
+
+    for step in range(11):
+        buffer.publish(Snapshot(step, step, None))
+        assert buffer.latest().step == step
+
+    # La ranura que sigue (la más vieja) se deja fuera: el escritor la pisa después
+    assert [s.step for s in buffer.history()] == [8, 9, 10]
+    assert [s.step for s in buffer.history(2)] == [9, 10]
+
+
+def test_producer_and_consumer_without_locks():
+    buffer = SnapshotBuffer(capacity=8)
+    total = 20000
+    seen = []
+
+    def produce():
+        for step in range(total):
+            buffer.publish(Snapshot(step, step, None))
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while producer.is_alive():
+        latest = buffer.latest()
+        if latest is not None:
+            seen.append(latest.step)
+        for snapshot in buffer.history():
+            assert isinstance(snapshot, Snapshot)
+    producer.join()
+
+    assert seen == sorted(seen)
+    assert buffer.latest().step == total - 1
+    assert [s.step for s in buffer.history()] == list(range(total - 7, total))
+
+
+def test_runner_publishes_while_stepping():
+    model = Counter()
+    runner = BackgroundRunner(model, lambda m: m.steps, fps=200)
+    assert runner.buffer.latest().step == 0
+
+    runner.start()
+    wait_until(lambda: runner.buffer.count > 3 and model.steps > 100)
+    runner.stop()
+
+    latest = runner.buffer.latest()
+    assert 0 < latest.step <= model.steps
+    assert latest.data == latest.step
+    assert runner.series("Paso", latest) == list(range(latest.collected))
+
+
+def test_pause_and_stop_freeze_the_model():
+    model = Counter()
+    runner = BackgroundRunner(model, lambda m: None, fps=100)
+    runner.start()
+    wait_until(lambda: model.steps > 10)
+
+    runner.pause()
+    time.sleep(0.05)
+    paused_at = model.steps
+    time.sleep(0.05)
+    assert model.steps == paused_at
+    assert not runner.playing
+
+    runner.stop()
+    assert runner._thread is None
+    assert not runner.playing
+
+
+def test_stop_then_restart_keeps_stepping():
+    model = Counter()
+    runner = BackgroundRunner(model, lambda m: None, fps=100)
+    runner.start()
+    wait_until(lambda: model.steps > 10)
+    runner.stop()
+    stopped_at = model.steps
+
+    runner.start()
+    wait_until(lambda: model.steps > stopped_at + 10)
+    runner.stop()
+
+    runner.toggle()
+    wait_until(lambda: model.steps > stopped_at + 20)
+    runner.stop()
+
+
+def test_runner_stops_with_the_model():
+    model = Counter(limit=50)
+    runner = BackgroundRunner(model, lambda m: m.steps, fps=1000)
+    runner.start()
+    wait_until(lambda: not runner.playing)
+    runner.stop()
+
+    assert model.steps == 50
+    last = runner.buffer.latest()
+    assert last.step == 50 and last.data == 50
+    assert runner.series("Paso") == list(range(51))
@@ -0,0 +1,101 @@
+import pytest
+from mesa import Model
+
+from sim_tools import model_pool
+from sim_tools.model_pool import ModelPool, clear_agents, pooled, reset_model_state
+
+
+class Board(Model):
+    """Modelo mínimo con reset() en su lugar."""
+
+    def __init__(self, width=3, height=3, seed=None):
+        super().__init__(seed=seed)
+        self.width = None
+        self.reset(width=width, height=height, seed=seed)
+
+    def reset(self, width=3, height=3, seed=None):
+        if self.width is not None:
+            reset_model_state(self, seed)
+            clear_agents(self)
+        self.width, self.height = width, height
+        self.value = self.random.random()
+
+
+def test_reset_matches_a_new_model():
+    model = Board(seed=1)
+    model.random.random()
+    model.reset(seed=5)
+    assert model.value == Board(seed=5).value
+    assert model.rng.random() == Board(seed=5).rng.random()
+
+
+def test_pool_reuses_models_of_the_same_size():
+    pool = ModelPool(Board, {"width": 3, "height": 3})
+    first = pool.acquire(seed=1)
+    pool.release(first)
+    again = pool.acquire(seed=2)
+    assert again is first
+    assert again.value == Board(seed=2).value
+
+
+def test_replaced_model_goes_back_to_the_pool(monkeypatch):
+    builds = []
+    cls = pooled(Board)
+    factory = cls.pool.factory
+    monkeypatch.setattr(cls.pool, "factory", lambda **p: builds.append(p) or factory(**p))
+
+    first = cls(seed=1)
+    # Como SolaraViz al mover un slider: model.__class__(**params)
+    second = first.__class__(seed=2)
+    third = second.__class__(seed=3)
+    assert len(builds) == 2
+    assert third is first
+    assert isinstance(third, Board) and type(third).__name__ == "Board"
+    assert third.value == Board(seed=3).value
+
+    # Con otro tamaño no hay modelo libre y se construye uno
+    other = third.__class__(width=4, seed=4)
+    assert len(builds) == 3
+    assert other.width == 4
+    # per_size=1: ya estaba second, así que third se descarta
+    assert cls.pool._idle[(3, 3)] == [second]
+
+
+def test_other_sessions_models_are_not_recycled():
+    cls = pooled(Board)
+    mine, theirs = cls(seed=1), cls(seed=2)
+    replacement = mine.__class__(seed=3)
+    assert replacement is not theirs
+    assert cls.pool._idle[(3, 3)] == [mine]
+    assert theirs.value == Board(seed=2).value
+
+
+def test_acquire_does_not_build_in_the_background(monkeypatch):
+    threads = []
+    monkeypatch.setattr(model_pool.threading, "Thread", lambda **kw: threads.append(kw) or _NoThread())
+    cls = pooled(Board, sizes=[(3, 3)])
+    model = cls(seed=1)
+    for seed in range(2, 6):
+        model = model.__class__(seed=seed)
+    # Solo el llenado inicial de warm()
+    assert len(threads) == 1
+
+
+class _NoThread:
+    def start(self):
+        pass
+
+
+def test_untested_mesa_builds_new_models(monkeypatch):
+    monkeypatch.setattr(model_pool, "TESTED_MESA", set())
+    with pytest.raises(RuntimeError, match="Mesa"):
+        reset_model_state(Model(), 1)
+
+    cls = pooled(Board, sizes=[(3, 3)])
+    cls.pool.warm()
+    assert not cls.pool._warmed
+    first = cls(seed=1)
+    second = first.__class__(seed=1)
+    assert first is not second
+    assert first.value == second.value
+    assert not cls.pool._idle
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from sim_tools.placement import border_coords, sample_placements
+
+
+@pytest.mark.parametrize("width, height", [(1, 1), (1, 5), (5, 1), (2, 2), (3, 7), (10, 6)])
+def test_border_coords_matches_brute_force(width, height):
+    expected = {
+        (x, y) for x in range(width) for y in range(height)
+        if x in (0, width - 1) or y in (0, height - 1)
+    }
+    coords = list(border_coords(width, height))
+    assert len(coords) == len(set(coords))
+    assert set(coords) == expected
+
+
+def test_groups_are_interior_and_disjoint():
+    groups = sample_placements(random.Random(3), 12, 9, [5, 20, 30])
+    assert [len(g) for g in groups] == [5, 20, 30]
+
+    coords = [c for group in groups for c in group]
+    assert len(coords) == len(set(coords))
+    assert all(1 <= x <= 10 and 1 <= y <= 7 for x, y in coords)
+
+
+def test_later_groups_are_cut_when_full():
+    # Interior de 4 x 3 = 12 celdas
+    groups = sample_placements(random.Random(0), 6, 5, [5, 10, 4])
+    assert [len(g) for g in groups] == [5, 7, 0]
+
+
+def test_exclude_is_never_drawn():
+    exclude = [(1, 1), (2, 3)]
+    for seed in range(20):
+        groups = sample_placements(random.Random(seed), 6, 6, [8, 8], exclude=exclude)
+        coords = [c for group in groups for c in group]
+        assert [len(g) for g in groups] == [8, 6]
+        assert not set(exclude) & set(coords)
+
+
+def test_same_seed_same_placement():
+    a = sample_placements(random.Random(9), 30, 30, [3, 50, 100])
+    b = sample_placements(random.Random(9), 30, 30, [3, 50, 100])
+    assert a == b
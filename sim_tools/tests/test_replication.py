@@ -0,0 +1,122 @@
+import math
+
+import pytest
+from mesa import Model
+from mesa.datacollection import DataCollector
+
+from sim_tools import replication
+from sim_tools.replication import AdaptiveExperiment, ConfigResult, Welford, t_quantile
+
+
+class Cleaner(Model):
+    """Cada paso limpia una mancha con probabilidad rate."""
+
+    def __init__(self, dirt=5, rate=0.5, seed=None):
+        super().__init__(seed=seed)
+        self.dirt = dirt
+        self.rate = rate
+        self.datacollector = DataCollector(model_reporters={"Suciedad": "dirt"})
+        self.datacollector.collect(self)
+
+    def step(self):
+        if self.dirt and self.random.random() < self.rate:
+            self.dirt -= 1
+        self.datacollector.collect(self)
+
+
+def test_welford_matches_two_pass():
+    values = [3.0, 1.5, 8.25, -2.0, 4.0, 4.0]
+    stat = Welford()
+    for v in values:
+        stat.add(v)
+    mean = sum(values) / len(values)
+    assert stat.mean == pytest.approx(mean)
+    assert stat.variance == pytest.approx(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+
+
+@pytest.mark.parametrize("df, expected", [(1, 12.7062), (2, 4.3027), (5, 2.5706), (30, 2.0423)])
+def test_t_quantile_is_exact_at_small_df(df, expected):
+    assert t_quantile(0.95, df) == pytest.approx(expected, abs=1e-4)
+
+
+def test_fallback_without_scipy_is_close_from_df_3(monkeypatch):
+    monkeypatch.setattr(replication, "_student_t", None)
+    assert t_quantile(0.95, 3) == pytest.approx(3.1824, rel=0.01)
+    assert t_quantile(0.95, 30) == pytest.approx(2.0423, rel=0.001)
+
+
+def test_censored_runs_are_counted_not_averaged():
+    result = ConfigResult({}, {"time_to_clean": None}, 0.95)
+    for value in (10, None, 14, None, 12):
+        result.add({"time_to_clean": value})
+
+    assert result.n == 5
+    assert result.censored == {"time_to_clean": 2}
+    summary = result.summary()["time_to_clean"]
+    assert summary["mean"] == 12
+    assert (summary["n"], summary["censored"]) == (3, 2)
+
+
+def test_needed_scales_with_the_censored_fraction():
+    full = ConfigResult({}, {"m": None}, 0.95)
+    half = ConfigResult({}, {"m": None}, 0.95)
+    for value in (1.0, 3.0, 2.0, 4.0):
+        full.add({"m": value})
+        half.add({"m": value})
+        half.add({"m": None})
+    assert half.needed({"m": 0.5}, False) == pytest.approx(2 * full.needed({"m": 0.5}, False), abs=1)
+
+
+def test_time_to_clean_is_censored_at_max_steps():
+    experiment = AdaptiveExperiment(
+        Cleaner, [dict(dirt=5, rate=0.2)], target=1.0, max_steps=20,
+        min_replicas=30, max_replicas=30, workers=1,
+    )
+    result, = experiment.run()
+    stat = result.stats["time_to_clean"]
+
+    assert result.n == 30
+    assert 0 < result.censored["time_to_clean"] < 30
+    assert stat.n + result.censored["time_to_clean"] == 30
+    # Solo corridas que sí terminaron: nunca max_steps como si fuera dato
+    assert stat.mean < 20
+
+
+def test_stops_once_intervals_are_narrow():
+    experiment = AdaptiveExperiment(
+        Cleaner, [dict(rate=0.9), dict(rate=0.3)], target=2.0, workers=1, max_replicas=400,
+    )
+    fast, slow = experiment.run()
+    for result in (fast, slow):
+        low, high = result.interval("time_to_clean")
+        assert high - low <= 2.0
+        assert result.censored["time_to_clean"] == 0
+    # La configuración más ruidosa necesitó más réplicas
+    assert slow.n > fast.n
+    assert experiment.total_replicas == fast.n + slow.n
+    assert not math.isinf(slow.stats["time_to_clean"].variance)
+
+
+def test_always_censored_config_stops_after_min_replicas():
+    experiment = AdaptiveExperiment(
+        Cleaner, [dict(rate=0.0), dict(rate=0.9)], target=2.0, max_steps=50,
+        min_replicas=6, max_replicas=500, workers=1,
+    )
+    stuck, fast = experiment.run()
+
+    assert stuck.n == 6
+    assert stuck.reason == "censored: time_to_clean 6/6"
+    assert stuck.summary()["time_to_clean"]["mean"] is None
+    assert fast.reason == "target"
+    assert fast.censored["time_to_clean"] == 0
+
+
+def test_max_censored_is_a_fraction():
+    # Con rate=0.2 y 20 pasos una parte sale censurada; con 0.0 de tolerancia se para
+    experiment = AdaptiveExperiment(
+        Cleaner, [dict(dirt=5, rate=0.2)], target=0.1, max_steps=20,
+        min_replicas=10, max_replicas=100, max_censored=0.0, workers=1,
+    )
+    result, = experiment.run()
+    assert result.n == 10
+    assert result.reason.startswith("censored: time_to_clean ")
@@ -0,0 +1,125 @@
+import functools
+import importlib
+import sys
+
+from mesa import Model
+from mesa.datacollection import DataCollector
+
+from sim_tools import result_cache
+from sim_tools.result_cache import ResultCache, cache_key, default_summary, source_hash
+
+
+class Walk(Model):
+    """Caminata aleatoria mínima con un reporter."""
+
+    def __init__(self, bias=0.5, seed=None):
+        super().__init__(seed=seed)
+        self.bias = bias
+        self.position = 0
+        self.datacollector = DataCollector(model_reporters={"Posicion": "position"})
+
+    def step(self):
+        self.position += 1 if self.random.random() < self.bias else -1
+        self.datacollector.collect(self)
+
+
+def final_position(model):
+    return {"final": model.position}
+
+
+def scaled(model, factor):
+    return {"final": model.position * factor}
+
+
+def test_hit_returns_the_same_result(tmp_path):
+    cache = ResultCache(tmp_path)
+    first = cache.run(Walk, {"bias": 0.6}, seed=1, steps=50)
+    second = cache.run(Walk, {"bias": 0.6}, seed=1, steps=50)
+    assert first == second
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_summarizer_is_part_of_the_key(tmp_path):
+    cache = ResultCache(tmp_path)
+    default = cache.run(Walk, {}, seed=2, steps=30)
+    custom = cache.run(Walk, {}, seed=2, steps=30, summarize=final_position)
+    assert cache.misses == 2
+    assert set(custom["summary"]) == {"final"}
+    assert "Posicion" in default["summary"]
+
+    # functools.partial y closures con otros valores son otro resumen
+    double = cache.run(Walk, {}, seed=2, steps=30, summarize=functools.partial(scaled, factor=2))
+    triple = cache.run(Walk, {}, seed=2, steps=30, summarize=functools.partial(scaled, factor=3))
+    assert double["summary"]["final"] * 3 == triple["summary"]["final"] * 2
+    assert cache.misses == 4
+
+    batch = cache.run_batch(Walk, [{}], seeds=[2], steps=30, summarize=final_position)
+    assert batch[0]["summary"] == custom["summary"]
+    assert cache.hits == 1
+
+
+def test_key_changes_with_every_input():
+    base = cache_key(Walk, {"bias": 0.5}, 1, 10)
+    assert base == cache_key(Walk, {"bias": 0.5}, 1, 10, default_summary)
+    assert len({
+        base,
+        cache_key(Walk, {"bias": 0.4}, 1, 10),
+        cache_key(Walk, {"bias": 0.5}, 2, 10),
+        cache_key(Walk, {"bias": 0.5}, 1, 11),
+        cache_key(Walk, {"bias": 0.5}, 1, 10, final_position),
+    }) == 5
+
+
+def test_eviction_keeps_the_limit_without_rescanning(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path, max_bytes=4000)
+    scans = []
+    entries = ResultCache._entries
+    monkeypatch.setattr(ResultCache, "_entries", lambda self: scans.append(1) or entries(self))
+
+    for i in range(200):
+        cache.put(f"{i:064x}", {"summary": {"value": i, "pad": "x" * 50}})
+        assert cache._size <= cache.max_bytes
+    assert cache.size() == cache._size
+    # Un recorrido al inicio y uno por desalojo, no uno por put
+    assert len(scans) < 40
+
+    # Los que quedan son los más recientes
+    assert cache.get(f"{199:064x}") is not None
+    assert cache.get(f"{0:064x}") is None
+
+
+def test_recently_read_results_survive(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=10**6)
+    for i in range(10):
+        cache.put(f"{i:064x}", {"summary": {"value": i}})
+    cache.get(f"{0:064x}")
+    cache.evict(target=cache.size() // 2)
+    assert cache.get(f"{0:064x}") is not None
+    assert cache.get(f"{1:064x}") is None
+
+
+def test_source_hash_covers_local_imports(tmp_path, monkeypatch):
+    (tmp_path / "walkpkg").mkdir()
+    (tmp_path / "walkpkg" / "__init__.py").write_text("")
+    (tmp_path / "walkpkg" / "model.py").write_text(
+        "from mesa import Model\nfrom walkhelpers.steps import size\n\n"
+        "class Walk(Model):\n    pass\n"
+    )
+    (tmp_path / "walkhelpers").mkdir()
+    (tmp_path / "walkhelpers" / "__init__.py").write_text("")
+    helper = tmp_path / "walkhelpers" / "steps.py"
+    helper.write_text("def size():\n    return 1\n")
+    (tmp_path / "walkhelpers" / "unused.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("walkpkg", "walkpkg.model", "walkhelpers", "walkhelpers.steps"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    def fresh_hash():
+        monkeypatch.setattr(result_cache, "_source_hashes", {})
+        return source_hash(importlib.import_module("walkpkg.model").Walk)
+
+    before = fresh_hash()
+    (tmp_path / "walkhelpers" / "unused.py").write_text("x = 1\n")
+    assert fresh_hash() == before
+    helper.write_text("def size():\n    return 2\n")
+    assert fresh_hash() != before